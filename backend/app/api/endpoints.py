@@ -1,16 +1,20 @@
 import asyncio
 import json
 import os
-from typing import Any, Optional
+import time
+from typing import Optional
 
+import psutil
+from app.core import metrics
 from app.services.audio import AudioService
 from app.services.audiobook_service import AudiobookService
 from app.services.audiobook_store import AudiobookStore
 from app.services.engine_manager import EngineManager
-from app.services.gemini_cleaner import GeminiCleaner
+from app.services.gemini_cleaner import GeminiCleaner, gemini_limiter
+from app.services.local_cleaner import CLEANER_MODES
 from app.services.pdf_extractor import PDFExtractor
 from app.services.text_extractor import TextExtractor
-from app.services.tts import interactive_tts_lock
+from app.services.tts import interactive_tts_gate
 from fastapi import (
     APIRouter,
     BackgroundTasks,
@@ -19,10 +23,11 @@ from fastapi import (
     Form,
     Header,
     HTTPException,
+    Query,
     Response,
     UploadFile,
 )
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -63,6 +68,22 @@ def health_check():
     return {"status": "ready" if loaded else "cold", "loaded": loaded}
 
 
+@router.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition: latency histograms recorded as requests
+    run (see app.core.metrics), plus gauges sampled now."""
+    metrics.PROCESS_RSS_BYTES.set(psutil.Process().memory_info().rss)
+    metrics.TTS_MODEL_LOADED.set(1 if EngineManager.is_loaded() else 0)
+    for stat, value in gemini_limiter.snapshot().items():
+        metrics.GEMINI_LIMITER.set(value, stat=stat)
+    for cache in metrics.CACHES:
+        hits = metrics.CACHE_LOOKUPS.value(cache=cache, result="hit")
+        misses = metrics.CACHE_LOOKUPS.value(cache=cache, result="miss")
+        if hits + misses:
+            metrics.CACHE_HIT_RATIO.set(hits / (hits + misses), cache=cache)
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @router.get("/engine")
 def get_engine():
     """Return current active engine, model, and available voices."""
@@ -101,8 +122,18 @@ async def prewarm(
     return {"status": "warming"}
 
 
+async def _time_first_audio(sample_generator, started: float):
+    """Pass samples through, recording the request's time to first audio."""
+    first = True
+    async for samples in sample_generator:
+        if first:
+            metrics.TTS_TTFA_SECONDS.observe(time.perf_counter() - started)
+            first = False
+        yield samples
+
+
 async def _guarded_wav_stream(wav_generator, lock_holder=None):
-    """Wrap WAV streaming with error handling and release the preemption lock
+    """Wrap WAV streaming with error handling and release the preemption gate
     when the stream finishes (so audiobook generation can resume)."""
     try:
         async for chunk in wav_generator:
@@ -116,21 +147,24 @@ async def _guarded_wav_stream(wav_generator, lock_holder=None):
 
 @router.post("/speak")
 async def speak(req: SpeakRequest):
+    started = time.perf_counter()
     try:
-        # Acquire preemption lock so any in-flight audiobook TTS phase pauses
-        # at its next inter-page checkpoint until this stream finishes.
-        await interactive_tts_lock.acquire()
+        # Hold the preemption gate so any in-flight audiobook synthesis parks
+        # at its next segment checkpoint until this stream finishes.
+        await interactive_tts_gate.acquire()
 
         # If the model was idle-unloaded, reload it now (~1.3 s warm-up).
         await EngineManager.ensure_loaded()
         EngineManager.touch()
 
-        raw_samples_generator = EngineManager.generate(req.text, req.voice, req.speed)
+        raw_samples_generator = _time_first_audio(
+            EngineManager.generate(req.text, req.voice, req.speed), started
+        )
         wav_chunk_generator = AudioService.stream_samples_to_wav(
             raw_samples_generator, req.volume
         )
         guarded_stream = _guarded_wav_stream(
-            wav_chunk_generator, lock_holder=interactive_tts_lock
+            wav_chunk_generator, lock_holder=interactive_tts_gate
         )
 
         return StreamingResponse(
@@ -139,9 +173,9 @@ async def speak(req: SpeakRequest):
         )
 
     except Exception as e:
-        # If we acquired the lock but bombed before returning the stream, release.
-        if interactive_tts_lock.locked():
-            interactive_tts_lock.release()
+        # If we acquired the gate but bombed before returning the stream, release.
+        if interactive_tts_gate.locked():
+            interactive_tts_gate.release()
         print(f"[API] ❌ POST /speak Error: {e}")
         return Response(status_code=500, content=str(e))
 
@@ -168,6 +202,10 @@ class VerifyKeyRequest(BaseModel):
     api_key: str
 
 
+class PriorityRequest(BaseModel):
+    priority: int
+
+
 # Configurable cost-cap threshold; warn (don't block) above this estimated USD.
 COST_WARNING_THRESHOLD_USD = 1.00
 
@@ -175,17 +213,25 @@ COST_WARNING_THRESHOLD_USD = 1.00
 _ALLOWED_EXTENSIONS = {"pdf", "txt", "docx", "md"}
 
 
+def _needs_gemini_key(meta: dict) -> bool:
+    """Books cleaned by LocalCleaner alone run without an API key; "auto"
+    books without one fall back to local cleaning for every page."""
+    return (meta.get("cleaner") or "gemini") == "gemini"
+
+
 @router.post("/audiobook", response_model=AudiobookEstimate)
 async def upload_audiobook(
     file: UploadFile = File(...),
     voice: Optional[str] = Form(default=None),
     speed: Optional[float] = Form(default=None),
     engine: Optional[str] = Form(default=None),
+    cleaner: Optional[str] = Form(default=None),
 ):
     """Save the uploaded file, extract estimate, return book_id + stats. No processing yet.
 
     Accepts PDF, TXT, DOCX, and MD files. Optional `voice`, `speed`, `engine`
-    form fields snapshot the user's current selection for this book.
+    form fields snapshot the user's current selection for this book;
+    `cleaner` picks the text-cleaning engine (see CLEANER_MODES).
     """
     filename = file.filename or "Untitled"
     file_ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
@@ -194,6 +240,12 @@ async def upload_audiobook(
             status_code=400,
             detail="Only PDF, TXT, DOCX, and MD files are supported.",
         )
+    book_cleaner = cleaner or "gemini"
+    if book_cleaner not in CLEANER_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"cleaner must be one of: {', '.join(CLEANER_MODES)}.",
+        )
 
     content = await file.read()
     if not content:
@@ -270,6 +322,9 @@ async def upload_audiobook(
         estimate["token_count"] = GeminiCleaner.estimate_tokens(
             sample_chars * page_count
         )
+        if book_cleaner == "local":
+            estimate["token_count"] = 0
+            estimate["cost_usd"] = 0.0
 
         state = EngineManager.state()
         book_engine = engine or state.get("engine", "kokoro")
@@ -288,6 +343,7 @@ async def upload_audiobook(
             estimated=estimate,
         )
         meta["file_ext"] = file_ext
+        meta["cleaner"] = book_cleaner
         AudiobookStore.write_meta(book_id, meta)
 
         # Render cover in background — scheduled AFTER write_meta so that if this
@@ -337,12 +393,23 @@ async def start_audiobook(
     book_id: str,
     x_gemini_api_key: Optional[str] = Header(default=None, alias="X-Gemini-Api-Key"),
 ):
-    if not x_gemini_api_key:
+    meta = AudiobookStore.read_meta(book_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail="Book not found.")
+    if not x_gemini_api_key and _needs_gemini_key(meta):
         raise HTTPException(status_code=400, detail="Missing X-Gemini-Api-Key header.")
+    await AudiobookService.enqueue(book_id, x_gemini_api_key or "")
+    return {"status": "queued", "book_id": book_id}
+
+
+@router.post("/audiobook/{book_id}/priority")
+async def set_audiobook_priority(book_id: str, req: PriorityRequest):
+    """Bump (or lower) a book's scheduling priority. Higher runs first;
+    within a priority the shortest remaining job goes first."""
     if AudiobookStore.read_meta(book_id) is None:
         raise HTTPException(status_code=404, detail="Book not found.")
-    await AudiobookService.enqueue(book_id, x_gemini_api_key)
-    return {"status": "queued", "book_id": book_id}
+    queue = await AudiobookService.set_priority(book_id, req.priority)
+    return {"book_id": book_id, "priority": req.priority, "queue": queue}
 
 
 @router.get("/audiobook/{book_id}/events")
@@ -355,7 +422,12 @@ async def audiobook_events(book_id: str):
         try:
             # Emit current status immediately so the client doesn't need to poll first.
             meta = AudiobookStore.read_meta(book_id) or {}
-            yield f"data: {json.dumps({'type': 'snapshot', **meta})}\n\n"
+            snapshot = {
+                "type": "snapshot",
+                **meta,
+                "queue": AudiobookService.queue_status(book_id),
+            }
+            yield f"data: {json.dumps(snapshot)}\n\n"
             # If the book already reached a terminal state before this subscriber
             # arrived, return immediately instead of waiting forever.
             if meta.get("status") in {"done", "failed", "cancelled", "ready"}:
@@ -376,16 +448,87 @@ async def audiobook_events(book_id: str):
 
 
 @router.get("/audiobook")
-def list_audiobooks() -> list[dict[str, Any]]:
-    return AudiobookStore.list_books()
+def list_audiobooks(
+    limit: Optional[int] = Query(default=None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """Without query params: every book's full meta (legacy shape).
+
+    With any of limit / cursor / status / fields: one page of summaries,
+    `{"items": [...], "next_cursor": str | None}`. `status` and `fields` are
+    comma-separated.
+    """
+    if limit is None and cursor is None and status is None and fields is None:
+        return AudiobookStore.list_books()
+    try:
+        items, next_cursor = AudiobookStore.list_books_page(
+            limit=limit or 50,
+            cursor=cursor,
+            statuses=_csv(status),
+            fields=_csv(fields),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/audiobook/changes")
+def list_audiobook_changes(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=200, ge=1, le=1000),
+    fields: Optional[str] = None,
+):
+    """Summaries of books changed after `since` plus ids deleted since then.
+    Clients store the returned `cursor` and pass it back as `since`."""
+    try:
+        return AudiobookStore.list_changes(
+            since=since, limit=limit, fields=_csv(fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/audiobook/search")
+def search_audiobooks(
+    q: str,
+    book_id: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+):
+    """Full-text search over cleaned page text, across the library or within
+    one book. Hits are ranked; `time` is the page's start in the audio."""
+    try:
+        items, next_offset = AudiobookStore.search(
+            q, book_id=book_id, limit=limit, offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    return {"items": items, "next_offset": next_offset}
+
+
+def _csv(value: Optional[str]) -> Optional[list[str]]:
+    if value is None:
+        return None
+    return [v.strip() for v in value.split(",") if v.strip()] or None
 
 
 @router.get("/audiobook/{book_id}")
-def get_audiobook(book_id: str):
+def get_audiobook(
+    book_id: str,
+    if_none_match: Optional[str] = Header(default=None, alias="If-None-Match"),
+):
+    """Book meta with a weak ETag; pollers send If-None-Match to get a 304."""
+    etag = AudiobookStore.meta_etag(book_id)
     meta = AudiobookStore.read_meta(book_id)
     if meta is None:
         raise HTTPException(status_code=404, detail="Book not found.")
-    return meta
+    if if_none_match and etag in {t.strip() for t in if_none_match.split(",")}:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(content=meta, headers={"ETag": etag})
 
 
 @router.get("/audiobook/{book_id}/audio")
@@ -457,12 +600,44 @@ def get_audiobook_audio(
 
 
 @router.get("/audiobook/{book_id}/transcript")
-def get_audiobook_transcript(book_id: str):
-    """Return the per-page transcript + section timing map (for live highlighting)."""
-    path = AudiobookStore.transcript_path(book_id)
-    if not os.path.exists(path):
+def get_audiobook_transcript(
+    book_id: str,
+    first_page: Optional[int] = Query(default=None, ge=1),
+    last_page: Optional[int] = Query(default=None, ge=1),
+    start: Optional[float] = Query(default=None, ge=0),
+    end: Optional[float] = Query(default=None, ge=0),
+):
+    """Return the per-page transcript + section timing map (for live highlighting).
+
+    With first_page/last_page and/or start/end (seconds) only the matching
+    pages are returned: `{"book_id", "pages": [{"page", "start_time",
+    "end_time", "text"}]}`. Without parameters, the full legacy document.
+    """
+    meta = AudiobookStore.read_meta(book_id)
+    if meta is None:
         raise HTTPException(status_code=404, detail="Transcript not ready.")
-    return FileResponse(path, media_type="application/json")
+    if not AudiobookStore.has_transcript(book_id):
+        # Books finished by older builds still have transcript.json.
+        if not AudiobookStore.import_legacy_transcript(book_id):
+            raise HTTPException(status_code=404, detail="Transcript not ready.")
+
+    if first_page is None and last_page is None and start is None and end is None:
+        pages = AudiobookStore.read_transcript_pages(book_id)
+        return {
+            "book_id": book_id,
+            "sections": meta.get("sections") or [],
+            "page_to_time": meta.get("page_to_time") or {},
+            "total_audio_seconds": meta.get("total_audio_seconds") or 0.0,
+            "pages": {str(p["page"]): p["text"] for p in pages},
+        }
+    pages = AudiobookStore.read_transcript_pages(
+        book_id,
+        first_page=first_page,
+        last_page=last_page,
+        start_time=start,
+        end_time=end,
+    )
+    return {"book_id": book_id, "pages": pages}
 
 
 @router.post("/audiobook/{book_id}/cancel")
@@ -479,14 +654,24 @@ async def retry_audiobook(
     x_gemini_api_key: Optional[str] = Header(default=None, alias="X-Gemini-Api-Key"),
 ):
     """Re-process failed pages (or the whole book if state is `failed`)."""
-    if AudiobookStore.read_meta(book_id) is None:
+    meta = AudiobookStore.read_meta(book_id)
+    if meta is None:
         raise HTTPException(status_code=404, detail="Book not found.")
-    if not x_gemini_api_key:
+    if not x_gemini_api_key and _needs_gemini_key(meta):
         raise HTTPException(status_code=400, detail="Missing X-Gemini-Api-Key header.")
-    count = await AudiobookService.retry_failed(book_id, x_gemini_api_key)
+    count = await AudiobookService.retry_failed(book_id, x_gemini_api_key or "")
     return {"status": "queued", "retried_pages": count, "book_id": book_id}
 
 
+@router.get("/audiobook/{book_id}/timings")
+def get_audiobook_timings(book_id: str):
+    """Binary segment timing index for audio.wav (format: TimingIndex)."""
+    path = AudiobookStore.timings_path(book_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Timings not yet rendered.")
+    return FileResponse(path, media_type="application/octet-stream")
+
+
 @router.get("/audiobook/{book_id}/cover")
 def get_audiobook_cover(book_id: str):
     path = AudiobookStore.cover_path(book_id)
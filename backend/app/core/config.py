@@ -13,6 +13,56 @@ class Settings(BaseSettings):
     HOST: str = "127.0.0.1"
     PORT: int = 10101
 
+    # Audiobook SQLite tuning. NORMAL is durable in WAL mode except for the
+    # last commits on power loss — per-page files are the real checkpoint.
+    AUDIOBOOK_DB_READERS: int = 4
+    AUDIOBOOK_DB_SYNCHRONOUS: str = "NORMAL"
+    AUDIOBOOK_DB_CACHE_KB: int = 8192
+    AUDIOBOOK_DB_MMAP_BYTES: int = 64 * 1024 * 1024
+
+    # Audiobook pipeline scheduling. Each phase has its own worker pool;
+    # clean / TTS workers hand their slot to the next book after a slice of
+    # pages so short books interleave with long ones (0 = whole phase).
+    AUDIOBOOK_EXTRACT_WORKERS: int = 1
+    AUDIOBOOK_CLEAN_WORKERS: int = 2
+    AUDIOBOOK_TTS_WORKERS: int = 1
+    AUDIOBOOK_CLEAN_SLICE_PAGES: int = 16
+    AUDIOBOOK_TTS_SLICE_PAGES: int = 4
+    # Queue order is shortest-remaining-work first; every second a book waits
+    # forgives this many seconds of its estimated work, so a stream of short
+    # uploads can never starve a long one.
+    AUDIOBOOK_QUEUE_AGING: float = 0.1
+
+    # Gemini quota, shared by all books and keys (0 = unlimited). Concurrency
+    # adapts between 1 and GEMINI_MAX_CONCURRENCY from latency and 429s.
+    GEMINI_RPM: int = 1000
+    GEMINI_TPM: int = 1_000_000
+    GEMINI_MAX_CONCURRENCY: int = 16
+    # Alternate Gemini-compatible endpoint (e.g. benchmarks/fake_gemini.py);
+    # empty = Google's API.
+    GEMINI_BASE_URL: str = ""
+    # Text pages are cleaned several per request, up to this many estimated
+    # input tokens per request (0 = one request per page). Off by default
+    # until batched output is proven against per-page cleaning; ~6000 packs
+    # about eight average pages per request.
+    GEMINI_BATCH_TOKENS: int = 0
+
+    # Image-only PDF pages: render processes, render resolution and longest
+    # image side sent for OCR, and how many rendered pages may wait ahead of
+    # their Gemini calls.
+    OCR_RENDER_WORKERS: int = 2
+    OCR_RENDER_DPI: int = 150
+    OCR_MAX_IMAGE_SIDE: int = 1536
+    OCR_PREFETCH_PAGES: int = 8
+    # Which engine reads scanned pages: gemini | local | fallback | escalate
+    # (see app/services/local_ocr.py). The local engine needs pytesseract and
+    # the tesseract binary; escalate sends pages it reads with a mean word
+    # confidence below OCR_ESCALATE_CONFIDENCE (0-100) on to Gemini.
+    OCR_POLICY: str = "gemini"
+    OCR_LOCAL_ENGINE: str = "tesseract"
+    OCR_LOCAL_LANG: str = "eng"
+    OCR_ESCALATE_CONFIDENCE: float = 80.0
+
     # Paths
     BASE_DIR: str = os.path.dirname(
         os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,258 @@
+"""Prometheus metrics for the SuperSay backend, served at GET /metrics.
+
+Uses stdlib only — no new dependency, like app.core.logging. Every metric is
+declared here; services import the ones they record:
+
+    from app.core.metrics import TTS_SEGMENT_SECONDS
+    TTS_SEGMENT_SECONDS.observe(elapsed, kind="interactive")
+
+Metrics are process-local and reset on restart. Observations are
+thread-safe: some come from the inference thread, not the event loop.
+Gauges are point-in-time values set by the /metrics handler just before
+rendering (`render()` → Prometheus text exposition format 0.0.4).
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets (seconds). Interactive speech is judged in tens of
+# milliseconds; audiobook pages and Gemini calls take seconds.
+_FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.35, 0.5, 1.0, 2.5, 5.0)
+_SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+def _labels_text(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {labels}")
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(
+                    f"{self.name}{_labels_text(self.labels, key)} {_number(value)}"
+                )
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(
+                    f"{self.name}{_labels_text(self.labels, key)} {_number(value)}"
+                )
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: tuple[float, ...],
+        labels: tuple[str, ...] = (),
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values → (per-bucket counts incl. +Inf, sum)
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[i] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall time of the `with` body, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip((*self.buckets, math.inf), counts):
+                    cumulative += n
+                    le = _labels_text((*self.labels, "le"), (*key, _number(bound)))
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                labels = _labels_text(self.labels, key)
+                lines.append(f"{self.name}_sum{labels} {_number(total[0])}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+_REGISTRY: list[_Metric] = []
+
+
+def render() -> str:
+    return "\n".join(line for m in _REGISTRY for line in m.render()) + "\n"
+
+
+# ---------- interactive speech ----------
+
+TTS_TTFA_SECONDS = Histogram(
+    "supersay_tts_ttfa_seconds",
+    "Time from a /speak request arriving to its first audio samples.",
+    _FAST_BUCKETS,
+)
+TTS_SEGMENT_SECONDS = Histogram(
+    "supersay_tts_segment_seconds",
+    "Time to synthesize one segment, phonemization included (kind: "
+    "interactive or background).",
+    _FAST_BUCKETS,
+    labels=("kind",),
+)
+TTS_PHONEMIZE_SECONDS = Histogram(
+    "supersay_tts_phonemize_seconds",
+    "espeak-ng phonemization time of one segment.",
+    _FAST_BUCKETS,
+)
+INTERACTIVE_GATE_WAIT_SECONDS = Histogram(
+    "supersay_interactive_gate_wait_seconds",
+    "Time a /speak request queues for the interactive TTS gate.",
+    _FAST_BUCKETS,
+)
+TTS_MODEL_LOADED = Gauge(
+    "supersay_tts_model_loaded", "1 while the Kokoro model is in memory."
+)
+
+# ---------- caches ----------
+
+CACHE_LOOKUPS = Counter(
+    "supersay_cache_lookups_total",
+    "Cache lookups by result (cache: lookahead = prewarmed first segment, "
+    "clean = shared cleaned text, audio = shared page audio).",
+    labels=("cache", "result"),
+)
+CACHE_HIT_RATIO = Gauge(
+    "supersay_cache_hit_ratio",
+    "Share of lookups that hit, since start.",
+    labels=("cache",),
+)
+CACHES = ("lookahead", "clean", "audio")
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# ---------- audiobooks ----------
+
+AUDIOBOOK_PAGE_SECONDS = Histogram(
+    "supersay_audiobook_page_seconds",
+    "Processing time of one audiobook page per phase (extract, clean, tts), "
+    "preemption and scheduling waits included.",
+    _SLOW_BUCKETS,
+    labels=("phase",),
+)
+
+# ---------- Gemini ----------
+
+GEMINI_REQUEST_SECONDS = Histogram(
+    "supersay_gemini_request_seconds",
+    "Latency of one Gemini request once admitted by the limiter (op: clean, "
+    "batch, ocr, sections; outcome: ok, rate_limited, auth, error).",
+    _SLOW_BUCKETS,
+    labels=("op", "outcome"),
+)
+GEMINI_RETRIES = Counter(
+    "supersay_gemini_retries_total",
+    "Gemini requests retried after a failed attempt.",
+    labels=("op",),
+)
+GEMINI_LIMITER = Gauge(
+    "supersay_gemini_limiter",
+    "Shared Gemini limiter state (limit, in_flight, waiting, throttles, "
+    "cooldown_seconds).",
+    labels=("stat",),
+)
+
+# ---------- process ----------
+
+PROCESS_RSS_BYTES = Gauge(
+    "supersay_process_resident_memory_bytes", "Resident set size of the server."
+)
@@ -1,4 +1,5 @@
 import asyncio
+import multiprocessing
 import os
 from contextlib import asynccontextmanager
 
@@ -9,6 +10,7 @@ from app.core.config import settings
 from app.core.logging import configure as configure_logging
 from app.core.logging import get_logger
 from app.services.engine_manager import EngineManager
+from app.services.gemini_cleaner import GeminiCleaner
 from app.services.tts import TTSEngine
 from fastapi import FastAPI
 
@@ -80,6 +82,7 @@ async def lifespan(app: FastAPI):
     yield
     # Clean shutdown: release thread pool so no zombie workers linger.
     AudiobookService.shutdown()
+    await GeminiCleaner.aclose()
 
 
 app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, lifespan=lifespan)
@@ -90,6 +93,9 @@ app.include_router(router)
 
 if __name__ == "__main__":
     # This entry point is used by PyInstaller and Dev
+    # The OCR render pool spawns worker processes; in a frozen build they
+    # re-run this binary, which must hand them to multiprocessing.
+    multiprocessing.freeze_support()
     # log_config=None prevents uvicorn from overriding logging, access_log=False hides the health spam
     uvicorn.run(
         app,
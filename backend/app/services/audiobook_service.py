@@ -1,14 +1,19 @@
 """AudiobookService — orchestrator for PDF → audiobook pipeline.
 
 Singleton classmethods + ThreadPoolExecutor (mirrors TTSEngine pattern).
-One book processes at a time via asyncio.Queue. Each pipeline phase is
-idempotent: presence of the per-page output file IS the checkpoint.
+Books move through a PipelineScheduler with one worker pool per stage
+(extract; clean + sectioning; tts + concat), so several books are in flight
+at once. Each pipeline phase is idempotent: presence of the per-page output
+file IS the checkpoint — which is also what lets clean and tts run in
+bounded slices and hand their worker to the next book in between, and lets
+tts voice a book's cleaned pages while its later pages are still cleaning.
 
 Phases:
   extract  → pages/N.txt          (skip if exists)
   clean    → pages/N.clean.txt    (skip if exists; Gemini call)
   tts      → audio_pages/N.wav    (skip if exists; preempts to /speak)
-  concat   → audio.wav            (cheap; recomputes page_to_time map)
+  concat   → audio.wav            (cheap; recomputes page_to_time map and
+                                   merges audio_pages/N.tim → timings.bin)
 
 Sections detection lives in Phase 2.
 """
@@ -16,8 +21,6 @@ Sections detection lives in Phase 2.
 import asyncio
 import calendar
 import concurrent.futures
-import hashlib
-import json
 import os
 import struct
 import time
@@ -25,12 +28,34 @@ import wave
 from typing import Any
 
 import numpy as np
+from app.core.config import settings
+from app.core.metrics import AUDIOBOOK_PAGE_SECONDS, cache_lookup
 from app.services.audiobook_store import AudiobookStore, _now_iso
 from app.services.engine_manager import EngineManager
-from app.services.gemini_cleaner import GeminiAuthError, GeminiCleaner
+from app.services.gemini_cleaner import (
+    BATCH_PROMPT_HASH,
+    CLEAN_PROMPT_HASH,
+    MODEL_NAME,
+    GeminiAuthError,
+    GeminiCleaner,
+    GeminiRateLimitError,
+    GeminiTimeoutError,
+    gemini_limiter,
+)
+from app.services.local_cleaner import LocalCleaner
+from app.services.local_ocr import LocalOCR
+from app.services.ocr_renderer import OCRRenderer, RenderPrefetcher
+from app.services.page_fingerprint import DuplicateIndex, PageFingerprint
 from app.services.pdf_extractor import PDFExtractor
+from app.services.pipeline_scheduler import PipelineScheduler
+from app.services.section_detector import (
+    SectionStream,
+    sections_from_headings,
+    text_heading,
+)
 from app.services.text_extractor import TextExtractor
-from app.services.tts import interactive_tts_lock
+from app.services.timing_index import TimingIndex
+from app.services.tts import SegmentTiming, interactive_tts_gate
 
 # Pages with fewer extractable chars than this are treated as image-only
 # and routed through Gemini vision OCR instead of text cleaning.
@@ -39,6 +64,8 @@ _OCR_TEXT_THRESHOLD = 50
 SAMPLE_RATE = 24000  # matches TTSEngine
 BYTES_PER_SAMPLE = 2  # int16
 WAV_HEADER_SIZE = 44
+# Seconds of audio Kokoro renders per wall-clock second (used by estimate()).
+_TTS_REALTIME_FACTOR = 3.5
 
 
 class AudiobookCancelled(Exception):
@@ -47,17 +74,29 @@ class AudiobookCancelled(Exception):
 
 class AudiobookService:
     _executor: concurrent.futures.ThreadPoolExecutor | None = None
-    _queue: asyncio.Queue | None = None
-    _worker_task: asyncio.Task | None = None
-    _current_book_id: str | None = None
+    _scheduler: PipelineScheduler | None = None
     # SSE subscribers: book_id → list[asyncio.Queue]
     _subscribers: dict[str, list[asyncio.Queue]] = {}
     # In-memory API keys per active job (never persisted).
     _job_keys: dict[str, str] = {}
     # Cancel flags set by /cancel endpoint; phases check between pages.
     _cancel_flags: dict[str, bool] = {}
-    # Concurrency for Gemini cleaning (page-level parallelism).
-    _CLEAN_PARALLELISM = 4
+    # Monotonic enqueue time per book (queue aging), and the last queue
+    # position sent to each book's SSE subscribers.
+    _submitted_at: dict[str, float] = {}
+    _queue_published: dict[str, tuple[str, int]] = {}
+    # Books whose cleaning + sectioning finished this run. Until then the tts
+    # stage only streams pages that are already cleaned.
+    _cleaned: set[str] = set()
+    # Windowed section detection per book being cleaned; None when the book
+    # needs no Gemini windows (outline / confident headings, or no key).
+    _section_streams: dict[str, SectionStream | None] = {}
+    # Path A sections (outline / confident headings) per book, read once
+    # when its section stream opens; None when Path A doesn't apply.
+    _outline_sections: dict[str, list[dict] | None] = {}
+    # LocalCleaner's pass over the whole book, run on its first clean slice
+    # of this run: (cleaned, messy, image_only) per page, None if missing.
+    _local_cleaned: dict[str, list[tuple[str, bool, bool] | None]] = {}
 
     # ---------- lifecycle ----------
 
@@ -65,45 +104,119 @@ class AudiobookService:
     def initialize(cls) -> None:
         if cls._executor is None:
             cls._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-        if cls._queue is None:
-            cls._queue = asyncio.Queue()
-        if cls._worker_task is None or cls._worker_task.done():
-            cls._worker_task = asyncio.create_task(cls._worker_loop())
+        if cls._scheduler is None:
+            cls._scheduler = PipelineScheduler(
+                cls._run_stage, on_exit=cls._on_exit, key=cls._queue_key
+            )
+            cls._scheduler.add_stage("extract", settings.AUDIOBOOK_EXTRACT_WORKERS)
+            cls._scheduler.add_stage("clean", settings.AUDIOBOOK_CLEAN_WORKERS)
+            cls._scheduler.add_stage("tts", settings.AUDIOBOOK_TTS_WORKERS)
+        cls._scheduler.start()
 
     @classmethod
     def shutdown(cls) -> None:
+        AudiobookStore.flush_progress()
         if cls._executor is not None:
             cls._executor.shutdown(wait=False, cancel_futures=True)
             cls._executor = None
-
-    @classmethod
-    async def _worker_loop(cls) -> None:
-        assert cls._queue is not None
-        while True:
-            book_id = await cls._queue.get()
-            try:
-                cls._current_book_id = book_id
-                await cls._run_pipeline(book_id)
-            except Exception as e:
-                print(f"[Audiobook] Fatal pipeline error for {book_id}: {e}")
-                if AudiobookStore.read_meta(book_id) is not None:
-                    await AudiobookStore.update_meta(book_id, status="failed", error=str(e))
-                    cls._emit(book_id, "failed", error=str(e))
-            finally:
-                cls._current_book_id = None
-                cls._job_keys.pop(book_id, None)
-                cls._queue.task_done()
+        OCRRenderer.shutdown()
 
     # ---------- queue / SSE ----------
 
     @classmethod
     async def enqueue(cls, book_id: str, api_key: str) -> None:
         cls.initialize()
-        assert cls._queue is not None
+        assert cls._scheduler is not None
         cls._job_keys[book_id] = api_key
         cls._cancel_flags.pop(book_id, None)
+        if cls._scheduler.is_running(book_id):
+            # Reruns from extract once the current run finishes.
+            cls._scheduler.submit(book_id)
+            return
         await AudiobookStore.update_meta(book_id, status="queued", error=None)
-        await cls._queue.put(book_id)
+        cls._cleaned.discard(book_id)
+        cls._submitted_at.setdefault(book_id, time.monotonic())
+        cls._scheduler.submit(book_id)
+        cls._publish_queue()
+
+    @classmethod
+    async def set_priority(cls, book_id: str, priority: int) -> dict[str, Any] | None:
+        """Persist a priority bump (higher runs first, default 0) and re-key
+        the book if it is waiting in a queue. Returns its queue status."""
+        await AudiobookStore.update_meta(book_id, priority=int(priority))
+        if cls._scheduler is not None:
+            cls._scheduler.reprioritize(book_id)
+        cls._publish_queue()
+        return cls.queue_status(book_id)
+
+    @staticmethod
+    def _remaining_seconds(meta: dict[str, Any]) -> float:
+        """Estimated processing seconds left: the upload estimate, split into
+        clean and TTS shares and scaled by the current phase's progress."""
+        est = meta.get("estimated") or {}
+        page_count = int(meta.get("page_count") or 0)
+        total = float(est.get("processing_seconds") or page_count * 1.5)
+        tts = min(total, float(est.get("audio_seconds") or 0) / _TTS_REALTIME_FACTOR)
+        progress = meta.get("phase_progress") or {}
+        page_total = int(progress.get("page_total") or 0)
+        left = 1.0
+        if page_total:
+            left = max(0.0, 1.0 - int(progress.get("page_done") or 0) / page_total)
+        status = meta.get("status")
+        if status in ("tts", "concatenating"):
+            return tts * left
+        if status in ("cleaning", "sectioning"):
+            return (total - tts) * left + tts
+        return total
+
+    @classmethod
+    def _queue_key(cls, book_id: str) -> tuple[int, float]:
+        """Scheduler key: explicit priority first, then remaining work minus
+        an aging credit (remaining - a·waited, with the `now` term dropped
+        because it is the same for every book)."""
+        meta = AudiobookStore.read_meta(book_id) or {}
+        submitted = cls._submitted_at.get(book_id, time.monotonic())
+        aged = cls._remaining_seconds(meta) + settings.AUDIOBOOK_QUEUE_AGING * submitted
+        return (-int(meta.get("priority") or 0), aged)
+
+    @classmethod
+    def queue_status(cls, book_id: str) -> dict[str, Any] | None:
+        """Stage, 1-based position in that stage's queue (0 = running) and a
+        rough ETA for a book in the pipeline; None otherwise. A book forked
+        across clean and tts reports its earliest stage."""
+        sched = cls._scheduler
+        if sched is None or book_id not in sched:
+            return None
+        stage = sched.stages_of(book_id)[0]
+        snap = sched.snapshot()[stage]
+        if book_id in snap["running"]:
+            position, ahead = 0, []
+        else:
+            position = snap["queued"].index(book_id) + 1
+            ahead = snap["running"] + snap["queued"][: position - 1]
+
+        def remaining(b: str) -> float:
+            return cls._remaining_seconds(AudiobookStore.read_meta(b) or {})
+
+        backlog = sum(remaining(b) for b in ahead) / sched.workers(stage)
+        return {
+            "stage": stage,
+            "position": position,
+            "eta_seconds": round(backlog + remaining(book_id), 1),
+        }
+
+    @classmethod
+    def _publish_queue(cls) -> None:
+        """Send a `queue` event to subscribed books whose stage or position
+        changed since the last one they were sent."""
+        for book_id in list(cls._subscribers):
+            status = cls.queue_status(book_id)
+            if status is None:
+                continue
+            marker = (status["stage"], status["position"])
+            if cls._queue_published.get(book_id) != marker:
+                cls._queue_published[book_id] = marker
+                cls._emit(book_id, "queue", **status)
 
     @classmethod
     def cancel(cls, book_id: str) -> bool:
@@ -113,8 +226,8 @@ class AudiobookService:
 
     @classmethod
     def is_processing(cls, book_id: str) -> bool:
-        """Return True if this book is the currently-running job (or queued)."""
-        if cls._current_book_id == book_id:
+        """Return True if this book is in the pipeline (running or queued)."""
+        if cls._scheduler is not None and book_id in cls._scheduler:
             return True
         # Also check in-flight via meta status — covers the queued window.
         meta = AudiobookStore.read_meta(book_id)
@@ -143,7 +256,7 @@ class AudiobookService:
             # Wait up to 5 s for the pipeline to drop the book at its next
             # checkpoint. Each phase calls _check_cancel() between pages.
             for _ in range(50):  # 50 × 100 ms
-                if cls._current_book_id != book_id:
+                if cls._scheduler is None or not cls._scheduler.is_running(book_id):
                     break
                 await asyncio.sleep(0.1)
         AudiobookStore.delete_book(book_id)
@@ -178,6 +291,7 @@ class AudiobookService:
             for p in (
                 AudiobookStore.page_clean_path(book_id, n),
                 AudiobookStore.page_audio_path(book_id, n),
+                AudiobookStore.page_timing_path(book_id, n),
             ):
                 try:
                     if os.path.exists(p):
@@ -185,18 +299,19 @@ class AudiobookService:
                 except OSError:
                     pass
         # Delete final concatenated audio so concat re-runs.
+        AudiobookStore.delete_transcript(book_id)
         for p in (
             AudiobookStore.audio_path(book_id),
             AudiobookStore.transcript_path(book_id),
+            AudiobookStore.timings_path(book_id),
         ):
             try:
                 if os.path.exists(p):
                     os.remove(p)
             except OSError:
                 pass
-        await AudiobookStore.update_meta(
-            book_id, failed_pages=[], error=None, status="queued"
-        )
+        AudiobookStore.clear_page_failures(book_id)
+        await AudiobookStore.update_meta(book_id, error=None, status="queued")
         await cls.enqueue(book_id, api_key)
         return len(failed)
 
@@ -247,7 +362,10 @@ class AudiobookService:
             }:
                 continue
             book_id = meta["book_id"]
-            if status == "cleaning":
+            if meta.get("cleaner") == "local":
+                # Never talks to Gemini; nothing to wait for.
+                await cls.enqueue(book_id, api_key="")
+            elif status == "cleaning":
                 # Needs the API key the user re-supplies via Resume.
                 await AudiobookStore.update_meta(book_id, status="needs_key")
             elif status in {"tts", "concatenating"}:
@@ -262,23 +380,56 @@ class AudiobookService:
     # ---------- pipeline ----------
 
     @classmethod
-    async def _run_pipeline(cls, book_id: str) -> None:
+    async def _run_stage(cls, stage: str, book_id: str) -> str | tuple[str, ...] | None:
+        """PipelineScheduler handler: run one stage (or one slice of it) and
+        return where the book goes next.
+
+        While a book is still being cleaned, each clean slice also forks it
+        into the tts stage, so pages are synthesised as soon as their cleaned
+        text exists (network and CPU busy at once). Sectioning runs after the
+        last clean slice — it only feeds metadata — and concat waits for it;
+        its Gemini windows were already sent as their pages finished
+        cleaning, so by then at most the last one is still outstanding.
+        """
         meta = AudiobookStore.read_meta(book_id)
         if meta is None:
-            print(f"[Audiobook] {book_id}: meta.json missing, skipping")
-            return
+            print(f"[Audiobook] {book_id}: meta missing, dropping from pipeline")
+            return None
 
         api_key = cls._job_keys.get(book_id, "")
+        # Taking this book off a queue moved everyone behind it up.
+        cls._publish_queue()
 
         try:
-            await cls._phase_extract(book_id)
-            await cls._phase_clean(book_id, api_key)
-            # Re-read meta — page_count + voice/speed haven't changed but other
-            # fields might be updated by clean phase.
-            meta = AudiobookStore.read_meta(book_id) or meta
-            await cls._phase_section(book_id, api_key, meta)
-            meta = AudiobookStore.read_meta(book_id) or meta
-            await cls._phase_tts(book_id, meta)
+            if stage == "extract":
+                await cls._phase_extract(book_id)
+                return "clean"
+            if stage == "clean":
+                if not await cls._phase_clean(
+                    book_id, api_key, max_pages=settings.AUDIOBOOK_CLEAN_SLICE_PAGES
+                ):
+                    return ("clean", "tts")
+                # Re-read meta — page_count + voice/speed haven't changed but
+                # other fields might be updated by clean phase.
+                meta = AudiobookStore.read_meta(book_id) or meta
+                await cls._phase_section(book_id, api_key, meta)
+                cls._cleaned.add(book_id)
+                return "tts"
+            streaming = book_id not in cls._cleaned
+            if streaming and meta.get("status") != "cleaning":
+                # Cleaning stopped (failed / cancelled) under this branch.
+                return None
+            outcome = await cls._phase_tts(
+                book_id,
+                meta,
+                max_pages=settings.AUDIOBOOK_TTS_SLICE_PAGES,
+                streaming=streaming,
+            )
+            if outcome == "slice":
+                return "tts"
+            if outcome == "waiting":
+                # The next clean slice forks the book back in here.
+                return None
             actual = await cls._phase_concat(book_id, meta)
             await AudiobookStore.update_meta(
                 book_id, status="done", actual=actual, error=None
@@ -297,10 +448,35 @@ class AudiobookService:
             )
             cls._emit(book_id, "failed", error=str(e))
         except Exception as e:
-            await AudiobookStore.update_meta(book_id, status="failed", error=str(e))
-            cls._emit(book_id, "failed", error=str(e))
-        finally:
-            cls._cancel_flags.pop(book_id, None)
+            print(f"[Audiobook] {book_id} {stage} stage failed: {e}")
+            if AudiobookStore.read_meta(book_id) is not None:
+                await AudiobookStore.update_meta(book_id, status="failed", error=str(e))
+                cls._emit(book_id, "failed", error=str(e))
+        return None
+
+    @classmethod
+    def _on_exit(cls, book_id: str) -> None:
+        """The book left the pipeline (done, failed, cancelled or deleted)."""
+        cls._cancel_flags.pop(book_id, None)
+        cls._job_keys.pop(book_id, None)
+        cls._submitted_at.pop(book_id, None)
+        cls._queue_published.pop(book_id, None)
+        cls._cleaned.discard(book_id)
+        cls._local_cleaned.pop(book_id, None)
+        cls._outline_sections.pop(book_id, None)
+        stream = cls._section_streams.pop(book_id, None)
+        for task in stream.tasks if stream else ():
+            task.cancel()
+
+    @classmethod
+    async def _enter_phase(
+        cls, book_id: str, meta: dict[str, Any], status: str
+    ) -> None:
+        """Set status and announce the phase — once, not on every slice."""
+        if meta.get("status") == status:
+            return
+        await AudiobookStore.update_meta(book_id, status=status)
+        cls._emit(book_id, "phase_started", phase=status)
 
     # ---------- phase: extract ----------
 
@@ -330,20 +506,25 @@ class AudiobookService:
                 cls._executor, TextExtractor.render_cover, book_id
             )
 
-        # Track content hashes so duplicate pages (e.g. DocuSign PDFs that embed
-        # the same page twice) are replaced with a silence marker rather than
-        # generating identical audio twice.
-        seen_content_hashes: set[str] = set()
+        # Duplicate pages (e.g. DocuSign PDFs that embed the same page twice, or
+        # the same PDF page with a different running header/footer) are replaced
+        # with a silence marker rather than cleaned and voiced twice. Each
+        # page's fingerprint is persisted on first extraction, so a resume
+        # rebuilds the index from the store without re-reading any page file.
+        fingerprints = AudiobookStore.read_page_fingerprints(book_id)
+        dup_index = DuplicateIndex()
 
         for n in range(1, page_count + 1):
             cls._check_cancel(book_id)
+            started = time.perf_counter()
             # Honor /speak preemption between pages.
-            async with interactive_tts_lock:
-                pass
+            await interactive_tts_gate.checkpoint()
             out = AudiobookStore.page_raw_path(book_id, n)
-            if not os.path.exists(out):
+            font_heading = None
+            extracted = not os.path.exists(out)
+            if extracted:
                 if is_pdf:
-                    await loop.run_in_executor(
+                    font_heading = await loop.run_in_executor(
                         cls._executor, PDFExtractor.extract_one, book_id, n
                     )
                 else:
@@ -351,38 +532,29 @@ class AudiobookService:
                         cls._executor, TextExtractor.extract_one, book_id, n
                     )
 
-            # Deduplication: if this page's content is byte-identical to an
-            # earlier page (content hash matches), pre-write "-" to the clean
-            # file so the clean phase skips it and TTS writes silence instead
-            # of repeating the same audio.
-            # On resume, pages with both raw and clean files already present
-            # must still be hashed so the seen_content_hashes set is correctly
-            # populated for subsequent pages.
-            clean_path = AudiobookStore.page_clean_path(book_id, n)
-            if os.path.exists(out):
-                try:
-                    with open(out, encoding="utf-8") as f:
-                        raw = f.read()
-                    stripped = raw.strip()
-                    if len(stripped) > 100:  # ignore trivially short / blank pages
-                        h = hashlib.md5(stripped.encode()).hexdigest()
-                        if h in seen_content_hashes:
-                            if not os.path.exists(clean_path):
-                                # Duplicate — write silence marker, bypass Gemini + TTS
-                                tmp = clean_path + ".tmp"
-                                os.makedirs(os.path.dirname(clean_path), exist_ok=True)
-                                with open(tmp, "w", encoding="utf-8") as f:
-                                    f.write("-")
-                                os.replace(tmp, clean_path)
-                        else:
-                            seen_content_hashes.add(h)
-                except OSError:
-                    pass
-
-            await AudiobookStore.update_meta(
-                book_id,
-                phase_progress={"page_done": n, "page_total": page_count},
-            )
+            fp = fingerprints.get(n)
+            if fp is None and os.path.exists(out):
+                fp = cls._fingerprint_page(book_id, n, out, dup_index, is_pdf)
+                if fp is not None and fp["duplicate_of"] is None:
+                    cls._record_heading(book_id, n, out, font_heading, is_pdf)
+            if fp is not None:
+                if fp["duplicate_of"] is None:
+                    dup_index.add(n, fp["content_hash"], fp["body_hash"])
+                else:
+                    # Duplicate — write silence marker, bypass Gemini + TTS.
+                    clean_path = AudiobookStore.page_clean_path(book_id, n)
+                    if not os.path.exists(clean_path):
+                        tmp = clean_path + ".tmp"
+                        os.makedirs(os.path.dirname(clean_path), exist_ok=True)
+                        with open(tmp, "w", encoding="utf-8") as f:
+                            f.write("-")
+                        os.replace(tmp, clean_path)
+
+            AudiobookStore.record_page_progress(book_id, n, n, page_count)
+            if extracted:
+                AUDIOBOOK_PAGE_SECONDS.observe(
+                    time.perf_counter() - started, phase="extract"
+                )
             cls._emit(
                 book_id, "page_done", phase="extracting", page=n, total=page_count
             )
@@ -390,6 +562,49 @@ class AudiobookService:
         await AudiobookStore.update_meta(book_id, page_count=page_count)
         cls._emit(book_id, "phase_finished", phase="extracting")
 
+    @staticmethod
+    def _fingerprint_page(
+        book_id: str, n: int, raw_path: str, dup_index: DuplicateIndex, is_pdf: bool
+    ) -> dict[str, Any] | None:
+        """Hash a freshly extracted page, match it against earlier pages and
+        persist the result. Trivially short / blank pages are recorded with no
+        hash so they are never treated as duplicates. Only PDF pages carry
+        running headers/footers, so only they are matched on body alone."""
+        try:
+            with open(raw_path, encoding="utf-8") as f:
+                stripped = f.read().strip()
+        except OSError:
+            return None
+        content_hash: str | None = None
+        body_hash: str | None = None
+        duplicate_of: int | None = None
+        if len(stripped) > 100:  # ignore trivially short / blank pages
+            content_hash = PageFingerprint.content_hash(stripped)
+            if is_pdf:
+                body_hash = PageFingerprint.body_hash(stripped)
+            duplicate_of = dup_index.find(content_hash, body_hash)
+        AudiobookStore.write_page_fingerprint(
+            book_id, n, content_hash, body_hash, duplicate_of
+        )
+        return {
+            "content_hash": content_hash,
+            "body_hash": body_hash,
+            "duplicate_of": duplicate_of,
+        }
+
+    @staticmethod
+    def _record_heading(
+        book_id: str, n: int, raw_path: str, font_heading: str | None, is_pdf: bool
+    ) -> None:
+        """Persist the heading a freshly extracted page starts with, set apart
+        by type (PDF) or by its wording, for local section detection."""
+        heading = font_heading
+        if heading is None:
+            with open(raw_path, encoding="utf-8") as f:
+                heading = text_heading(f.read(), top_only=is_pdf)
+        if heading:
+            AudiobookStore.update_page(book_id, n, heading=heading)
+
     # ---------- phase: section detection ----------
 
     @classmethod
@@ -399,70 +614,33 @@ class AudiobookService:
         await AudiobookStore.update_meta(book_id, status="sectioning")
         cls._emit(book_id, "phase_started", phase="sectioning")
 
-        file_ext = meta.get("file_ext", "pdf")
         page_count = int(meta.get("page_count") or 0)
-        loop = asyncio.get_running_loop()
-
-        # Path A: try the PDF's own outline first (no API call needed).
-        # For non-PDF files there is no outline; skip straight to Gemini.
-        if file_ext == "pdf":
-            source_path = AudiobookStore.source_file_path(book_id, file_ext)
-            outline = await loop.run_in_executor(
-                cls._executor, PDFExtractor.read_outline, source_path
-            )
+        # Path A: the PDF outline or the headings found at extraction.
+        if book_id in cls._outline_sections:
+            sections = cls._outline_sections.pop(book_id)
         else:
-            outline = None
-
-        sections: list[dict] = []
-        if outline:
-            # Convert flat outline (title, start_page) to contiguous sections.
-            sorted_outline = sorted(outline, key=lambda x: x["start_page"])
-            for i, entry in enumerate(sorted_outline):
-                end_page = (
-                    sorted_outline[i + 1]["start_page"] - 1
-                    if i + 1 < len(sorted_outline)
-                    else page_count
+            sections = await cls._local_sections(book_id, meta)
+        stream = cls._section_streams.pop(book_id, None)
+        if sections is None and stream is not None:
+            # Path B: Gemini windows, most already run during cleaning.
+            for i in stream.rest():
+                stream.tasks.append(
+                    asyncio.create_task(cls._detect_window(book_id, api_key, stream, i))
                 )
-                sections.append(
-                    {
-                        "title": entry["title"],
-                        "start_page": entry["start_page"],
-                        "end_page": max(entry["start_page"], end_page),
-                    }
-                )
-            if sections and sections[0]["start_page"] > 1:
-                sections.insert(
-                    0,
-                    {
-                        "title": "Front Matter",
-                        "start_page": 1,
-                        "end_page": sections[0]["start_page"] - 1,
-                    },
-                )
-        else:
-            # Path B: ask Gemini.
-            cleaned_pages: list[str] = []
-            for n in range(1, page_count + 1):
-                p = AudiobookStore.page_clean_path(book_id, n)
-                if not os.path.exists(p):
-                    cleaned_pages.append("")
-                    continue
-                with open(p, encoding="utf-8") as f:
-                    cleaned_pages.append(f.read())
             try:
-                sections = await asyncio.wait_for(
-                    GeminiCleaner.detect_sections(api_key, cleaned_pages),
-                    timeout=120.0,
-                )
-            except asyncio.TimeoutError:
-                print(f"[Audiobook] {book_id} section detection timed out, skipping")
-                sections = []
-            except GeminiAuthError:
-                raise
-            except Exception as e:
-                print(f"[Audiobook] {book_id} section detection failed: {e}")
-                sections = []
-
+                await asyncio.gather(*stream.tasks)
+            finally:
+                for task in stream.tasks:
+                    task.cancel()
+            sections = stream.sections()
+        if not sections:
+            # Headings too sparse or too dense to trust are still better than
+            # one section for the whole book.
+            sections = sections_from_headings(
+                AudiobookStore.read_page_headings(book_id),
+                page_count,
+                confident_only=False,
+            )
         if not sections:
             sections = [
                 {
@@ -480,18 +658,125 @@ class AudiobookService:
         )
         cls._emit(book_id, "phase_finished", phase="sectioning")
 
-    # ---------- phase: clean ----------
+    @classmethod
+    async def _local_sections(
+        cls, book_id: str, meta: dict[str, Any]
+    ) -> list[dict] | None:
+        """Sections known without Gemini: the PDF's own outline, else the
+        page headings recorded at extraction when they look like a chapter
+        list. None when neither is available."""
+        file_ext = meta.get("file_ext", "pdf")
+        page_count = int(meta.get("page_count") or 0)
+        outline = None
+        if file_ext == "pdf":
+            source_path = AudiobookStore.source_file_path(book_id, file_ext)
+            outline = await asyncio.get_running_loop().run_in_executor(
+                cls._executor, PDFExtractor.read_outline, source_path
+            )
+        if not outline:
+            return sections_from_headings(
+                AudiobookStore.read_page_headings(book_id), page_count
+            )
+
+        # Convert flat outline (title, start_page) to contiguous sections.
+        sections: list[dict] = []
+        sorted_outline = sorted(outline, key=lambda x: x["start_page"])
+        for i, entry in enumerate(sorted_outline):
+            end_page = (
+                sorted_outline[i + 1]["start_page"] - 1
+                if i + 1 < len(sorted_outline)
+                else page_count
+            )
+            sections.append(
+                {
+                    "title": entry["title"],
+                    "start_page": entry["start_page"],
+                    "end_page": max(entry["start_page"], end_page),
+                }
+            )
+        if sections and sections[0]["start_page"] > 1:
+            sections.insert(
+                0,
+                {
+                    "title": "Front Matter",
+                    "start_page": 1,
+                    "end_page": sections[0]["start_page"] - 1,
+                },
+            )
+        return sections
+
+    @classmethod
+    async def _open_section_stream(
+        cls, book_id: str, api_key: str, meta: dict[str, Any]
+    ) -> SectionStream | None:
+        """The book's SectionStream, created on its first clean slice of this
+        run and seeded with pages cleaned earlier. None when sectioning needs
+        no Gemini windows (Path A applies, or there is no key). Path A's
+        sections are kept for _phase_section, so the outline is read once."""
+        if book_id in cls._section_streams:
+            return cls._section_streams[book_id]
+        stream = None
+        sections = await cls._local_sections(book_id, meta)
+        cls._outline_sections[book_id] = sections
+        if api_key and sections is None:
+            page_count = int(meta.get("page_count") or 0)
+            excerpt = GeminiCleaner.SECTION_PAGE_CHARS
+            stream = SectionStream(
+                page_count, GeminiCleaner.section_windows(page_count), excerpt
+            )
+            for n in range(1, page_count + 1):
+                try:
+                    path = AudiobookStore.page_clean_path(book_id, n)
+                    with open(path, encoding="utf-8") as f:
+                        stream.add(n, f.read(excerpt))
+                except FileNotFoundError:
+                    continue
+        cls._section_streams[book_id] = stream
+        return stream
 
     @classmethod
-    async def _phase_clean(cls, book_id: str, api_key: str) -> None:
-        await AudiobookStore.update_meta(book_id, status="cleaning")
-        cls._emit(book_id, "phase_started", phase="cleaning")
+    def _launch_section_windows(cls, book_id: str, api_key: str) -> None:
+        """Start a Gemini call for every window whose pages are all cleaned."""
+        stream = cls._section_streams.get(book_id)
+        if stream is None:
+            return
+        for i in stream.ready():
+            stream.tasks.append(
+                asyncio.create_task(cls._detect_window(book_id, api_key, stream, i))
+            )
 
+    @classmethod
+    async def _detect_window(
+        cls, book_id: str, api_key: str, stream: SectionStream, i: int
+    ) -> None:
+        first, pages = stream.window_pages(i)
+        await interactive_tts_gate.checkpoint()
+        try:
+            found = await GeminiCleaner.detect_window(api_key, first, pages)
+        except GeminiTimeoutError:
+            print(f"[Audiobook] {book_id} section window @page {first} timed out")
+            return
+        except GeminiAuthError:
+            raise
+        except Exception as e:
+            print(f"[Audiobook] {book_id} section window @page {first} failed: {e}")
+            return
+        stream.add_found(i, found)
+
+    # ---------- phase: clean ----------
+
+    @classmethod
+    async def _phase_clean(
+        cls, book_id: str, api_key: str, max_pages: int | None = None
+    ) -> bool:
+        """Clean pending pages, at most `max_pages` of them (falsy = all).
+        Returns True once every page has a cleaned file."""
         meta = AudiobookStore.read_meta(book_id) or {}
+        await cls._enter_phase(book_id, meta, "cleaning")
+
         file_ext = meta.get("file_ext", "pdf")
         is_pdf = file_ext == "pdf"
         page_count = int(meta.get("page_count") or 0)
-        failed: list[int] = list(meta.get("failed_pages") or [])
 
         # Pages still needing cleaning (skip already-done for resume).
         pending = [
@@ -499,19 +784,50 @@ class AudiobookService:
             for n in range(1, page_count + 1)
             if not os.path.exists(AudiobookStore.page_clean_path(book_id, n))
         ]
+        # Cleaned pages feed section detection from here on (_write_clean).
+        await cls._open_section_stream(book_id, api_key, meta)
+        cleaner = meta.get("cleaner") or "gemini"
+        if cleaner != "gemini" and pending:
+            # Rule-based pass over the whole book at once; in "auto" mode the
+            # pages it flags as messy are left for Gemini below.
+            pending = await cls._clean_locally(
+                book_id,
+                pending,
+                page_count,
+                is_pdf,
+                defer_messy=cleaner == "auto" and bool(api_key),
+            )
         # Pages already done are still progress — emit instantly so UI catches up.
         done_count = page_count - len(pending)
+        finished = not max_pages or len(pending) <= max_pages
+        if not finished:
+            pending = pending[:max_pages]
+
+        # Image-only pages are rendered in the OCR process pool ahead of
+        # their Gemini calls.
+        source_path = AudiobookStore.source_file_path(book_id, file_ext)
+        ocr_pages = [n for n in pending if is_pdf and cls._is_image_page(book_id, n)]
+        renders = RenderPrefetcher(source_path, ocr_pages, settings.OCR_PREFETCH_PAGES)
+
+        # Pages batch-cleaned just now are not cache hits for the metric.
+        prefilled: set[str] = set()
+        if settings.GEMINI_BATCH_TOKENS:
+            prefilled = await cls._prefill_clean_cache(
+                book_id, api_key, pending, is_pdf
+            )
 
-        sem = asyncio.Semaphore(cls._CLEAN_PARALLELISM)
-        # Lock around shared state (failed list, done counter, meta writes).
+        # Only bounds this book's fan-out; how many Gemini calls actually run
+        # is decided by the shared, adaptive gemini_limiter.
+        sem = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY)
+        # Lock around the shared done counter.
         state_lock = asyncio.Lock()
         progress = {"done": done_count}
 
         async def clean_one(n: int) -> None:
+            started = time.perf_counter()
             async with sem:
-                # Honor /speak preemption (every page acquires after Gemini network call too)
-                async with interactive_tts_lock:
-                    pass
+                # Honor /speak preemption before each page's Gemini call.
+                await interactive_tts_gate.checkpoint()
                 cls._check_cancel(book_id)
 
                 raw_path = AudiobookStore.page_raw_path(book_id, n)
@@ -520,63 +836,57 @@ class AudiobookService:
                 with open(raw_path, encoding="utf-8") as f:
                     raw_text = f.read()
 
+                state = "done"
                 try:
                     if is_pdf and len(raw_text.strip()) < _OCR_TEXT_THRESHOLD:
-                        # Image page (PDF only) — render and OCR+clean via Gemini vision.
-                        source_path = AudiobookStore.source_file_path(book_id, file_ext)
-                        image_bytes = await asyncio.get_running_loop().run_in_executor(
-                            cls._executor,
-                            PDFExtractor.render_page_image,
-                            source_path,
-                            n,
+                        # Image page (PDF only) — OCR+clean, by Gemini vision
+                        # or the local engine (OCR_POLICY).
+                        image_bytes = await renders.take(n)
+                        cleaned, state = await cls._ocr_page(
+                            book_id, n, api_key, image_bytes
                         )
-                        try:
-                            cleaned = await asyncio.wait_for(
-                                GeminiCleaner.ocr_page(api_key, image_bytes),
-                                timeout=90.0,
-                            )
-                        except asyncio.TimeoutError:
-                            print(
-                                f"[Audiobook] {book_id} page {n} Gemini OCR timeout, using raw text"
-                            )
-                            cleaned = raw_text or "-"
                     else:
-                        try:
-                            cleaned = await asyncio.wait_for(
-                                GeminiCleaner.clean_page(api_key, raw_text),
-                                timeout=90.0,
-                            )
-                        except asyncio.TimeoutError:
-                            print(
-                                f"[Audiobook] {book_id} page {n} Gemini clean timeout, using raw text"
-                            )
-                            cleaned = raw_text or "-"
+                        # Identical raw pages (in this or any other book,
+                        # this run or an earlier one) are cleaned once per
+                        # model + prompt; only real Gemini output is cached.
+                        # A Gemini timeout fails the page like any other
+                        # error, so retry_failed picks it up later.
+                        raw_hash = PageFingerprint.content_hash(raw_text)
+                        cached = (
+                            cls._read_shared_clean(raw_hash)
+                            if raw_text.strip()
+                            else None
+                        )
+                        if raw_text.strip() and raw_hash not in prefilled:
+                            cache_lookup("clean", cached is not None)
+                        if cached is not None:
+                            cleaned = cached
+                        else:
+                            cleaned = await GeminiCleaner.clean_page(api_key, raw_text)
+                            if raw_text.strip():
+                                AudiobookStore.write_shared_clean(
+                                    raw_hash, MODEL_NAME, CLEAN_PROMPT_HASH, cleaned
+                                )
                 except GeminiAuthError:
                     raise
                 except Exception as e:
                     print(f"[Audiobook] {book_id} page {n} clean failed: {e}")
-                    async with state_lock:
-                        failed.append(n)
-                        await AudiobookStore.update_meta(book_id, failed_pages=failed)
+                    AudiobookStore.mark_page_failed(book_id, n, "cleaning", str(e))
+                    state = "failed"
                     cls._emit(
                         book_id, "page_failed", phase="cleaning", page=n, error=str(e)
                     )
                     cleaned = raw_text or "-"
 
-                out = AudiobookStore.page_clean_path(book_id, n)
-                tmp = out + ".tmp"
-                with open(tmp, "w", encoding="utf-8") as f:
-                    f.write(cleaned)
-                os.replace(tmp, out)
+                cls._write_clean(book_id, n, cleaned)
+                AUDIOBOOK_PAGE_SECONDS.observe(
+                    time.perf_counter() - started, phase="clean"
+                )
 
                 async with state_lock:
                     progress["done"] += 1
-                    await AudiobookStore.update_meta(
-                        book_id,
-                        phase_progress={
-                            "page_done": progress["done"],
-                            "page_total": page_count,
-                        },
+                    AudiobookStore.record_page_progress(
+                        book_id, n, progress["done"], page_count, clean_state=state
                     )
                 cls._emit(
                     book_id,
@@ -588,32 +898,247 @@ class AudiobookService:
 
         try:
             await asyncio.gather(*(clean_one(n) for n in pending))
-        except GeminiAuthError:
-            raise
+        finally:
+            renders.close()
+        cls._launch_section_windows(book_id, api_key)
+
+        if finished:
+            cls._emit(book_id, "phase_finished", phase="cleaning")
+        return finished
+
+    @classmethod
+    async def _ocr_page(
+        cls, book_id: str, n: int, api_key: str, image_bytes: bytes
+    ) -> tuple[str, str]:
+        """Read one scanned page per OCR_POLICY (see local_ocr). Returns the
+        cleaned text and its clean_state: "done" from Gemini, "local" from
+        the local engine."""
+        policy = LocalOCR.policy()
+        local = LocalOCR.available()
+        if local and (policy == "local" or not api_key):
+            return await cls._ocr_locally(image_bytes), "local"
+        escalated = None
+        if local and policy == "escalate":
+            text, confidence = await LocalOCR.read(image_bytes)
+            escalated = cls._tidy_ocr(text)
+            if confidence >= settings.OCR_ESCALATE_CONFIDENCE:
+                return escalated, "local"
+            print(
+                f"[Audiobook] {book_id} page {n} local OCR confidence "
+                f"{confidence:.0f}, escalating to Gemini"
+            )
+        fallback = local and policy == "fallback"
+        if fallback and gemini_limiter.snapshot()["cooldown_seconds"] > 0:
+            # Gemini is rate limited right now; don't queue behind it.
+            return await cls._ocr_locally(image_bytes), "local"
+        try:
+            cleaned = await GeminiCleaner.ocr_page(api_key, image_bytes)
+        except (GeminiRateLimitError, GeminiTimeoutError) as e:
+            if escalated is not None:
+                # A low-confidence local read still beats a failed page.
+                print(
+                    f"[Audiobook] {book_id} page {n} Gemini OCR unavailable, "
+                    "keeping local OCR"
+                )
+                return escalated, "local"
+            if not (fallback and isinstance(e, GeminiRateLimitError)):
+                raise
+            print(f"[Audiobook] {book_id} page {n} rate limited, OCR locally")
+            return await cls._ocr_locally(image_bytes), "local"
+        return cleaned, "done"
+
+    @classmethod
+    async def _ocr_locally(cls, image_bytes: bytes) -> str:
+        text, _ = await LocalOCR.read(image_bytes)
+        return cls._tidy_ocr(text)
 
-        cls._emit(book_id, "phase_finished", phase="cleaning")
+    @staticmethod
+    def _tidy_ocr(text: str) -> str:
+        """Local OCR output gets the rule-based clean (hyphenation, reflow,
+        page numbers) that Gemini's OCR prompt does itself."""
+        return LocalCleaner.clean_pages([text])[0][0]
+
+    @staticmethod
+    def _is_image_page(book_id: str, n: int) -> bool:
+        try:
+            with open(AudiobookStore.page_raw_path(book_id, n), encoding="utf-8") as f:
+                return len(f.read().strip()) < _OCR_TEXT_THRESHOLD
+        except FileNotFoundError:
+            return False
+
+    @classmethod
+    def _write_clean(cls, book_id: str, n: int, cleaned: str) -> None:
+        out = AudiobookStore.page_clean_path(book_id, n)
+        tmp = out + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(cleaned)
+        os.replace(tmp, out)
+        AudiobookStore.index_page_text(book_id, n, cleaned)
+        stream = cls._section_streams.get(book_id)
+        if stream is not None:
+            stream.add(n, cleaned)
+
+    @classmethod
+    async def _clean_locally(
+        cls,
+        book_id: str,
+        pending: list[int],
+        page_count: int,
+        is_pdf: bool,
+        defer_messy: bool,
+    ) -> list[int]:
+        """Clean `pending` pages with LocalCleaner, which needs every page of
+        the book to spot running headers. Returns the pages left over: with
+        defer_messy, those it flags as messy plus image-only PDF pages;
+        image-only pages also whenever a local OCR engine can read them.
+        The book is cleaned once per run; later slices reuse the result."""
+        local = cls._local_cleaned.get(book_id)
+        if local is None:
+            local = await cls._local_clean_book(book_id, page_count, is_pdf)
+            cls._local_cleaned[book_id] = local
+
+        deferred: list[int] = []
+        done = page_count - len(pending)
+        for n in pending:
+            page = local[n - 1]
+            if page is None:
+                continue
+            cleaned, messy, image_only = page
+            if (defer_messy and messy) or (
+                image_only and (defer_messy or LocalOCR.available())
+            ):
+                deferred.append(n)
+                continue
+            cls._write_clean(book_id, n, cleaned)
+            done += 1
+            AudiobookStore.record_page_progress(
+                book_id, n, done, page_count, clean_state="local"
+            )
+            cls._emit(book_id, "page_done", phase="cleaning", page=n, total=page_count)
+        print(
+            f"[Audiobook] {book_id} cleaned {len(pending) - len(deferred)} pages "
+            f"locally, {len(deferred)} left for Gemini"
+        )
+        return deferred
+
+    @classmethod
+    async def _local_clean_book(
+        cls, book_id: str, page_count: int, is_pdf: bool
+    ) -> list[tuple[str, bool, bool] | None]:
+        raws: list[str | None] = []
+        for n in range(1, page_count + 1):
+            raw_path = AudiobookStore.page_raw_path(book_id, n)
+            try:
+                with open(raw_path, encoding="utf-8") as f:
+                    raws.append(f.read())
+            except FileNotFoundError:
+                raws.append(None)
+        results = await asyncio.get_running_loop().run_in_executor(
+            cls._executor, LocalCleaner.clean_pages, [r or "" for r in raws]
+        )
+        return [
+            (
+                None
+                if raw is None
+                else (cleaned, messy, is_pdf and len(raw.strip()) < _OCR_TEXT_THRESHOLD)
+            )
+            for raw, (cleaned, messy) in zip(raws, results, strict=True)
+        ]
+
+    @staticmethod
+    def _read_shared_clean(raw_hash: str) -> str | None:
+        """Gemini's cleaned text for a raw page, from the shared cache: as
+        cleaned on its own, else as cleaned in a batch."""
+        for prompt_hash in (CLEAN_PROMPT_HASH, BATCH_PROMPT_HASH):
+            cached = AudiobookStore.read_shared_clean(raw_hash, MODEL_NAME, prompt_hash)
+            if cached is not None:
+                return cached
+        return None
+
+    @classmethod
+    async def _prefill_clean_cache(
+        cls, book_id: str, api_key: str, pages: list[int], is_pdf: bool
+    ) -> set[str]:
+        """Batched cleaning: pack text pages missing from the shared clean
+        cache into multi-page Gemini requests and store the verified results
+        in that cache, where the per-page pass picks them up. Pages a batch
+        could not split back fall through to a per-page clean_page call.
+        Returns the raw hashes it cached."""
+        todo: list[tuple[str, str]] = []  # (raw_hash, raw_text)
+        seen: set[str] = set()
+        for n in pages:
+            raw_path = AudiobookStore.page_raw_path(book_id, n)
+            if not os.path.exists(raw_path):
+                continue
+            with open(raw_path, encoding="utf-8") as f:
+                raw_text = f.read()
+            stripped = raw_text.strip()
+            if not stripped or (is_pdf and len(stripped) < _OCR_TEXT_THRESHOLD):
+                continue
+            raw_hash = PageFingerprint.content_hash(raw_text)
+            if raw_hash in seen or cls._read_shared_clean(raw_hash) is not None:
+                continue
+            seen.add(raw_hash)
+            todo.append((raw_hash, raw_text))
+
+        raws = [raw for _, raw in todo]
+        batches = [
+            b
+            for b in GeminiCleaner.pack_batches(raws, settings.GEMINI_BATCH_TOKENS)
+            if len(b) > 1
+        ]
+
+        prefilled: set[str] = set()
+
+        async def run(batch: list[int]) -> None:
+            await interactive_tts_gate.checkpoint()
+            cls._check_cancel(book_id)
+            cleaned = await GeminiCleaner.clean_batch(api_key, [raws[i] for i in batch])
+            for i, text in zip(batch, cleaned):
+                if text is not None:
+                    AudiobookStore.write_shared_clean(
+                        todo[i][0], MODEL_NAME, BATCH_PROMPT_HASH, text
+                    )
+                    prefilled.add(todo[i][0])
+
+        await asyncio.gather(*(run(b) for b in batches))
+        return prefilled
 
     # ---------- phase: tts ----------
 
     @classmethod
-    async def _phase_tts(cls, book_id: str, meta: dict[str, Any]) -> None:
-        await AudiobookStore.update_meta(book_id, status="tts")
-        cls._emit(book_id, "phase_started", phase="tts")
+    async def _phase_tts(
+        cls,
+        book_id: str,
+        meta: dict[str, Any],
+        max_pages: int | None = None,
+        streaming: bool = False,
+    ) -> str:
+        """Render page WAVs, synthesising at most `max_pages` of them (falsy =
+        all). Returns "done" once every page has a WAV, "slice" when it
+        stopped at max_pages.
+
+        streaming: cleaning is still running. Pages without cleaned text are
+        skipped rather than silenced (returning "waiting" if that is all that
+        is left), and the book's status / phase counters stay with cleaning.
+        """
+        if not streaming:
+            await cls._enter_phase(book_id, meta, "tts")
 
         page_count = int(meta.get("page_count") or 0)
         voice = meta.get("voice") or "af_bella"
         speed = float(meta.get("speed") or 1.0)
-        failed: list[int] = list(
-            (AudiobookStore.read_meta(book_id) or {}).get("failed_pages") or []
-        )
 
         await EngineManager.ensure_loaded()
 
+        rendered = 0
+        waiting = False
         for n in range(1, page_count + 1):
+            if max_pages and rendered >= max_pages:
+                return "slice"
             cls._check_cancel(book_id)
-            # Wait for any interactive /speak to finish before grabbing the engine.
-            async with interactive_tts_lock:
-                pass
+            # Pages are checkpointed segment by segment inside generate
+            # (background=True), so a /speak preempts within one segment.
 
             out_path = AudiobookStore.page_audio_path(book_id, n)
             if os.path.exists(out_path):
@@ -622,12 +1147,18 @@ class AudiobookService:
 
             clean_path = AudiobookStore.page_clean_path(book_id, n)
             if not os.path.exists(clean_path):
+                if streaming:
+                    waiting = True
+                    continue
                 # Skip pages with no cleaned text.
                 cls._write_silence_wav(out_path, 0.5)
                 continue
             with open(clean_path, encoding="utf-8") as f:
                 text = f.read().strip() or "-"
 
+            state = "done"
+            rendered += 1
+            started = time.perf_counter()
             # P3: blank-page marker is silence, never spoken aloud as "dash".
             # GeminiCleaner returns the literal "-" string for empty pages.
             if text == "-":
@@ -635,32 +1166,75 @@ class AudiobookService:
             elif text.startswith("[blank") and text.endswith("]"):
                 cls._write_silence_wav(out_path, 0.3)
             else:
+                # Same cleaned text + voice + speed already rendered for any
+                # book → hardlink the shared WAV instead of re-synthesising.
+                audio_key = AudiobookStore.shared_audio_key(text, voice, speed)
                 try:
-                    samples = await cls._generate_full_page(text, voice, speed)
-                    cls._write_wav_from_samples(out_path, samples)
+                    linked = AudiobookStore.link_shared_audio(
+                        book_id, n, audio_key, out_path
+                    )
+                    cache_lookup("audio", linked)
+                    if not linked:
+                        timings: list[SegmentTiming] = []
+                        samples = await cls._generate_full_page(
+                            text, voice, speed, timings
+                        )
+                        # Sidecar first: the WAV is the page checkpoint, so a
+                        # crash in between re-renders both.
+                        TimingIndex.write(
+                            AudiobookStore.page_timing_path(book_id, n),
+                            TimingIndex.from_segments(timings, n),
+                            SAMPLE_RATE,
+                        )
+                        cls._write_wav_from_samples(out_path, samples)
+                        AudiobookStore.publish_shared_audio(
+                            book_id, n, audio_key, out_path
+                        )
                 except Exception as e:
                     print(f"[Audiobook] {book_id} page {n} tts failed: {e}")
-                    failed.append(n)
-                    await AudiobookStore.update_meta(book_id, failed_pages=failed)
+                    AudiobookStore.mark_page_failed(book_id, n, "tts", str(e))
+                    state = "failed"
                     cls._emit(book_id, "page_failed", phase="tts", page=n, error=str(e))
+                    try:
+                        os.remove(AudiobookStore.page_timing_path(book_id, n))
+                    except OSError:
+                        pass
                     cls._write_silence_wav(out_path, 0.5)
 
             EngineManager.touch()
-            await AudiobookStore.update_meta(
+            AUDIOBOOK_PAGE_SECONDS.observe(time.perf_counter() - started, phase="tts")
+            pcm_bytes = max(0, os.path.getsize(out_path) - WAV_HEADER_SIZE)
+            AudiobookStore.record_page_progress(
                 book_id,
-                phase_progress={"page_done": n, "page_total": page_count},
+                n,
+                None if streaming else n,
+                page_count,
+                tts_state=state,
+                audio_seconds=pcm_bytes / (SAMPLE_RATE * BYTES_PER_SAMPLE),
             )
             cls._emit(book_id, "page_done", phase="tts", page=n, total=page_count)
 
+        if waiting:
+            return "waiting"
         cls._emit(book_id, "phase_finished", phase="tts")
+        return "done"
 
     @classmethod
     async def _generate_full_page(
-        cls, text: str, voice: str, speed: float
+        cls,
+        text: str,
+        voice: str,
+        speed: float,
+        timings: list[SegmentTiming] | None = None,
     ) -> np.ndarray:
-        """Drain the EngineManager.generate async generator into one float32 array."""
+        """Drain the EngineManager.generate async generator into one float32 array.
+
+        Segment timings are appended to `timings` when given.
+        """
         chunks: list[np.ndarray] = []
-        async for chunk in EngineManager.generate(text, voice, speed):
+        async for chunk in EngineManager.generate(
+            text, voice, speed, timings=timings, background=True
+        ):
             chunks.append(chunk)
         if not chunks:
             return np.zeros(int(0.3 * SAMPLE_RATE), dtype=np.float32)
@@ -740,30 +1314,53 @@ class AudiobookService:
             sections=timed_sections,
         )
 
-        # Write transcript.json (sections + page_to_time + per-page text).
-        try:
-            page_texts: dict[str, str] = {}
-            for n in range(1, page_count + 1):
+        # Per-page transcript rows with each page's audio span, streamed one
+        # page at a time (sections + page_to_time already live in meta).
+        def transcript_rows():
+            for n, sz in enumerate(page_bytes, start=1):
                 cp = AudiobookStore.page_clean_path(book_id, n)
-                if os.path.exists(cp):
-                    with open(cp, encoding="utf-8") as f:
-                        page_texts[str(n)] = f.read()
-            transcript = {
-                "book_id": book_id,
-                "sections": timed_sections,
-                "page_to_time": page_to_time,
-                "total_audio_seconds": total_seconds,
-                "pages": page_texts,
-            }
-            tpath = AudiobookStore.transcript_path(book_id)
-            tmp = tpath + ".tmp"
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(transcript, f, ensure_ascii=False)
-            os.replace(tmp, tpath)
+                if not os.path.exists(cp):
+                    continue
+                with open(cp, encoding="utf-8") as f:
+                    text = f.read()
+                start = page_to_time[str(n)]
+                yield n, start, start + sz / (SAMPLE_RATE * BYTES_PER_SAMPLE), text
+
+        try:
+            AudiobookStore.write_transcript(book_id, transcript_rows())
         except Exception as e:
-            print(f"[Audiobook] {book_id} transcript.json write failed: {e}")
+            print(f"[Audiobook] {book_id} transcript write failed: {e}")
+
+        # Book-level timing index: per-page segment offsets shifted to their
+        # absolute sample position in audio.wav.
+        def page_timings():
+            base = 0
+            for n, sz in enumerate(page_bytes, start=1):
+                tp = AudiobookStore.page_timing_path(book_id, n)
+                if os.path.exists(tp):
+                    try:
+                        records, _ = TimingIndex.read(tp)
+                    except (OSError, ValueError) as e:
+                        print(f"[Audiobook] {book_id} page {n} timings unreadable: {e}")
+                    else:
+                        yield n, records, base
+                base += sz // BYTES_PER_SAMPLE
+
+        try:
+            TimingIndex.write(
+                AudiobookStore.timings_path(book_id),
+                TimingIndex.merge(page_timings()),
+                SAMPLE_RATE,
+            )
+        except Exception as e:
+            print(f"[Audiobook] {book_id} timing index write failed: {e}")
 
-        # Build actual stats.
+        # Build actual stats. Locally cleaned pages cost nothing.
+        local_pages = {
+            p["page_no"]
+            for p in AudiobookStore.read_pages(book_id)
+            if p["clean_state"] == "local"
+        }
         words_actual = 0
         chars_actual = 0
         for n in range(1, page_count + 1):
@@ -772,7 +1369,8 @@ class AudiobookService:
                 with open(cp, encoding="utf-8") as f:
                     text = f.read()
                     words_actual += len(text.split())
-                    chars_actual += len(text)
+                    if n not in local_pages:
+                        chars_actual += len(text)
 
         created_at = meta.get("created_at", _now_iso())
         try:
@@ -843,7 +1441,7 @@ class AudiobookService:
         word_count = sample_words * page_count
         # Kokoro ~ 165 wpm = 2.75 wps at speed=1
         audio_seconds = word_count / max(0.01, 2.75 * speed)
-        tts_seconds = audio_seconds / 3.5
+        tts_seconds = audio_seconds / _TTS_REALTIME_FACTOR
         clean_seconds = page_count * 1.2
         extract_seconds = page_count * 0.05
         processing_seconds = (
@@ -9,25 +9,86 @@ Layout under {AUDIOBOOKS_DIR}/{book_id}/:
   audio.wav                     final concatenated
   transcript.json               sections + page→time map (Phase 2)
 
+Shared, content-addressed blobs live under {AUDIOBOOKS_DIR}/_shared/:
+  audio/{key[:2]}/{key}.wav     page WAV keyed by (cleaned text, voice, speed)
+
+Per-book audio_pages/ entries are hardlinks to those blobs (copies where the
+filesystem can't link), so identical pages across books — license pages,
+boilerplate front matter, re-ingested contracts — are voiced once.
+`shared_audio` reference-counts blobs per (book, page) so `delete_book` only
+removes a blob when no other book still points at it.
+
+Cleaned text is shared the same way through the `shared_clean` table, keyed
+by the raw page hash plus the model and prompt hash that produced it, so a
+prompt or model change never serves stale output.
+
 Metadata lives in {AUDIOBOOKS_DIR}/audiobooks.db (SQLite). One row per book
 in the `books` table. The dict-shaped `read_meta` / `write_meta` API is
 preserved so callers don't have to change. Per-book file presence remains
 the resumability checkpoint — DB is for queryable summary fields only.
 
+Per-page state lives in the `pages` table: content hash + body hash (see
+page_fingerprint.py), per-phase state, rendered duration and failure
+reason. `meta["failed_pages"]` is derived from it, and phase progress / status
+/ error are plain columns on `books`, so per-page bookkeeping is one small
+UPDATE instead of re-serialising the whole meta blob.
+
+Per-page progress is write-behind: `record_page_progress` coalesces updates
+per book in memory and commits them for all books in one transaction once
+_PROGRESS_FLUSH_UPDATES updates or _PROGRESS_FLUSH_SECONDS have accumulated.
+Any `update_meta` (phase transitions, failures) and `flush_progress` (shutdown)
+write a book's pending progress first. Losing the buffer in a crash only
+rewinds the progress counters — per-page files stay the resume checkpoint.
+
+`read_meta` is read-through cached: the first read of a book decodes its row
+into a deep-frozen snapshot (`FrozenMeta` / `_FrozenList`) that
+later reads return without touching SQLite. Every write path invalidates the
+book's entry and bumps its version, which `meta_etag` exposes for HTTP
+conditional GETs. Callers that want to edit a snapshot copy it with `dict()`.
+
+Connections: one writer (autocommit, `_conn_lock`, BEGIN IMMEDIATE for
+multi-statement writes) plus a small pool of read-only connections, so WAL
+readers (SSE snapshots, listings, resume scans) never queue behind pipeline
+writes. Each reader call runs in one deferred read transaction, i.e. a
+consistent snapshot. Prepared statements are reused through sqlite3's
+per-connection statement cache; `synchronous` / `cache_size` / `mmap_size`
+and the reader count come from settings (AUDIOBOOK_DB_*).
+
+Transcripts: per-page text with each page's [start_time, end_time) in the
+book's audio lives in `transcript_pages`, so live highlighting fetches one
+page or one time window instead of a multi-megabyte transcript.json.
+
+Search: cleaned page text is indexed in the FTS5 table `page_text_fts`,
+whose rowid is `search_docs.doc_id` (an INTEGER PRIMARY KEY, so it survives
+VACUUM) mapping to (book_id, page_no). Pages are indexed as they finish
+cleaning — buffered alongside page progress — and re-indexed with the final
+text when the transcript is written. If the SQLite build lacks FTS5, indexing
+is skipped and `search` raises RuntimeError.
+
+Library listing: `list_books_page` pages over (created_at, book_id) with an
+opaque cursor and returns only SUMMARY_FIELDS straight from columns (no JSON
+decode). Every write to a book stamps `books.change_seq` from a process-wide
+counter and deletions leave a row in `deleted_books`, so `list_changes(since)`
+gives clients just the deltas since their last sync.
+
 Migration: on startup, any legacy `meta.json` files are imported into the
 DB and the JSON files are removed. See `_migrate_legacy_meta_files`.
 """
 
 import asyncio
+import base64
+import contextlib
+import hashlib
 import json
 import os
+import re
 import shutil
 import sqlite3
 import threading
 import time
 import uuid
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 from app.core.config import settings
 
@@ -36,9 +97,58 @@ def _now_iso() -> str:
     return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
 
+# Distinguishes ETags across restarts (meta versions restart at 0).
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class FrozenMeta(dict):
+    """Read-only dict returned by read_meta. Still a real dict, so it
+    JSON-encodes and `dict(meta)` yields an editable shallow copy."""
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("meta snapshots are read-only; copy with dict(meta)")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, Any]:
+        import copy
+
+        return {k: copy.deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (FrozenMeta, (dict(self),))
+
+
+class _FrozenList(list):
+    """Read-only list for nested meta values; compares equal to plain lists."""
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("meta snapshots are read-only; copy with list(value)")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> list[Any]:
+        import copy
+
+        return [copy.deepcopy(v, memo) for v in self]
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (_FrozenList, (list(self),))
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenMeta({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return _FrozenList(_freeze(v) for v in value)
+    return value
+
+
 # Columns we hoist out of the JSON blob for indexed queries. Everything else
-# (sections, page_to_time, estimated, actual, phase_progress, failed_pages,
-# error) lives inside the JSON `meta` column for schema flexibility.
+# (sections, page_to_time, estimated, actual, ...) lives inside the JSON
+# `meta_json` column for schema flexibility.
 _INDEXED_COLUMNS = (
     "book_id",
     "title",
@@ -50,6 +160,33 @@ _INDEXED_COLUMNS = (
     "voice",
     "speed",
 )
+# Meta keys that are never stored in meta_json: the indexed columns, plus the
+# hot per-page bookkeeping fields that get their own columns / table.
+_COLUMN_KEYS = frozenset(_INDEXED_COLUMNS) | {"phase_progress", "error"}
+_NON_JSON_KEYS = _COLUMN_KEYS | {"failed_pages"}
+# Per-page state columns settable through update_page().
+_PAGE_STATE_COLUMNS = frozenset(
+    {
+        "clean_state",
+        "tts_state",
+        "audio_seconds",
+        "failed_phase",
+        "failure_reason",
+        "heading",
+    }
+)
+# Write-behind thresholds for record_page_progress (summed across all books).
+_PROGRESS_FLUSH_UPDATES = 32
+_PROGRESS_FLUSH_SECONDS = 2.0
+# Words of a search query; each becomes a quoted FTS5 term (no operators).
+_SEARCH_TERM_RE = re.compile(r"\w+")
+# Prepared statements kept per connection (sqlite3 `cached_statements`).
+_STATEMENT_CACHE_SIZE = 256
+_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+# Bumped when a migration in _migrate_schema needs to run (PRAGMA user_version).
+_SCHEMA_VERSION = 6
+# Fields served by the projected listing / change feed — all plain columns.
+SUMMARY_FIELDS = (*_INDEXED_COLUMNS, "phase_progress", "error", "change_seq")
 
 
 class AudiobookStore:
@@ -57,28 +194,118 @@ class AudiobookStore:
 
     # Per-book locks so concurrent meta updates don't clobber each other.
     _meta_locks: dict[str, asyncio.Lock] = {}
-    # Single connection guarded by a thread lock; SQLite serialises writes.
+    # Single writer connection guarded by a thread lock; SQLite serialises
+    # writes. Reads go through the _reader() pool instead.
     _conn: sqlite3.Connection | None = None
     _conn_lock = threading.Lock()
+    # Read-only connection pool: idle connections + how many exist. The
+    # generation lets _reset_for_tests retire connections that are in use.
+    _readers: list[sqlite3.Connection] = []
+    _reader_count = 0
+    _reader_generation = 0
+    _reader_cond = threading.Condition()
+    # Write-behind progress: book_id → {"page_done", "page_total", "pages":
+    # {page_no: {col: value}}}. Guarded by its own lock, never held across I/O.
+    _progress: dict[str, dict[str, Any]] = {}
+    _progress_lock = threading.Lock()
+    _progress_updates = 0
+    _progress_since = 0.0
+    # Read-through meta cache: book_id → frozen snapshot of the committed row
+    # (buffered progress is overlaid per read). Versions bump on every change
+    # visible through read_meta, including buffered progress.
+    _meta_cache: dict[str, FrozenMeta] = {}
+    _meta_versions: dict[str, int] = {}
+    _cache_lock = threading.Lock()
+    # False when this SQLite build has no FTS5 (search disabled).
+    _fts_enabled = True
+    # Last change_seq handed out; seeded from the DB on connect. Only bumped
+    # while holding _conn_lock, so it's monotonic in commit order.
+    _change_seq = 0
 
     # ---------- DB lifecycle ----------
 
     @classmethod
     def _connection(cls) -> sqlite3.Connection:
+        """The writer connection (creates the DB + schema on first use)."""
         with cls._conn_lock:
             if cls._conn is None:
-                db_path = os.path.join(cls.root_dir(), "audiobooks.db")
-                conn = sqlite3.connect(
-                    db_path, check_same_thread=False, isolation_level=None
-                )
-                conn.execute("PRAGMA journal_mode=WAL")
-                conn.execute("PRAGMA foreign_keys=ON")
-                conn.row_factory = sqlite3.Row
+                conn = cls._open(readonly=False)
                 cls._conn = conn
                 cls._init_schema(conn)
                 cls._migrate_legacy_meta_files(conn)
             return cls._conn
 
+    @classmethod
+    def _open(cls, readonly: bool) -> sqlite3.Connection:
+        db_path = os.path.join(cls.root_dir(), "audiobooks.db")
+        if readonly:
+            conn = sqlite3.connect(
+                Path(db_path).as_uri() + "?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=_STATEMENT_CACHE_SIZE,
+            )
+        else:
+            conn = sqlite3.connect(
+                db_path,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=_STATEMENT_CACHE_SIZE,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+        synchronous = settings.AUDIOBOOK_DB_SYNCHRONOUS.upper()
+        if synchronous not in _SYNCHRONOUS_MODES:
+            raise ValueError(f"invalid AUDIOBOOK_DB_SYNCHRONOUS: {synchronous}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+        # Negative cache_size is in KiB rather than pages.
+        conn.execute(f"PRAGMA cache_size=-{int(settings.AUDIOBOOK_DB_CACHE_KB)}")
+        conn.execute(f"PRAGMA mmap_size={int(settings.AUDIOBOOK_DB_MMAP_BYTES)}")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @classmethod
+    @contextlib.contextmanager
+    def _reader(cls) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection for one snapshot read. Blocks when
+        all AUDIOBOOK_DB_READERS are busy; with 0 readers, reads share the
+        writer under _conn_lock."""
+        # Schema must exist before read-only connections can open the file.
+        writer = cls._conn or cls._connection()
+        limit = int(settings.AUDIOBOOK_DB_READERS)
+        if limit <= 0:
+            with cls._conn_lock, _read_transaction(writer):
+                yield writer
+            return
+        with cls._reader_cond:
+            while not cls._readers and cls._reader_count >= limit:
+                cls._reader_cond.wait()
+            generation = cls._reader_generation
+            if cls._readers:
+                conn = cls._readers.pop()
+            else:
+                cls._reader_count += 1
+                conn = None
+        if conn is None:
+            try:
+                conn = cls._open(readonly=True)
+            except BaseException:
+                with cls._reader_cond:
+                    cls._reader_count -= 1
+                    cls._reader_cond.notify()
+                raise
+        try:
+            with _read_transaction(conn):
+                yield conn
+        finally:
+            with cls._reader_cond:
+                if generation == cls._reader_generation:
+                    cls._readers.append(conn)
+                else:
+                    conn.close()
+                cls._reader_cond.notify()
+
     @classmethod
     def _init_schema(cls, conn: sqlite3.Connection) -> None:
         conn.execute("""
@@ -92,6 +319,10 @@ class AudiobookStore:
                 engine TEXT NOT NULL DEFAULT 'kokoro',
                 voice TEXT NOT NULL DEFAULT 'af_bella',
                 speed REAL NOT NULL DEFAULT 1.0,
+                phase_page_done INTEGER NOT NULL DEFAULT 0,
+                phase_page_total INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                change_seq INTEGER NOT NULL DEFAULT 0,
                 meta_json TEXT NOT NULL
             )
             """)
@@ -99,6 +330,167 @@ class AudiobookStore:
             "CREATE INDEX IF NOT EXISTS idx_books_created_at ON books(created_at DESC)"
         )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_books_status ON books(status)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS deleted_books (
+                book_id TEXT PRIMARY KEY,
+                change_seq INTEGER NOT NULL
+            )
+            """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                book_id TEXT NOT NULL,
+                page_no INTEGER NOT NULL,
+                content_hash TEXT,
+                body_hash TEXT,
+                duplicate_of INTEGER,
+                clean_state TEXT,
+                tts_state TEXT,
+                audio_seconds REAL,
+                failed_phase TEXT,
+                failure_reason TEXT,
+                heading TEXT,
+                PRIMARY KEY (book_id, page_no)
+            )
+            """)
+        cls._migrate_schema(conn)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pages_failed ON pages(book_id) "
+            "WHERE failure_reason IS NOT NULL"
+        )
+        # Keyset pagination (ties on the 1 s created_at broken by book_id).
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_books_created_id "
+            "ON books(created_at DESC, book_id DESC)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_books_change_seq ON books(change_seq)"
+        )
+        cls._change_seq = conn.execute(
+            "SELECT MAX(COALESCE((SELECT MAX(change_seq) FROM books), 0), "
+            "COALESCE((SELECT MAX(change_seq) FROM deleted_books), 0))"
+        ).fetchone()[0]
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS shared_clean (
+                raw_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                cleaned TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (raw_hash, model, prompt_hash)
+            )
+            """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS shared_audio (
+                audio_key TEXT PRIMARY KEY,
+                refcount INTEGER NOT NULL DEFAULT 0
+            )
+            """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS shared_audio_refs (
+                book_id TEXT NOT NULL,
+                page_no INTEGER NOT NULL,
+                audio_key TEXT NOT NULL,
+                PRIMARY KEY (book_id, page_no)
+            )
+            """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcript_pages (
+                book_id TEXT NOT NULL,
+                page_no INTEGER NOT NULL,
+                start_time REAL NOT NULL,
+                end_time REAL NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (book_id, page_no)
+            )
+            """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transcript_time "
+            "ON transcript_pages(book_id, start_time)"
+        )
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_docs (
+                doc_id INTEGER PRIMARY KEY,
+                book_id TEXT NOT NULL,
+                page_no INTEGER NOT NULL,
+                UNIQUE (book_id, page_no)
+            )
+            """)
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS page_text_fts USING fts5("
+                "text, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            cls._fts_enabled = True
+        except sqlite3.OperationalError as e:
+            print(f"[AudiobookStore] FTS5 unavailable, search disabled: {e}")
+            cls._fts_enabled = False
+
+    @classmethod
+    def _migrate_schema(cls, conn: sqlite3.Connection) -> None:
+        """Bring a DB created by an older build up to _SCHEMA_VERSION.
+
+        v2: phase progress / error move to `books` columns and failed pages to
+        `pages.failure_reason`, backfilled from each row's meta_json.
+        v3: `books.change_seq` for the listing change feed (existing rows
+        start at 0, i.e. "changed before any client synced").
+        v4: `shared_clean` is keyed by (raw_hash, model, prompt_hash). Old
+        rows don't record what produced them, so they are dropped.
+        v5: `pages.heading`, the heading found on a page at extraction (books
+        extracted earlier simply have none and fall back to Gemini).
+        v6: `pages.body_hash` replaces the MinHash signature for near-duplicate
+        detection; the old `minhash` column is left unused.
+        """
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= _SCHEMA_VERSION:
+            return
+        _add_missing_columns(
+            conn,
+            "books",
+            {
+                "phase_page_done": "INTEGER NOT NULL DEFAULT 0",
+                "phase_page_total": "INTEGER NOT NULL DEFAULT 0",
+                "error": "TEXT",
+                "change_seq": "INTEGER NOT NULL DEFAULT 0",
+            },
+        )
+        _add_missing_columns(
+            conn,
+            "pages",
+            {
+                "clean_state": "TEXT",
+                "tts_state": "TEXT",
+                "audio_seconds": "REAL",
+                "failed_phase": "TEXT",
+                "failure_reason": "TEXT",
+                "heading": "TEXT",
+                "body_hash": "TEXT",
+            },
+        )
+        with cls._transaction(conn):
+            if version < 2:
+                rows = conn.execute("SELECT book_id, meta_json FROM books").fetchall()
+                for row in rows:
+                    try:
+                        meta = json.loads(row["meta_json"])
+                    except (json.JSONDecodeError, TypeError):
+                        continue
+                    cls._write_hot_fields(conn, row["book_id"], meta)
+            if version < 4:
+                conn.execute("DROP TABLE IF EXISTS shared_clean")
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        """Explicit BEGIN/COMMIT — the connection runs in autocommit mode, so
+        multi-statement updates (refcounts) need their own transaction."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
 
     @classmethod
     def _migrate_legacy_meta_files(cls, conn: sqlite3.Connection) -> None:
@@ -125,7 +517,9 @@ class AudiobookStore:
 
     @staticmethod
     def _meta_to_row(meta: dict[str, Any]) -> dict[str, Any]:
-        """Pull the indexed columns out of meta + serialise the rest as JSON."""
+        """Pull the column fields out of meta + serialise the rest as JSON."""
+        progress = meta.get("phase_progress") or {}
+        rest = {k: v for k, v in meta.items() if k not in _NON_JSON_KEYS}
         return {
             "book_id": meta.get("book_id"),
             "title": meta.get("title", ""),
@@ -136,16 +530,102 @@ class AudiobookStore:
             "engine": meta.get("engine", "kokoro"),
             "voice": meta.get("voice", "af_bella"),
             "speed": float(meta.get("speed") or 1.0),
-            "meta_json": json.dumps(meta, ensure_ascii=False),
+            "phase_page_done": int(progress.get("page_done") or 0),
+            "phase_page_total": int(progress.get("page_total") or 0),
+            "error": meta.get("error"),
+            "meta_json": json.dumps(rest, ensure_ascii=False),
         }
 
     @staticmethod
-    def _row_to_meta(row: sqlite3.Row) -> dict[str, Any]:
+    def _row_to_meta(row: sqlite3.Row, failed_pages: list[int]) -> dict[str, Any]:
         try:
-            return json.loads(row["meta_json"])
-        except (json.JSONDecodeError, KeyError):
-            # Fall back to indexed columns only.
-            return {col: row[col] for col in _INDEXED_COLUMNS if col in row.keys()}
+            meta = json.loads(row["meta_json"])
+        except (json.JSONDecodeError, TypeError):
+            meta = {}
+        # Columns are authoritative — legacy blobs may still carry stale copies.
+        for col in _INDEXED_COLUMNS:
+            meta[col] = row[col]
+        meta["phase_progress"] = {
+            "page_done": row["phase_page_done"],
+            "page_total": row["phase_page_total"],
+        }
+        meta["error"] = row["error"]
+        meta["failed_pages"] = failed_pages
+        return meta
+
+    @classmethod
+    def _write_hot_fields(
+        cls, conn: sqlite3.Connection, book_id: str, meta: dict[str, Any]
+    ) -> None:
+        """Copy phase_progress / error / failed_pages from a meta dict into
+        their columns (v2 migration of legacy blobs)."""
+        progress = meta.get("phase_progress") or {}
+        conn.execute(
+            "UPDATE books SET phase_page_done = ?, phase_page_total = ?, error = ? "
+            "WHERE book_id = ?",
+            (
+                int(progress.get("page_done") or 0),
+                int(progress.get("page_total") or 0),
+                meta.get("error"),
+                book_id,
+            ),
+        )
+        if "failed_pages" in meta:
+            cls._sync_failed_pages(conn, book_id, meta.get("failed_pages") or [])
+
+    @staticmethod
+    def _sync_failed_pages(
+        conn: sqlite3.Connection, book_id: str, pages: list[int]
+    ) -> None:
+        """Make the set of failed pages exactly `pages`. Pages newly listed get
+        a generic reason; existing reasons are kept."""
+        wanted = {int(n) for n in pages}
+        current = {
+            r["page_no"]
+            for r in conn.execute(
+                "SELECT page_no FROM pages "
+                "WHERE book_id = ? AND failure_reason IS NOT NULL",
+                (book_id,),
+            ).fetchall()
+        }
+        conn.executemany(
+            "UPDATE pages SET failed_phase = NULL, failure_reason = NULL "
+            "WHERE book_id = ? AND page_no = ?",
+            [(book_id, n) for n in current - wanted],
+        )
+        conn.executemany(
+            """
+            INSERT INTO pages (book_id, page_no, failure_reason) VALUES (?, ?, 'failed')
+            ON CONFLICT(book_id, page_no) DO UPDATE SET
+                failure_reason = excluded.failure_reason
+            """,
+            [(book_id, n) for n in sorted(wanted - current)],
+        )
+
+    @staticmethod
+    def _failed_pages(conn: sqlite3.Connection, book_id: str) -> list[int]:
+        return [
+            r["page_no"]
+            for r in conn.execute(
+                "SELECT page_no FROM pages "
+                "WHERE book_id = ? AND failure_reason IS NOT NULL ORDER BY page_no",
+                (book_id,),
+            ).fetchall()
+        ]
+
+    @classmethod
+    def _next_change_seq(cls) -> int:
+        """Caller holds _conn_lock."""
+        cls._change_seq += 1
+        return cls._change_seq
+
+    @classmethod
+    def _touch_book(cls, conn: sqlite3.Connection, book_id: str) -> None:
+        """Stamp a book as changed for the listing change feed."""
+        conn.execute(
+            "UPDATE books SET change_seq = ? WHERE book_id = ?",
+            (cls._next_change_seq(), book_id),
+        )
 
     @classmethod
     def _upsert_row(cls, conn: sqlite3.Connection, meta: dict[str, Any]) -> None:
@@ -153,9 +633,13 @@ class AudiobookStore:
         conn.execute(
             """
             INSERT INTO books (book_id, title, created_at, page_count, status,
-                               total_audio_seconds, engine, voice, speed, meta_json)
+                               total_audio_seconds, engine, voice, speed,
+                               phase_page_done, phase_page_total, error,
+                               change_seq, meta_json)
             VALUES (:book_id, :title, :created_at, :page_count, :status,
-                    :total_audio_seconds, :engine, :voice, :speed, :meta_json)
+                    :total_audio_seconds, :engine, :voice, :speed,
+                    :phase_page_done, :phase_page_total, :error,
+                    :change_seq, :meta_json)
             ON CONFLICT(book_id) DO UPDATE SET
                 title=excluded.title,
                 page_count=excluded.page_count,
@@ -164,10 +648,17 @@ class AudiobookStore:
                 engine=excluded.engine,
                 voice=excluded.voice,
                 speed=excluded.speed,
+                phase_page_done=excluded.phase_page_done,
+                phase_page_total=excluded.phase_page_total,
+                error=excluded.error,
+                change_seq=excluded.change_seq,
                 meta_json=excluded.meta_json
             """,
-            row,
+            {**row, "change_seq": cls._next_change_seq()},
         )
+        conn.execute("DELETE FROM deleted_books WHERE book_id = ?", (row["book_id"],))
+        if "failed_pages" in meta:
+            cls._sync_failed_pages(conn, row["book_id"], meta["failed_pages"] or [])
 
     # ---------- paths (unchanged) ----------
 
@@ -200,6 +691,10 @@ class AudiobookStore:
     def audio_path(cls, book_id: str) -> str:
         return os.path.join(cls.book_dir(book_id), "audio.wav")
 
+    @classmethod
+    def timings_path(cls, book_id: str) -> str:
+        return os.path.join(cls.book_dir(book_id), "timings.bin")
+
     @classmethod
     def page_raw_path(cls, book_id: str, n: int) -> str:
         return os.path.join(cls.book_dir(book_id), "pages", f"{n:03d}.txt")
@@ -212,6 +707,26 @@ class AudiobookStore:
     def page_audio_path(cls, book_id: str, n: int) -> str:
         return os.path.join(cls.book_dir(book_id), "audio_pages", f"{n:03d}.wav")
 
+    @classmethod
+    def page_timing_path(cls, book_id: str, n: int) -> str:
+        """Segment timing index for one page WAV (see TimingIndex)."""
+        return cls.timing_sidecar(cls.page_audio_path(book_id, n))
+
+    @classmethod
+    def shared_dir(cls) -> str:
+        return os.path.join(cls.root_dir(), "_shared")
+
+    @classmethod
+    def shared_audio_path(cls, audio_key: str) -> str:
+        return os.path.join(
+            cls.shared_dir(), "audio", audio_key[:2], f"{audio_key}.wav"
+        )
+
+    @staticmethod
+    def timing_sidecar(wav_path: str) -> str:
+        """Timing index stored next to a page or shared WAV."""
+        return os.path.splitext(wav_path)[0] + ".tim"
+
     # ---------- create ----------
 
     @classmethod
@@ -245,15 +760,44 @@ class AudiobookStore:
         return lock
 
     @classmethod
-    def read_meta(cls, book_id: str) -> dict[str, Any] | None:
-        conn = cls._connection()
-        with cls._conn_lock:
-            row = conn.execute(
-                "SELECT * FROM books WHERE book_id = ?", (book_id,)
-            ).fetchone()
-        if row is None:
-            return None
-        return cls._row_to_meta(row)
+    def read_meta(cls, book_id: str) -> FrozenMeta | None:
+        """Immutable snapshot of a book's meta (cached; see module docstring)."""
+        with cls._cache_lock:
+            snapshot = cls._meta_cache.get(book_id)
+            version = cls._meta_versions.get(book_id, 0)
+        if snapshot is None:
+            with cls._reader() as conn:
+                row = conn.execute(
+                    "SELECT * FROM books WHERE book_id = ?", (book_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                failed = cls._failed_pages(conn, book_id)
+            snapshot = _freeze(cls._row_to_meta(row, failed))
+            with cls._cache_lock:
+                # Only cache if no write landed while we were reading.
+                if cls._meta_versions.get(book_id, 0) == version:
+                    cls._meta_cache[book_id] = snapshot
+        return cls._overlay_progress(snapshot)
+
+    @classmethod
+    def meta_etag(cls, book_id: str) -> str:
+        """Weak ETag for the book's current meta. Take it *before* read_meta
+        so a concurrent write can only make the tag stale, never the body."""
+        with cls._cache_lock:
+            version = cls._meta_versions.get(book_id, 0)
+        return f'W/"{_BOOT_ID}-{version}"'
+
+    @classmethod
+    def _invalidate(cls, book_id: str) -> None:
+        with cls._cache_lock:
+            cls._meta_cache.pop(book_id, None)
+            cls._meta_versions[book_id] = cls._meta_versions.get(book_id, 0) + 1
+
+    @classmethod
+    def _bump_version(cls, book_id: str) -> None:
+        with cls._cache_lock:
+            cls._meta_versions[book_id] = cls._meta_versions.get(book_id, 0) + 1
 
     @classmethod
     def write_meta(cls, book_id: str, meta: dict[str, Any]) -> None:
@@ -261,17 +805,70 @@ class AudiobookStore:
         meta = dict(meta)  # shallow copy so caller mutations don't bleed
         meta["book_id"] = book_id
         conn = cls._connection()
-        with cls._conn_lock:
+        with cls._conn_lock, cls._transaction(conn):
             cls._upsert_row(conn, meta)
+        cls._invalidate(book_id)
 
     @classmethod
-    async def update_meta(cls, book_id: str, **patch: Any) -> dict[str, Any]:
-        """Read-modify-write under per-book asyncio.Lock + DB transaction."""
+    async def update_meta(cls, book_id: str, **patch: Any) -> None:
+        """Patch a book's meta under its per-book asyncio.Lock.
+
+        Column fields (status, error, phase_progress, page_count, ...) become
+        a narrow UPDATE; `failed_pages` syncs the pages table; only other keys
+        pay for a read-modify-write of the meta_json blob. No-op if the book
+        has no row (never resurrects a deleted book).
+        """
         async with cls._lock(book_id):
-            meta = cls.read_meta(book_id) or {}
-            meta.update(patch)
-            cls.write_meta(book_id, meta)
-            return meta
+            pending = cls._take_progress(book_id)
+            conn = cls._connection()
+            with cls._conn_lock, cls._transaction(conn):
+                if pending is not None:
+                    cls._write_progress(conn, book_id, pending)
+                cls._apply_patch(conn, book_id, patch)
+            cls._invalidate(book_id)
+
+    @classmethod
+    def _apply_patch(
+        cls, conn: sqlite3.Connection, book_id: str, patch: dict[str, Any]
+    ) -> None:
+        sets: dict[str, Any] = {}
+        for key, value in patch.items():
+            if key == "phase_progress":
+                progress = value or {}
+                sets["phase_page_done"] = int(progress.get("page_done") or 0)
+                sets["phase_page_total"] = int(progress.get("page_total") or 0)
+            elif key in ("page_count",):
+                sets[key] = int(value or 0)
+            elif key in ("total_audio_seconds", "speed"):
+                sets[key] = float(value or 0)
+            elif key in _COLUMN_KEYS and key != "book_id":
+                sets[key] = value
+        rest = {k: v for k, v in patch.items() if k not in _NON_JSON_KEYS}
+        if rest:
+            row = conn.execute(
+                "SELECT meta_json FROM books WHERE book_id = ?", (book_id,)
+            ).fetchone()
+            if row is None:
+                return
+            try:
+                blob = json.loads(row["meta_json"])
+            except (json.JSONDecodeError, TypeError):
+                blob = {}
+            for key in _NON_JSON_KEYS:
+                blob.pop(key, None)
+            blob.update(rest)
+            sets["meta_json"] = json.dumps(blob, ensure_ascii=False)
+        if "failed_pages" in patch or sets:
+            sets["change_seq"] = cls._next_change_seq()
+            assignments = ", ".join(f"{col} = :{col}" for col in sets)
+            cur = conn.execute(
+                f"UPDATE books SET {assignments} WHERE book_id = :_book_id",
+                {**sets, "_book_id": book_id},
+            )
+            if cur.rowcount == 0:
+                return
+        if "failed_pages" in patch:
+            cls._sync_failed_pages(conn, book_id, patch["failed_pages"] or [])
 
     @classmethod
     def initial_meta(
@@ -303,17 +900,706 @@ class AudiobookStore:
             "error": None,
         }
 
+    # ---------- per-page fingerprints ----------
+
+    @classmethod
+    def read_page_fingerprints(cls, book_id: str) -> dict[int, dict[str, Any]]:
+        """All recorded page fingerprints for a book, keyed by page number."""
+        with cls._reader() as conn:
+            rows = conn.execute(
+                "SELECT page_no, content_hash, body_hash, duplicate_of FROM pages "
+                "WHERE book_id = ?",
+                (book_id,),
+            ).fetchall()
+        return {
+            r["page_no"]: {
+                "content_hash": r["content_hash"],
+                "body_hash": r["body_hash"],
+                "duplicate_of": r["duplicate_of"],
+            }
+            for r in rows
+        }
+
+    @classmethod
+    def write_page_fingerprint(
+        cls,
+        book_id: str,
+        page_no: int,
+        content_hash: str | None,
+        body_hash: str | None,
+        duplicate_of: int | None,
+    ) -> None:
+        conn = cls._connection()
+        with cls._conn_lock:
+            conn.execute(
+                """
+                INSERT INTO pages
+                    (book_id, page_no, content_hash, body_hash, duplicate_of)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(book_id, page_no) DO UPDATE SET
+                    content_hash=excluded.content_hash,
+                    body_hash=excluded.body_hash,
+                    duplicate_of=excluded.duplicate_of
+                """,
+                (book_id, page_no, content_hash, body_hash, duplicate_of),
+            )
+
+    @classmethod
+    def read_page_headings(cls, book_id: str) -> dict[int, str]:
+        """Headings recorded at extraction (see section_detector), by page."""
+        with cls._reader() as conn:
+            rows = conn.execute(
+                "SELECT page_no, heading FROM pages "
+                "WHERE book_id = ? AND heading IS NOT NULL",
+                (book_id,),
+            ).fetchall()
+        return {r["page_no"]: r["heading"] for r in rows}
+
+    @classmethod
+    def update_page(cls, book_id: str, page_no: int, **fields: Any) -> None:
+        """Set per-page state columns (clean_state, tts_state, audio_seconds,
+        failed_phase, failure_reason, heading) with one small UPSERT."""
+        unknown = set(fields) - _PAGE_STATE_COLUMNS
+        if unknown:
+            raise ValueError(f"unknown page fields: {sorted(unknown)}")
+        if not fields:
+            return
+        cols = sorted(fields)
+        conn = cls._connection()
+        with cls._conn_lock, cls._transaction(conn):
+            conn.execute(
+                f"INSERT INTO pages (book_id, page_no, {', '.join(cols)}) "
+                f"VALUES (?, ?, {', '.join('?' for _ in cols)}) "
+                "ON CONFLICT(book_id, page_no) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in cols),
+                (book_id, page_no, *(fields[c] for c in cols)),
+            )
+            cls._touch_book(conn, book_id)
+        cls._invalidate(book_id)
+
+    @classmethod
+    def record_page_progress(
+        cls,
+        book_id: str,
+        page_no: int,
+        page_done: int | None,
+        page_total: int,
+        **fields: Any,
+    ) -> None:
+        """Per-page pipeline checkpoint: optional page state + the book's
+        phase_progress counters (left alone when page_done is None). Buffered
+        (see module docstring); reads of the book's meta see the buffered
+        counters immediately."""
+        unknown = set(fields) - _PAGE_STATE_COLUMNS
+        if unknown:
+            raise ValueError(f"unknown page fields: {sorted(unknown)}")
+        now = time.monotonic()
+        with cls._progress_lock:
+            if not cls._progress:
+                cls._progress_since = now
+            entry = cls._progress.setdefault(book_id, {"pages": {}})
+            if page_done is not None:
+                entry["page_done"] = page_done
+                entry["page_total"] = page_total
+            if fields:
+                entry["pages"].setdefault(page_no, {}).update(fields)
+            cls._progress_updates += 1
+            cls._bump_version(book_id)
+            due = (
+                cls._progress_updates >= _PROGRESS_FLUSH_UPDATES
+                or now - cls._progress_since >= _PROGRESS_FLUSH_SECONDS
+            )
+        if due:
+            cls.flush_progress()
+
+    @classmethod
+    def index_page_text(cls, book_id: str, page_no: int, text: str) -> None:
+        """Queue a page's cleaned text for the search index. Rides along with
+        the book's next progress flush instead of committing on its own."""
+        with cls._progress_lock:
+            if not cls._progress:
+                cls._progress_since = time.monotonic()
+            entry = cls._progress.setdefault(book_id, {"pages": {}})
+            entry.setdefault("texts", {})[page_no] = text
+
+    @classmethod
+    def flush_progress(cls, book_id: str | None = None) -> None:
+        """Commit buffered progress — one book's, or every book's in a single
+        transaction."""
+        with cls._progress_lock:
+            if book_id is None:
+                pending = cls._progress
+                cls._progress = {}
+                cls._progress_updates = 0
+            else:
+                entry = cls._take_progress_locked(book_id)
+                pending = {book_id: entry} if entry is not None else {}
+        if not pending:
+            return
+        conn = cls._connection()
+        with cls._conn_lock, cls._transaction(conn):
+            for bid, entry in pending.items():
+                cls._write_progress(conn, bid, entry)
+        for bid in pending:
+            cls._invalidate(bid)
+
+    @classmethod
+    def _take_progress(cls, book_id: str) -> dict[str, Any] | None:
+        with cls._progress_lock:
+            return cls._take_progress_locked(book_id)
+
+    @classmethod
+    def _take_progress_locked(cls, book_id: str) -> dict[str, Any] | None:
+        entry = cls._progress.pop(book_id, None)
+        if not cls._progress:
+            cls._progress_updates = 0
+        return entry
+
+    @classmethod
+    def _overlay_progress(cls, meta: dict[str, Any]) -> Any:
+        """Return `meta` with buffered phase_progress applied (same type)."""
+        with cls._progress_lock:
+            entry = cls._progress.get(meta["book_id"])
+            if entry is None or "page_done" not in entry:
+                return meta
+            progress = {
+                "page_done": entry["page_done"],
+                "page_total": entry["page_total"],
+            }
+        if isinstance(meta, FrozenMeta):
+            return FrozenMeta({**meta, "phase_progress": FrozenMeta(progress)})
+        meta["phase_progress"] = progress
+        return meta
+
+    @classmethod
+    def _write_progress(
+        cls, conn: sqlite3.Connection, book_id: str, entry: dict[str, Any]
+    ) -> None:
+        by_cols: dict[tuple[str, ...], list[tuple[Any, ...]]] = {}
+        for page_no, fields in entry["pages"].items():
+            cols = tuple(sorted(fields))
+            by_cols.setdefault(cols, []).append(
+                (book_id, page_no, *(fields[c] for c in cols))
+            )
+        for cols, rows in by_cols.items():
+            conn.executemany(
+                f"INSERT INTO pages (book_id, page_no, {', '.join(cols)}) "
+                f"VALUES (?, ?, {', '.join('?' for _ in cols)}) "
+                "ON CONFLICT(book_id, page_no) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in cols),
+                rows,
+            )
+        if entry.get("texts"):
+            cls._index_texts(conn, book_id, entry["texts"].items())
+        if "page_done" not in entry:
+            return
+        conn.execute(
+            "UPDATE books SET phase_page_done = ?, phase_page_total = ?, "
+            "change_seq = ? WHERE book_id = ?",
+            (
+                entry["page_done"],
+                entry["page_total"],
+                cls._next_change_seq(),
+                book_id,
+            ),
+        )
+
+    @classmethod
+    def mark_page_failed(
+        cls, book_id: str, page_no: int, phase: str, reason: str
+    ) -> None:
+        state_col = "clean_state" if phase == "cleaning" else "tts_state"
+        cls.flush_progress(book_id)
+        cls.update_page(
+            book_id,
+            page_no,
+            failed_phase=phase,
+            failure_reason=reason or "failed",
+            **{state_col: "failed"},
+        )
+
+    @classmethod
+    def clear_page_failures(cls, book_id: str) -> None:
+        conn = cls._connection()
+        with cls._conn_lock, cls._transaction(conn):
+            conn.execute(
+                "UPDATE pages SET failed_phase = NULL, failure_reason = NULL "
+                "WHERE book_id = ? AND failure_reason IS NOT NULL",
+                (book_id,),
+            )
+            cls._touch_book(conn, book_id)
+        cls._invalidate(book_id)
+
+    @classmethod
+    def read_pages(cls, book_id: str) -> list[dict[str, Any]]:
+        """Per-page state rows (without the body hash), in page order."""
+        cls.flush_progress(book_id)
+        with cls._reader() as conn:
+            rows = conn.execute(
+                "SELECT page_no, content_hash, duplicate_of, clean_state, tts_state, "
+                "audio_seconds, failed_phase, failure_reason FROM pages "
+                "WHERE book_id = ? ORDER BY page_no",
+                (book_id,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    # ---------- shared content (cross-book dedup) ----------
+
+    @classmethod
+    def read_shared_clean(
+        cls, raw_hash: str, model: str, prompt_hash: str
+    ) -> str | None:
+        """Cleaned text previously produced for this raw page hash by this
+        model and prompt, if any."""
+        with cls._reader() as conn:
+            row = conn.execute(
+                "SELECT cleaned FROM shared_clean "
+                "WHERE raw_hash = ? AND model = ? AND prompt_hash = ?",
+                (raw_hash, model, prompt_hash),
+            ).fetchone()
+        return row["cleaned"] if row is not None else None
+
+    @classmethod
+    def write_shared_clean(
+        cls, raw_hash: str, model: str, prompt_hash: str, cleaned: str
+    ) -> None:
+        conn = cls._connection()
+        with cls._conn_lock:
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_clean "
+                "(raw_hash, model, prompt_hash, cleaned, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (raw_hash, model, prompt_hash, cleaned, _now_iso()),
+            )
+
+    @staticmethod
+    def shared_audio_key(text: str, voice: str, speed: float) -> str:
+        """Content address for a rendered page: (cleaned text, voice, speed)."""
+        text_hash = hashlib.blake2b(
+            text.strip().encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return hashlib.blake2b(
+            f"{text_hash}|{voice}|{round(float(speed), 2)}".encode(), digest_size=16
+        ).hexdigest()
+
+    @classmethod
+    def link_shared_audio(
+        cls, book_id: str, n: int, audio_key: str, out_path: str
+    ) -> bool:
+        """Materialise a shared blob as this book's page WAV. Returns False on
+        a miss (no blob yet) so the caller synthesises the page itself."""
+        blob = cls.shared_audio_path(audio_key)
+        if not os.path.exists(blob):
+            return False
+        try:
+            _link_or_copy(blob, out_path)
+        except OSError:
+            return False
+        # Timings are a pure function of (text, voice, speed) like the audio,
+        # so the blob's sidecar is valid for this page too. Best-effort.
+        _link_sidecar(cls.timing_sidecar(blob), cls.timing_sidecar(out_path))
+        cls._add_audio_ref(book_id, n, audio_key)
+        return True
+
+    @classmethod
+    def publish_shared_audio(
+        cls, book_id: str, n: int, audio_key: str, page_path: str
+    ) -> None:
+        """Register a freshly rendered page WAV as the blob for audio_key."""
+        blob = cls.shared_audio_path(audio_key)
+        try:
+            if not os.path.exists(blob):
+                _link_sidecar(cls.timing_sidecar(page_path), cls.timing_sidecar(blob))
+                _link_or_copy(page_path, blob)
+        except OSError as e:
+            print(f"[Store] shared audio publish failed for {audio_key}: {e}")
+            return
+        cls._add_audio_ref(book_id, n, audio_key)
+
+    @classmethod
+    def _add_audio_ref(cls, book_id: str, n: int, audio_key: str) -> None:
+        """Point (book, page) at audio_key, moving the ref off any previous key
+        (a page re-rendered after retry_failed)."""
+        conn = cls._connection()
+        with cls._conn_lock, cls._transaction(conn):
+            prev = conn.execute(
+                "SELECT audio_key FROM shared_audio_refs "
+                "WHERE book_id = ? AND page_no = ?",
+                (book_id, n),
+            ).fetchone()
+            if prev is not None and prev["audio_key"] == audio_key:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_audio_refs (book_id, page_no, audio_key) "
+                "VALUES (?, ?, ?)",
+                (book_id, n, audio_key),
+            )
+            conn.execute(
+                "INSERT INTO shared_audio (audio_key, refcount) VALUES (?, 1) "
+                "ON CONFLICT(audio_key) DO UPDATE SET refcount = refcount + 1",
+                (audio_key,),
+            )
+            orphaned = (
+                cls._drop_audio_refs(conn, [prev["audio_key"]])
+                if prev is not None
+                else []
+            )
+        cls._remove_shared_blobs(orphaned)
+
+    @staticmethod
+    def _drop_audio_refs(conn: sqlite3.Connection, keys: list[str]) -> list[str]:
+        """Decrement refcounts for keys (one per dropped ref); return the keys
+        whose count reached zero. Caller holds the transaction."""
+        for key in keys:
+            conn.execute(
+                "UPDATE shared_audio SET refcount = refcount - 1 WHERE audio_key = ?",
+                (key,),
+            )
+        orphaned = [
+            r["audio_key"]
+            for r in conn.execute(
+                "SELECT audio_key FROM shared_audio WHERE refcount <= 0"
+            ).fetchall()
+        ]
+        conn.executemany(
+            "DELETE FROM shared_audio WHERE audio_key = ?", [(k,) for k in orphaned]
+        )
+        return orphaned
+
+    @classmethod
+    def _remove_shared_blobs(cls, keys: list[str]) -> None:
+        for key in keys:
+            blob = cls.shared_audio_path(key)
+            for p in (blob, cls.timing_sidecar(blob)):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+
+    # ---------- transcript ----------
+
+    @classmethod
+    def write_transcript(
+        cls, book_id: str, pages: Iterable[tuple[int, float, float, str]]
+    ) -> None:
+        """Replace a book's transcript with (page_no, start_time, end_time,
+        text) rows. `pages` may be a generator — rows stream into SQLite."""
+        conn = cls._connection()
+        with cls._conn_lock, cls._transaction(conn):
+            conn.execute("DELETE FROM transcript_pages WHERE book_id = ?", (book_id,))
+            for n, start, end, text in pages:
+                conn.execute(
+                    "INSERT INTO transcript_pages "
+                    "(book_id, page_no, start_time, end_time, text) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (book_id, n, start, end, text),
+                )
+                cls._index_texts(conn, book_id, [(n, text)])
+
+    @classmethod
+    def delete_transcript(cls, book_id: str) -> None:
+        conn = cls._connection()
+        with cls._conn_lock:
+            conn.execute("DELETE FROM transcript_pages WHERE book_id = ?", (book_id,))
+
+    @classmethod
+    def read_transcript_pages(
+        cls,
+        book_id: str,
+        first_page: int | None = None,
+        last_page: int | None = None,
+        start_time: float | None = None,
+        end_time: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """Transcript pages in page order, filtered by an inclusive page range
+        and/or the pages whose audio overlaps [start_time, end_time]."""
+        where = ["book_id = ?"]
+        params: list[Any] = [book_id]
+        if first_page is not None:
+            where.append("page_no >= ?")
+            params.append(first_page)
+        if last_page is not None:
+            where.append("page_no <= ?")
+            params.append(last_page)
+        if end_time is not None:
+            where.append("start_time <= ?")
+            params.append(end_time)
+        if start_time is not None:
+            # A page [s, e) contains t when s <= t < e; zero-length pages
+            # only match a window that starts exactly on them.
+            where.append("(end_time > ? OR start_time = ?)")
+            params += [start_time, start_time]
+        with cls._reader() as conn:
+            rows = conn.execute(
+                "SELECT page_no, start_time, end_time, text FROM transcript_pages "
+                f"WHERE {' AND '.join(where)} ORDER BY page_no",
+                params,
+            ).fetchall()
+        return [
+            {
+                "page": r["page_no"],
+                "start_time": r["start_time"],
+                "end_time": r["end_time"],
+                "text": r["text"],
+            }
+            for r in rows
+        ]
+
+    @classmethod
+    def has_transcript(cls, book_id: str) -> bool:
+        with cls._reader() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM transcript_pages WHERE book_id = ? LIMIT 1", (book_id,)
+            ).fetchone()
+        return row is not None
+
+    @classmethod
+    def import_legacy_transcript(cls, book_id: str) -> bool:
+        """Load a transcript.json written by an older build into
+        transcript_pages, then remove the file. False if there is none."""
+        path = cls.transcript_path(book_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        page_to_time = legacy.get("page_to_time") or {}
+        total = float(legacy.get("total_audio_seconds") or 0.0)
+        pages = sorted((int(k), v) for k, v in (legacy.get("pages") or {}).items())
+        starts = sorted((int(k), float(v)) for k, v in page_to_time.items())
+        start_of = dict(starts)
+        next_start = {
+            n: (starts[i + 1][1] if i + 1 < len(starts) else total)
+            for i, (n, _) in enumerate(starts)
+        }
+        cls.write_transcript(
+            book_id,
+            (
+                (n, start_of.get(n, 0.0), next_start.get(n, total), text)
+                for n, text in pages
+            ),
+        )
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return True
+
+    # ---------- search ----------
+
+    @classmethod
+    def _index_texts(
+        cls,
+        conn: sqlite3.Connection,
+        book_id: str,
+        texts: Iterable[tuple[int, str]],
+    ) -> None:
+        """(Re)index pages inside the caller's write transaction. Silence
+        markers and empty pages are removed from the index."""
+        if not cls._fts_enabled:
+            return
+        for page_no, text in texts:
+            conn.execute(
+                "INSERT INTO search_docs (book_id, page_no) VALUES (?, ?) "
+                "ON CONFLICT(book_id, page_no) DO NOTHING",
+                (book_id, page_no),
+            )
+            doc_id = conn.execute(
+                "SELECT doc_id FROM search_docs WHERE book_id = ? AND page_no = ?",
+                (book_id, page_no),
+            ).fetchone()[0]
+            conn.execute("DELETE FROM page_text_fts WHERE rowid = ?", (doc_id,))
+            stripped = text.strip()
+            if stripped and stripped != "-" and not stripped.startswith("[blank"):
+                conn.execute(
+                    "INSERT INTO page_text_fts (rowid, text) VALUES (?, ?)",
+                    (doc_id, stripped),
+                )
+
+    @classmethod
+    def search(
+        cls,
+        query: str,
+        book_id: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """Ranked (BM25) full-text hits, one per page: book, page, snippet
+        and the page's approximate start time in the book's audio. Every word
+        of `query` must appear on the page. Returns (hits, next_offset)."""
+        if not cls._fts_enabled:
+            raise RuntimeError("full-text search needs SQLite with FTS5")
+        terms = _SEARCH_TERM_RE.findall(query)
+        if not terms:
+            raise ValueError("query has no searchable words")
+        match = " ".join(f'"{t}"' for t in terms)
+        sql = (
+            "SELECT d.book_id, d.page_no, b.title, t.start_time, "
+            "snippet(page_text_fts, 0, '[', ']', '…', 12) AS snippet, "
+            "bm25(page_text_fts) AS score "
+            "FROM page_text_fts "
+            "JOIN search_docs d ON d.doc_id = page_text_fts.rowid "
+            "JOIN books b ON b.book_id = d.book_id "
+            "LEFT JOIN transcript_pages t "
+            "ON t.book_id = d.book_id AND t.page_no = d.page_no "
+            "WHERE page_text_fts MATCH ?"
+        )
+        params: list[Any] = [match]
+        if book_id is not None:
+            sql += " AND d.book_id = ?"
+            params.append(book_id)
+        sql += " ORDER BY rank LIMIT ? OFFSET ?"
+        params += [limit + 1, offset]
+        with cls._reader() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        next_offset = offset + limit if len(rows) > limit else None
+        hits = []
+        for r in rows[:limit]:
+            start = r["start_time"]
+            if start is None:
+                # Book still processing — fall back to meta's page_to_time.
+                meta = cls.read_meta(r["book_id"]) or {}
+                start = (meta.get("page_to_time") or {}).get(str(r["page_no"]))
+            hits.append(
+                {
+                    "book_id": r["book_id"],
+                    "title": r["title"],
+                    "page": r["page_no"],
+                    "time": start,
+                    "snippet": r["snippet"],
+                    "score": -r["score"],  # bm25 is lower-is-better
+                }
+            )
+        return hits, next_offset
+
     # ---------- list / delete ----------
 
     @classmethod
     def list_books(cls) -> list[dict[str, Any]]:
         """Summary list, ordered by created_at desc, indexed by SQLite."""
-        conn = cls._connection()
-        with cls._conn_lock:
+        with cls._reader() as conn:
+            rows = conn.execute(
+                "SELECT * FROM books ORDER BY created_at DESC, book_id DESC"
+            ).fetchall()
+            failed: dict[str, list[int]] = {}
+            for r in conn.execute(
+                "SELECT book_id, page_no FROM pages "
+                "WHERE failure_reason IS NOT NULL ORDER BY page_no"
+            ).fetchall():
+                failed.setdefault(r["book_id"], []).append(r["page_no"])
+        return [
+            cls._overlay_progress(cls._row_to_meta(r, failed.get(r["book_id"], [])))
+            for r in rows
+        ]
+
+    @classmethod
+    def list_books_page(
+        cls,
+        limit: int = 50,
+        cursor: str | None = None,
+        statuses: list[str] | None = None,
+        fields: list[str] | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """One page of the library, newest first, projected to `fields`
+        (default: all SUMMARY_FIELDS). Returns (items, next_cursor); the
+        cursor is None on the last page. Raises ValueError on a bad cursor or
+        an unknown field."""
+        columns = cls._summary_columns(fields)
+        where: list[str] = []
+        params: list[Any] = []
+        if cursor:
+            created_at, book_id = _decode_cursor(cursor)
+            where.append("(created_at, book_id) < (?, ?)")
+            params += [created_at, book_id]
+        if statuses:
+            where.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params += statuses
+        sql = f"SELECT {', '.join(columns)} FROM books"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, book_id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with cls._reader() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1]["created_at"], rows[-1]["book_id"])
+        return [cls._summary(r, fields) for r in rows], next_cursor
+
+    @classmethod
+    def list_changes(
+        cls,
+        since: int = 0,
+        limit: int = 200,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Books changed / deleted after change_seq `since`, oldest change
+        first. Pass the returned `cursor` as the next `since`; `has_more`
+        means another call is needed to catch up."""
+        columns = cls._summary_columns(fields, extra=("change_seq",))
+        with cls._reader() as conn:
             rows = conn.execute(
-                "SELECT * FROM books ORDER BY created_at DESC"
+                f"SELECT {', '.join(columns)} FROM books WHERE change_seq > ? "
+                "ORDER BY change_seq LIMIT ?",
+                (since, limit + 1),
             ).fetchall()
-        return [cls._row_to_meta(r) for r in rows]
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if has_more:
+                upto = rows[-1]["change_seq"]
+            else:
+                # Highest seq committed in this snapshot; never the in-memory
+                # counter, which may be ahead of an uncommitted write.
+                upto = conn.execute(
+                    "SELECT MAX(COALESCE((SELECT MAX(change_seq) FROM books), 0), "
+                    "COALESCE((SELECT MAX(change_seq) FROM deleted_books), 0))"
+                ).fetchone()[0]
+            deleted = conn.execute(
+                "SELECT book_id FROM deleted_books "
+                "WHERE change_seq > ? AND change_seq <= ? ORDER BY change_seq",
+                (since, upto),
+            ).fetchall()
+        return {
+            "items": [cls._summary(r, fields) for r in rows],
+            "deleted": [r["book_id"] for r in deleted],
+            "cursor": max(since, upto),
+            "has_more": has_more,
+        }
+
+    @staticmethod
+    def _summary_columns(
+        fields: list[str] | None, extra: tuple[str, ...] = ()
+    ) -> list[str]:
+        wanted = list(fields or SUMMARY_FIELDS)
+        unknown = [f for f in wanted if f not in SUMMARY_FIELDS]
+        if unknown:
+            raise ValueError(f"unknown fields: {unknown}")
+        columns: list[str] = []
+        for name in ("book_id", "created_at", *extra, *wanted):
+            if name == "phase_progress":
+                cols = ["phase_page_done", "phase_page_total"]
+            else:
+                cols = [name]
+            columns += [c for c in cols if c not in columns]
+        return columns
+
+    @classmethod
+    def _summary(cls, row: sqlite3.Row, fields: list[str] | None) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for name in fields or SUMMARY_FIELDS:
+            if name == "phase_progress":
+                out[name] = {
+                    "page_done": row["phase_page_done"],
+                    "page_total": row["phase_page_total"],
+                }
+            else:
+                out[name] = row[name]
+        out["book_id"] = row["book_id"]
+        if "phase_progress" in out:
+            out = cls._overlay_progress(out)
+        return out
 
     @classmethod
     def delete_book(cls, book_id: str) -> bool:
@@ -321,11 +1607,40 @@ class AudiobookStore:
         existed = os.path.isdir(bdir)
         if existed:
             shutil.rmtree(bdir, ignore_errors=True)
+        cls._take_progress(book_id)
         conn = cls._connection()
-        with cls._conn_lock:
+        # One transaction: the books row and its tombstone must never be
+        # seen apart, or the change feed loses the deletion.
+        with cls._conn_lock, cls._transaction(conn):
             cur = conn.execute("DELETE FROM books WHERE book_id = ?", (book_id,))
             db_existed = cur.rowcount > 0
+            if db_existed:
+                conn.execute(
+                    "INSERT OR REPLACE INTO deleted_books (book_id, change_seq) "
+                    "VALUES (?, ?)",
+                    (book_id, cls._next_change_seq()),
+                )
+            conn.execute("DELETE FROM pages WHERE book_id = ?", (book_id,))
+            conn.execute("DELETE FROM transcript_pages WHERE book_id = ?", (book_id,))
+            if cls._fts_enabled:
+                conn.execute(
+                    "DELETE FROM page_text_fts WHERE rowid IN "
+                    "(SELECT doc_id FROM search_docs WHERE book_id = ?)",
+                    (book_id,),
+                )
+            conn.execute("DELETE FROM search_docs WHERE book_id = ?", (book_id,))
+            refs = [
+                r["audio_key"]
+                for r in conn.execute(
+                    "SELECT audio_key FROM shared_audio_refs WHERE book_id = ?",
+                    (book_id,),
+                ).fetchall()
+            ]
+            conn.execute("DELETE FROM shared_audio_refs WHERE book_id = ?", (book_id,))
+            orphaned = cls._drop_audio_refs(conn, refs)
+        cls._remove_shared_blobs(orphaned)
         cls._meta_locks.pop(book_id, None)
+        cls._invalidate(book_id)
         return existed or db_existed
 
     # ---------- test helpers ----------
@@ -336,6 +1651,13 @@ class AudiobookStore:
         effect on next access. Tests use a per-test AUDIOBOOKS_DIR via
         monkeypatch — without this reset, the singleton connection points
         at the wrong DB."""
+        with cls._reader_cond:
+            for conn in cls._readers:
+                conn.close()
+            cls._readers = []
+            cls._reader_count = 0
+            cls._reader_generation += 1
+            cls._reader_cond.notify_all()
         with cls._conn_lock:
             if cls._conn is not None:
                 try:
@@ -344,3 +1666,73 @@ class AudiobookStore:
                     pass
                 cls._conn = None
         cls._meta_locks.clear()
+        with cls._progress_lock:
+            cls._progress = {}
+            cls._progress_updates = 0
+        with cls._cache_lock:
+            cls._meta_cache.clear()
+            cls._meta_versions.clear()
+
+
+@contextlib.contextmanager
+def _read_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Deferred BEGIN … COMMIT so multi-query reads see one WAL snapshot."""
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    finally:
+        conn.execute("COMMIT")
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Atomically place `src`'s content at `dst`: hardlink (same inode, zero
+    extra bytes) when the filesystem allows it, otherwise a full copy."""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + ".tmp"
+    try:
+        os.remove(tmp)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _link_sidecar(src: str, dst: str) -> None:
+    """_link_or_copy for an optional companion file: a missing `src` removes
+    any stale `dst` instead of failing."""
+    if os.path.exists(src):
+        try:
+            _link_or_copy(src, dst)
+            return
+        except OSError:
+            pass
+    try:
+        os.remove(dst)
+    except OSError:
+        pass
+
+
+def _encode_cursor(created_at: str, book_id: str) -> str:
+    raw = json.dumps([created_at, book_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, book_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
+    return str(created_at), str(book_id)
+
+
+def _add_missing_columns(
+    conn: sqlite3.Connection, table: str, columns: dict[str, str]
+) -> None:
+    existing = {r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    for name, decl in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
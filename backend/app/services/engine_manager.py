@@ -7,7 +7,7 @@ stable API so endpoints don't need to import TTSEngine directly.
 from typing import AsyncGenerator
 
 import numpy as np
-from app.services.tts import TTSEngine
+from app.services.tts import SegmentTiming, TTSEngine
 
 KOKORO_VOICES = [
     "af_bella",
@@ -49,9 +49,16 @@ class EngineManager:
 
     @classmethod
     async def generate(
-        cls, text: str, voice: str, speed: float
+        cls,
+        text: str,
+        voice: str,
+        speed: float,
+        timings: list[SegmentTiming] | None = None,
+        background: bool = False,
     ) -> AsyncGenerator[np.ndarray, None]:
-        async for chunk in TTSEngine.generate(text, voice, speed):
+        async for chunk in TTSEngine.generate(
+            text, voice, speed, timings, background=background
+        ):
             yield chunk
 
     @classmethod
@@ -2,12 +2,34 @@
 
 The user's API key is sent per-request (X-Gemini-Api-Key header from Swift).
 Never persisted on disk.
+
+Clients are cached per API key (LRU, evicted after an idle period) and all of
+them send through one shared keep-alive httpx pool, so a 1,000-page book pays
+for TLS setup once rather than once per page. HTTP/2 is used when the `h2`
+package is installed.
+
+Every request passes through the module-level `gemini_limiter`, shared by all
+books and keys: it adapts concurrency to observed latency and 429s and keeps
+requests within the configured RPM / TPM quota.
+
+`base_url` (GEMINI_BASE_URL, or set_base_url at runtime) points every client
+at another Gemini-compatible endpoint — e.g. benchmarks/fake_gemini.py for
+offline load tests.
 """
 
 import asyncio
+import hashlib
 import json
 import re
-
+import time
+from collections import OrderedDict
+from typing import Any
+
+import httpx
+from app.core.config import settings
+from app.core.metrics import GEMINI_REQUEST_SECONDS, GEMINI_RETRIES
+from app.services.rate_limiter import AdaptiveLimiter
+from app.services.section_detector import stitch_sections
 from google import genai
 from google.genai import types
 
@@ -46,6 +68,18 @@ If the input page is empty or contains no readable content, output the single
 character "-".
 """
 
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).hexdigest()
+
+
+# Cleaned-text cache entries are tagged with the model and the hash of the
+# prompt that produced them, so editing the prompt (or moving models)
+# re-cleans instead of serving text produced under the old rules. Batched
+# output is tagged BATCH_PROMPT_HASH (defined below GeminiCleaner); the
+# batch prompt embeds this one, so either edit invalidates it.
+CLEAN_PROMPT_HASH = _prompt_hash(GEMINI_CLEAN_SYSTEM_PROMPT)
+
 OCR_AND_CLEAN_PROMPT = """\
 You are a combined OCR and text-cleaning assistant preparing a scanned PDF page
 for text-to-speech narration. Your output will be read aloud verbatim.
@@ -80,10 +114,111 @@ class GeminiBadResponseError(Exception):
     """Gemini returned an unexpected response."""
 
 
+class GeminiTimeoutError(Exception):
+    """Gemini did not answer within the request timeout. Not retried."""
+
+
+# Shared by every Gemini call in the process. Starts at the old fixed
+# per-book parallelism and adapts from there.
+gemini_limiter = AdaptiveLimiter(
+    rpm=settings.GEMINI_RPM,
+    tpm=settings.GEMINI_TPM,
+    initial=4,
+    maximum=settings.GEMINI_MAX_CONCURRENCY,
+    throttled=GeminiRateLimitError,
+)
+
+# Token charge for one OCR call: the page image (~258 tokens), the prompt
+# and a page of output.
+_OCR_TOKENS = 1_500
+
+
+try:
+    import h2  # noqa: F401
+
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+
 class GeminiCleaner:
     _MAX_RETRIES = 3
     _BACKOFF_BASE = 2.0  # 2s, 4s, 8s
 
+    # Client cache: at most this many API keys, each dropped after this many
+    # idle seconds. Connections idle longer than the keep-alive expiry close.
+    _CLIENT_CACHE_MAX = 8
+    _CLIENT_IDLE_SECONDS = 600.0
+    _POOL_MAX_CONNECTIONS = 32
+    _POOL_KEEPALIVE_SECONDS = 60.0
+
+    # sha256(api_key) → (client, last_used monotonic); most recent last.
+    _clients: "OrderedDict[str, tuple[genai.Client, float]]" = OrderedDict()
+    _http: httpx.AsyncClient | None = None
+    _http_loop: asyncio.AbstractEventLoop | None = None
+    # Alternate API endpoint; "" = Google's.
+    base_url: str = settings.GEMINI_BASE_URL
+
+    # ---------- client cache ----------
+
+    @classmethod
+    def set_base_url(cls, base_url: str) -> None:
+        """Send subsequent requests to `base_url` ("" = Google's endpoint)."""
+        cls.base_url = base_url
+        cls._clients.clear()
+
+    @classmethod
+    def _client(cls, api_key: str) -> genai.Client:
+        """Cached genai.Client for api_key, sharing the keep-alive pool.
+
+        httpx connections belong to the event loop that opened them, so a
+        loop change (tests, in-process restart) starts a fresh pool.
+        """
+        loop = asyncio.get_running_loop()
+        if cls._http is None or cls._http_loop is not loop:
+            cls._clients.clear()
+            cls._http = httpx.AsyncClient(
+                http2=_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=cls._POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=cls._POOL_MAX_CONNECTIONS,
+                    keepalive_expiry=cls._POOL_KEEPALIVE_SECONDS,
+                ),
+            )
+            cls._http_loop = loop
+
+        now = time.monotonic()
+        while cls._clients:
+            oldest = next(iter(cls._clients))
+            if now - cls._clients[oldest][1] < cls._CLIENT_IDLE_SECONDS:
+                break
+            del cls._clients[oldest]
+
+        key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        entry = cls._clients.pop(key, None)
+        client = (
+            entry[0]
+            if entry is not None
+            else genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(
+                    base_url=cls.base_url or None, httpx_async_client=cls._http
+                ),
+            )
+        )
+        cls._clients[key] = (client, now)
+        while len(cls._clients) > cls._CLIENT_CACHE_MAX:
+            cls._clients.popitem(last=False)
+        return client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Drop cached clients and close the shared connection pool."""
+        cls._clients.clear()
+        http, cls._http, cls._http_loop = cls._http, None, None
+        if http is not None:
+            await http.aclose()
+
     # ---------- error classification ----------
 
     @staticmethod
@@ -112,6 +247,55 @@ class GeminiCleaner:
             raise GeminiRateLimitError(str(e)) from e
         raise GeminiBadResponseError(str(e)) from e
 
+    # ---------- requests ----------
+
+    _OUTCOMES: dict[type[Exception], str] = {
+        GeminiRateLimitError: "rate_limited",
+        GeminiAuthError: "auth",
+        GeminiTimeoutError: "timeout",
+    }
+    # Seconds a request may take once the limiter has admitted it, per op.
+    # Time queued in the limiter (cooldowns included) never counts.
+    _REQUEST_TIMEOUTS = {"clean": 90.0, "ocr": 90.0, "sections": 90.0, "batch": 180.0}
+
+    @classmethod
+    async def _generate(
+        cls,
+        op: str,
+        client: genai.Client,
+        tokens: int,
+        config: types.GenerateContentConfig,
+        contents: Any,
+    ) -> types.GenerateContentResponse:
+        """One generate_content call through the shared limiter, errors
+        mapped to the typed exceptions. The timeout and the latency recorded
+        in GEMINI_REQUEST_SECONDS both start at admission, so limiter
+        queueing counts toward neither."""
+        async with gemini_limiter.slot(tokens):
+            start = time.perf_counter()
+            outcome = "ok"
+            try:
+                try:
+                    return await asyncio.wait_for(
+                        client.aio.models.generate_content(
+                            model=MODEL_NAME,
+                            config=config,
+                            contents=contents,
+                        ),
+                        timeout=cls._REQUEST_TIMEOUTS[op],
+                    )
+                except asyncio.TimeoutError as e:
+                    raise GeminiTimeoutError(f"{op}: no response in time") from e
+                except Exception as e:
+                    cls._reraise_typed(e)
+            except Exception as e:
+                outcome = cls._OUTCOMES.get(type(e), "error")
+                raise
+            finally:
+                GEMINI_REQUEST_SECONDS.observe(
+                    time.perf_counter() - start, op=op, outcome=outcome
+                )
+
     # ---------- text cleaning ----------
 
     @classmethod
@@ -122,11 +306,17 @@ class GeminiCleaner:
 
         last_exc: Exception | None = None
         for attempt in range(cls._MAX_RETRIES):
+            if attempt:
+                GEMINI_RETRIES.inc(op="clean")
             try:
                 return await cls._async_clean(api_key, raw_text)
-            except GeminiAuthError:
+            except (GeminiAuthError, GeminiTimeoutError):
                 raise
-            except (GeminiRateLimitError, GeminiBadResponseError) as e:
+            except GeminiRateLimitError as e:
+                # The shared limiter is already cooling down; the retry waits
+                # there instead of adding a private backoff on top.
+                last_exc = e
+            except GeminiBadResponseError as e:
                 last_exc = e
                 if attempt < cls._MAX_RETRIES - 1:
                     await asyncio.sleep(cls._BACKOFF_BASE * (2**attempt))
@@ -139,22 +329,117 @@ class GeminiCleaner:
 
     @classmethod
     async def _async_clean(cls, api_key: str, raw_text: str) -> str:
-        client = genai.Client(api_key=api_key)
+        client = cls._client(api_key)
         config = types.GenerateContentConfig(
             system_instruction=GEMINI_CLEAN_SYSTEM_PROMPT,
             temperature=0.1,
         )
-        try:
-            resp = await client.aio.models.generate_content(
-                model=MODEL_NAME,
-                config=config,
-                contents=raw_text,
-            )
-        except Exception as e:
-            cls._reraise_typed(e)
+        tokens = cls.estimate_tokens(
+            len(GEMINI_CLEAN_SYSTEM_PROMPT) + len(raw_text)
+        ) + cls.estimate_tokens(len(raw_text))
+        resp = await cls._generate("clean", client, tokens, config, raw_text)
         text = (resp.text or "").strip()
         return text if text else "-"
 
+    # ---------- batched text cleaning ----------
+
+    BATCH_PROMPT = GEMINI_CLEAN_SYSTEM_PROMPT + """
+BATCH MODE:
+The input holds several pages, each introduced by a marker line of the form
+<<<PAGE k>>>. Clean every page independently under the rules above and output
+all of them in the same order, each preceded by its marker line exactly as
+given. Never move text across markers, never drop a marker, and output "-"
+under the marker of an empty page.
+"""
+    _BATCH_MAX_PAGES = 8
+    _BATCH_MARKER_RE = re.compile(r"^[ \t]*<<<PAGE (\d+)>>>[ \t]*$", re.M)
+    # A split page whose cleaned length falls outside this ratio of its raw
+    # length probably absorbed (or lost) a neighbour's text. Short pages are
+    # exempt — dropping a running header can halve them legitimately.
+    _BATCH_RATIO_RANGE = (0.3, 2.0)
+    _BATCH_RATIO_MIN_CHARS = 400
+
+    @classmethod
+    def pack_batches(cls, raw_pages: list[str], token_budget: int) -> list[list[int]]:
+        """Group consecutive page indices into batches of at most
+        `token_budget` input tokens and _BATCH_MAX_PAGES pages. A page over
+        budget on its own forms a batch of one."""
+        batches: list[list[int]] = []
+        cur: list[int] = []
+        cur_tokens = 0
+        for i, raw in enumerate(raw_pages):
+            tok = cls.estimate_tokens(len(raw))
+            if cur and (
+                cur_tokens + tok > token_budget or len(cur) >= cls._BATCH_MAX_PAGES
+            ):
+                batches.append(cur)
+                cur, cur_tokens = [], 0
+            cur.append(i)
+            cur_tokens += tok
+        if cur:
+            batches.append(cur)
+        return batches
+
+    @classmethod
+    async def clean_batch(cls, api_key: str, raw_pages: list[str]) -> list[str | None]:
+        """Clean several pages in one request.
+
+        Returns one entry per page: the cleaned text, or None where the
+        response could not be split back and verified — callers clean those
+        pages one by one with clean_page. Auth errors propagate; any other
+        failure returns all None.
+        """
+        joined = "\n".join(
+            f"<<<PAGE {i}>>>\n{raw.strip()}" for i, raw in enumerate(raw_pages, 1)
+        )
+        try:
+            text = await cls._async_clean_batch(api_key, joined)
+        except GeminiAuthError:
+            raise
+        except Exception as e:
+            print(f"[Gemini] batch of {len(raw_pages)} pages failed: {e}")
+            return [None] * len(raw_pages)
+        return cls._split_batch(text, raw_pages)
+
+    @classmethod
+    async def _async_clean_batch(cls, api_key: str, joined_text: str) -> str:
+        client = cls._client(api_key)
+        config = types.GenerateContentConfig(
+            system_instruction=cls.BATCH_PROMPT,
+            temperature=0.1,
+        )
+        tokens = cls.estimate_tokens(
+            len(cls.BATCH_PROMPT) + len(joined_text)
+        ) + cls.estimate_tokens(len(joined_text))
+        resp = await cls._generate("batch", client, tokens, config, joined_text)
+        return resp.text or ""
+
+    @classmethod
+    def _split_batch(cls, text: str, raw_pages: list[str]) -> list[str | None]:
+        """Split a batch response on its page markers. The markers must be
+        exactly 1..N in order, otherwise nothing is trusted."""
+        out: list[str | None] = [None] * len(raw_pages)
+        markers = list(cls._BATCH_MARKER_RE.finditer(text))
+        if [int(m.group(1)) for m in markers] != list(range(1, len(raw_pages) + 1)):
+            print(
+                f"[Gemini] batch split mismatch: expected {len(raw_pages)} "
+                f"markers, got {len(markers)}"
+            )
+            return out
+        lo, hi = cls._BATCH_RATIO_RANGE
+        for i, m in enumerate(markers):
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+            cleaned = text[m.end() : end].strip()
+            raw_len = len(raw_pages[i].strip())
+            if not cleaned:
+                continue
+            if raw_len >= cls._BATCH_RATIO_MIN_CHARS and not (
+                lo <= len(cleaned) / raw_len <= hi
+            ):
+                continue
+            out[i] = cleaned
+        return out
+
     # ---------- OCR (image pages) ----------
 
     @classmethod
@@ -162,11 +447,17 @@ class GeminiCleaner:
         """OCR + clean a scanned page image via Gemini vision. Retries on transient errors."""
         last_exc: Exception | None = None
         for attempt in range(cls._MAX_RETRIES):
+            if attempt:
+                GEMINI_RETRIES.inc(op="ocr")
             try:
                 return await cls._async_ocr(api_key, image_bytes)
-            except GeminiAuthError:
+            except (GeminiAuthError, GeminiTimeoutError):
                 raise
-            except (GeminiRateLimitError, GeminiBadResponseError) as e:
+            except GeminiRateLimitError as e:
+                # The shared limiter is already cooling down; the retry waits
+                # there instead of adding a private backoff on top.
+                last_exc = e
+            except GeminiBadResponseError as e:
                 last_exc = e
                 if attempt < cls._MAX_RETRIES - 1:
                     await asyncio.sleep(cls._BACKOFF_BASE * (2**attempt))
@@ -179,17 +470,12 @@ class GeminiCleaner:
 
     @classmethod
     async def _async_ocr(cls, api_key: str, image_bytes: bytes) -> str:
-        client = genai.Client(api_key=api_key)
+        client = cls._client(api_key)
         config = types.GenerateContentConfig(temperature=0.1)
         image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg")
-        try:
-            resp = await client.aio.models.generate_content(
-                model=MODEL_NAME,
-                config=config,
-                contents=[image_part, OCR_AND_CLEAN_PROMPT],
-            )
-        except Exception as e:
-            cls._reraise_typed(e)
+        resp = await cls._generate(
+            "ocr", client, _OCR_TOKENS, config, [image_part, OCR_AND_CLEAN_PROMPT]
+        )
         text = (resp.text or "").strip()
         return text if text else "-"
 
@@ -211,19 +497,42 @@ class GeminiCleaner:
     # ---------- section detection (Phase 2) ----------
 
     SECTION_PROMPT = (
-        "Below are the cleaned pages of a document, one per `=== PAGE N ===` "
-        "header. Identify the chapter or section boundaries.\n"
+        "Below is the top of each of a run of consecutive pages from a longer "
+        "document, one per `=== PAGE N ===` header. List the chapter or "
+        "section headings that begin on these pages.\n"
         "Output ONLY a JSON object of the form: "
         '{"sections":[{"title":"...","start_page":N,"end_page":M},...]}\n'
         "Rules:\n"
-        "- Cover every page; sections must be contiguous and non-overlapping.\n"
+        "- start_page is the page the heading appears on; end_page is the last "
+        "page shown that belongs to it.\n"
         "- Use the headings the document itself uses (e.g., 'Chapter 3: Habits').\n"
-        "- Prefer 4-20 sections per document. Combine very short subsections.\n"
+        "- Chapters and parts only: skip subsections, running headers and "
+        "tables of contents.\n"
+        '- If no heading begins on these pages, output {"sections":[]}.\n'
         "- Do not invent content. Use only what is in the text."
     )
 
-    _SECTION_CHUNK_CHARS = 500_000
-    _SECTION_CHUNK_PAGE_OVERLAP = 5
+    # Pages per section window, pages shared with the previous window (for
+    # context only — each page's sections come from one window), and the
+    # characters of each page sent: headings sit at the top of a page.
+    _SECTION_WINDOW_PAGES = 40
+    _SECTION_WINDOW_OVERLAP = 3
+    SECTION_PAGE_CHARS = 1_500
+
+    @classmethod
+    def section_windows(cls, page_count: int) -> list[tuple[int, int, int]]:
+        """(first_page, first_owned_page, last_page) of each window over a
+        book; the owned ranges partition [1..page_count]."""
+        windows: list[tuple[int, int, int]] = []
+        first = 1
+        while first <= page_count:
+            last = min(page_count, first + cls._SECTION_WINDOW_PAGES - 1)
+            owned = windows[-1][2] + 1 if windows else first
+            windows.append((first, owned, last))
+            if last == page_count:
+                break
+            first = last - cls._SECTION_WINDOW_OVERLAP + 1
+        return windows
 
     @classmethod
     async def detect_sections(cls, api_key: str, pages: list[str]) -> list[dict]:
@@ -231,57 +540,53 @@ class GeminiCleaner:
 
         `pages` is 1-indexed (pages[0] is page 1). Returns a list of
         {"title": str, "start_page": int, "end_page": int} sorted by start_page,
-        contiguous and non-overlapping. Returns [] on total failure.
+        contiguous and non-overlapping. Returns [] on total failure. Windows
+        run concurrently; AudiobookService runs the same windows one at a
+        time as pages finish cleaning (SectionStream).
         """
-        if not pages:
-            return []
 
-        chunks: list[tuple[int, str]] = []
-        cur_pages: list[str] = []
-        cur_chars = 0
-        cur_start = 1
-        for i, p in enumerate(pages, start=1):
-            block = f"=== PAGE {i} ===\n{p}\n"
-            if cur_chars + len(block) > cls._SECTION_CHUNK_CHARS and cur_pages:
-                chunks.append((cur_start, "".join(cur_pages)))
-                tail = cur_pages[-cls._SECTION_CHUNK_PAGE_OVERLAP :]
-                cur_pages = list(tail)
-                cur_start = i - len(tail)
-                cur_chars = sum(len(t) for t in cur_pages)
-            cur_pages.append(block)
-            cur_chars += len(block)
-        if cur_pages:
-            chunks.append((cur_start, "".join(cur_pages)))
-
-        all_sections: list[dict] = []
-        for first_page, text in chunks:
+        async def run(first: int, owned: int, last: int) -> list[dict]:
             try:
-                resp_text = await cls._async_section_call(api_key, text)
-                parsed = cls._parse_sections_json(resp_text, max_page=len(pages))
-                parsed = [s for s in parsed if s["start_page"] >= first_page]
-                all_sections.extend(parsed)
+                found = await cls.detect_window(api_key, first, pages[first - 1 : last])
             except Exception as e:
-                print(f"[Gemini] section chunk @page {first_page} failed: {e}")
-                continue
+                print(f"[Gemini] section window @page {first} failed: {e}")
+                return []
+            return [s for s in found if s["start_page"] >= owned]
+
+        results = await asyncio.gather(
+            *(run(*w) for w in cls.section_windows(len(pages)))
+        )
+        return stitch_sections([s for r in results for s in r], len(pages))
 
-        return cls._stitch_sections(all_sections, page_count=len(pages))
+    @classmethod
+    async def detect_window(
+        cls, api_key: str, first_page: int, pages: list[str]
+    ) -> list[dict]:
+        """Sections starting within one window of pages (`pages[0]` is page
+        `first_page`), as parsed from Gemini — not yet stitched."""
+        text = "".join(
+            f"=== PAGE {first_page + i} ===\n{p[: cls.SECTION_PAGE_CHARS]}\n"
+            for i, p in enumerate(pages)
+        )
+        resp_text = await cls._async_section_call(api_key, text)
+        parsed = cls._parse_sections_json(
+            resp_text, max_page=first_page + len(pages) - 1
+        )
+        return [s for s in parsed if s["start_page"] >= first_page]
 
     @classmethod
     async def _async_section_call(cls, api_key: str, joined_text: str) -> str:
-        client = genai.Client(api_key=api_key)
+        client = cls._client(api_key)
         config = types.GenerateContentConfig(
             system_instruction=cls.SECTION_PROMPT,
             temperature=0.1,
             response_mime_type="application/json",
         )
-        try:
-            resp = await client.aio.models.generate_content(
-                model=MODEL_NAME,
-                config=config,
-                contents=joined_text,
-            )
-        except Exception as e:
-            cls._reraise_typed(e)
+        # Output is a short JSON list of sections.
+        tokens = cls.estimate_tokens(len(cls.SECTION_PROMPT) + len(joined_text))
+        resp = await cls._generate(
+            "sections", client, tokens + 1_000, config, joined_text
+        )
         return resp.text or ""
 
     @staticmethod
@@ -313,44 +618,6 @@ class GeminiCleaner:
             out.append({"title": title, "start_page": sp, "end_page": ep})
         return out
 
-    @staticmethod
-    def _stitch_sections(sections: list[dict], page_count: int) -> list[dict]:
-        """Merge overlapping/duplicate sections from chunked results into one
-        contiguous, non-overlapping list covering [1..page_count]."""
-        if not sections:
-            return []
-
-        seen: set[tuple] = set()
-        unique: list[dict] = []
-        for s in sorted(sections, key=lambda x: (x["start_page"], x["end_page"])):
-            key = (s["title"].lower().strip(), s["start_page"])
-            if key in seen:
-                continue
-            seen.add(key)
-            unique.append(s)
-
-        cleaned: list[dict] = []
-        for s in unique:
-            if cleaned and s["start_page"] <= cleaned[-1]["start_page"]:
-                continue
-            cleaned.append(s)
-        for i, s in enumerate(cleaned):
-            if i + 1 < len(cleaned):
-                s["end_page"] = max(s["start_page"], cleaned[i + 1]["start_page"] - 1)
-            else:
-                s["end_page"] = page_count
-
-        if cleaned and cleaned[0]["start_page"] > 1:
-            cleaned.insert(
-                0,
-                {
-                    "title": "Front Matter",
-                    "start_page": 1,
-                    "end_page": cleaned[0]["start_page"] - 1,
-                },
-            )
-        return cleaned
-
     @classmethod
     async def verify_key(cls, api_key: str) -> bool:
         """Lightweight key check: tiny generation. Returns True if key works."""
@@ -361,3 +628,6 @@ class GeminiCleaner:
             return False
         except Exception:
             return False
+
+
+BATCH_PROMPT_HASH = _prompt_hash(GeminiCleaner.BATCH_PROMPT)
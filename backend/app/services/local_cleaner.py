@@ -0,0 +1,196 @@
+"""LocalCleaner — rule-based page cleaning without a network call.
+
+An offline alternative to GeminiCleaner for books whose text layer is already
+decent. It cleans a whole book in one pass, because the most useful signal —
+running headers and footers — only shows up across pages:
+
+  1. ligatures, soft hyphens and odd spaces are normalized
+  2. lines at the top or bottom of a page whose digit-masked form recurs at
+     the edges of many pages are dropped (headers, footers, "Page 12 of 300")
+  3. page-number lines at the page edges are dropped (roman numerals only
+     when marked as such, "- iv -" or "Page iv", never a bare "I")
+  4. words hyphenated across a line break are rejoined
+  5. lines are reflowed into paragraphs
+
+Every page is also checked for content the rules can't make speakable —
+tables, equations, garbled extraction — and flagged `messy`, so the "auto"
+cleaner mode can send just those pages to Gemini.
+"""
+
+import re
+from collections import Counter
+
+# Per-book cleaning engine, chosen at upload (meta["cleaner"]):
+#   gemini  every page through Gemini (needs a key)
+#   local   every page through LocalCleaner (no key, no network)
+#   auto    LocalCleaner, then Gemini for pages it flags as messy
+CLEANER_MODES = ("gemini", "local", "auto")
+
+_LIGATURES = str.maketrans(
+    {
+        "\ufb00": "ff",
+        "\ufb01": "fi",
+        "\ufb02": "fl",
+        "\ufb03": "ffi",
+        "\ufb04": "ffl",
+        "\ufb05": "st",
+        "\ufb06": "st",
+        "\u00ad": "",  # soft hyphen
+        "\u00a0": " ",  # no-break space
+        "\u2009": " ",  # thin space
+        "\u202f": " ",  # narrow no-break space
+        "\u200b": "",  # zero-width space
+        "\ufeff": "",  # BOM
+    }
+)
+
+# Lines considered for header / footer detection at each end of a page.
+_EDGE_LINES = 3
+# A digit-masked edge line is boilerplate when it recurs on at least this
+# many pages and this share of the book ("Page # of #", "My Book · #").
+# Chapter headings ("Chapter #") stay below the share on any real book.
+_MASKED_MIN_PAGES = 3
+_MASKED_MIN_SHARE = 0.3
+# An exact edge line repeated this often is a running title even when it
+# only covers one chapter's pages.
+_EXACT_MIN_PAGES = 4
+_EXACT_MIN_SHARE = 0.05
+
+_DIGITS_RE = re.compile(r"\d+")
+_SPACES_RE = re.compile(r"[ \t]+")
+_PAGE_NUMBER_RE = re.compile(
+    r"^[\s\-–—(\[]*(?:page\s+)?\d{1,4}" r"(?:\s*(?:of|/)\s*\d{1,4})?[\s\-–—)\]]*$",
+    re.IGNORECASE,
+)
+# Roman page numbers (front matter) only with context — "Page iv", "- iv -",
+# "(iv)", "iv of xii" — since a bare "I" or "V" is as likely the end of a
+# sentence or a part heading.
+_ROMAN = r"x{0,3}(?:ix|iv|v?i{1,3}|v|x)"
+_ROMAN_PAGE_NUMBER_RE = re.compile(
+    rf"^\s*(?:page\s+{_ROMAN}"
+    rf"|[\-–—(\[]\s*{_ROMAN}\s*[\-–—)\]]"
+    rf"|{_ROMAN}\s*(?:of|/)\s*(?:\d{{1,4}}|{_ROMAN}))\s*$",
+    re.IGNORECASE,
+)
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n[ \t]*([a-z])")
+_SENTENCE_END = (".", "!", "?", ":", '"', "”")
+
+# Messy-page thresholds.
+_SPEAKABLE = set(".,;:!?'\"()[]-–—‘’“”/&%$")
+_MAX_SYMBOL_SHARE = 0.06
+_MIN_ALPHA_SHARE = 0.6
+_COLUMN_GAP_RE = re.compile(r"\S(?: {2,}|\t)\S")
+_MAX_TABULAR_LINE_SHARE = 0.3
+_MIN_TABULAR_LINES = 3
+
+
+class LocalCleaner:
+    @classmethod
+    def clean_pages(cls, raw_pages: list[str]) -> list[tuple[str, bool]]:
+        """Clean every page of a book. Returns (cleaned_text, messy) per page,
+        in input order; empty pages come back as "-" like Gemini's."""
+        pages = [cls._lines(raw) for raw in raw_pages]
+        boilerplate = cls._boilerplate(pages)
+        out: list[tuple[str, bool]] = []
+        for lines in pages:
+            body = cls._strip_edges(lines, boilerplate)
+            text = cls._reflow(body)
+            out.append((text or "-", cls._is_messy(body)))
+        return out
+
+    @staticmethod
+    def _lines(raw: str) -> list[str]:
+        text = raw.translate(_LIGATURES).replace("\r\n", "\n").replace("\r", "\n")
+        return [line.rstrip() for line in text.split("\n")]
+
+    @staticmethod
+    def _mask(line: str) -> str:
+        return _DIGITS_RE.sub("#", _SPACES_RE.sub(" ", line.strip().lower()))
+
+    @staticmethod
+    def _edges(lines: list[str]) -> list[str]:
+        content = [line for line in lines if line.strip()]
+        if len(content) <= 2 * _EDGE_LINES:
+            return content
+        return content[:_EDGE_LINES] + content[-_EDGE_LINES:]
+
+    @classmethod
+    def _boilerplate(cls, pages: list[list[str]]) -> set[str]:
+        """Masked and exact forms of lines that repeat at page edges."""
+        masked: Counter[str] = Counter()
+        exact: Counter[str] = Counter()
+        for lines in pages:
+            edges = cls._edges(lines)
+            masked.update({cls._mask(line) for line in edges})
+            exact.update({"=" + line.strip() for line in edges})
+        n = len(pages)
+        masked_min = max(_MASKED_MIN_PAGES, _MASKED_MIN_SHARE * n)
+        exact_min = max(_EXACT_MIN_PAGES, _EXACT_MIN_SHARE * n)
+        found = {k for k, c in masked.items() if c >= masked_min and k}
+        found.update(k for k, c in exact.items() if c >= exact_min and k != "=")
+        return found
+
+    @classmethod
+    def _strip_edges(cls, lines: list[str], boilerplate: set[str]) -> list[str]:
+        """Drop boilerplate and page-number lines from the page's edges."""
+        idx = [i for i, line in enumerate(lines) if line.strip()]
+        edge = set(idx[:_EDGE_LINES] + idx[-_EDGE_LINES:])
+        return [
+            line
+            for i, line in enumerate(lines)
+            if i not in edge
+            or not (
+                cls._mask(line) in boilerplate
+                or "=" + line.strip() in boilerplate
+                or _PAGE_NUMBER_RE.match(line)
+                or _ROMAN_PAGE_NUMBER_RE.match(line)
+            )
+        ]
+
+    @staticmethod
+    def _reflow(lines: list[str]) -> str:
+        """Join hyphenated words and wrapped lines; a blank line, or a short
+        line that ends a sentence, ends the paragraph."""
+        text = _HYPHEN_BREAK_RE.sub(r"\1\2", "\n".join(lines))
+        rows = [_SPACES_RE.sub(" ", line).strip() for line in text.split("\n")]
+        lengths = sorted(len(r) for r in rows if r)
+        if not lengths:
+            return ""
+        typical = lengths[len(lengths) // 2]
+        paragraphs: list[str] = []
+        cur: list[str] = []
+        for row in rows:
+            if not row:
+                if cur:
+                    paragraphs.append(" ".join(cur))
+                    cur = []
+                continue
+            cur.append(row)
+            if row.endswith(_SENTENCE_END) and len(row) < 0.8 * typical:
+                paragraphs.append(" ".join(cur))
+                cur = []
+        if cur:
+            paragraphs.append(" ".join(cur))
+        return "\n\n".join(paragraphs)
+
+    @staticmethod
+    def _is_messy(lines: list[str]) -> bool:
+        """True for pages the rules can't make speakable on their own:
+        symbol-heavy (equations, extraction garbage), mostly non-letters, or
+        laid out in columns (tables)."""
+        text = "".join(lines)
+        visible = [c for c in text if not c.isspace()]
+        if not visible:
+            return False
+        alpha = sum(c.isalpha() for c in visible)
+        symbols = sum(not c.isalnum() and c not in _SPEAKABLE for c in visible)
+        if symbols / len(visible) > _MAX_SYMBOL_SHARE:
+            return True
+        if alpha / len(visible) < _MIN_ALPHA_SHARE:
+            return True
+        content = [line for line in lines if line.strip()]
+        tabular = sum(bool(_COLUMN_GAP_RE.search(line.strip())) for line in content)
+        return (
+            tabular >= _MIN_TABULAR_LINES
+            and tabular / len(content) > _MAX_TABULAR_LINE_SHARE
+        )
@@ -0,0 +1,97 @@
+"""LocalOCR — scanned pages read on this machine instead of by Gemini vision.
+
+Engines are pluggable: each is a class with `available()` (checked in the
+server process) and a static `recognize(image_bytes, lang)` returning the
+page text and a mean word confidence (0-100), which runs in the OCR worker
+processes next to the page renders (OCRRenderer). Tesseract, through
+pytesseract, is the only engine so far. It is optional: without the package
+and the `tesseract` binary, scanned pages go to Gemini exactly as before.
+
+Which engine reads a scanned page is decided per page by OCR_POLICY:
+
+  gemini    Gemini vision only (default)
+  local     the local engine only — no API calls, works offline
+  fallback  Gemini, but the local engine while Gemini is rate limited
+  escalate  the local engine first; Gemini when its confidence is low,
+            keeping the local text if Gemini times out or is rate limited
+
+Books without a Gemini key use the local engine whatever the policy.
+"""
+
+import io
+
+from app.core.config import settings
+from app.services.ocr_renderer import OCRRenderer
+from PIL import Image
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+OCR_POLICIES = ("gemini", "local", "fallback", "escalate")
+
+
+class TesseractOCR:
+    _available: bool | None = None
+
+    @classmethod
+    def available(cls) -> bool:
+        if cls._available is None:
+            try:
+                pytesseract.get_tesseract_version()
+                cls._available = True
+            except Exception:
+                # Package missing (pytesseract is None) or binary not on PATH.
+                cls._available = False
+        return cls._available
+
+    @staticmethod
+    def recognize(image_bytes: bytes, lang: str) -> tuple[str, float]:
+        data = pytesseract.image_to_data(
+            Image.open(io.BytesIO(image_bytes)),
+            lang=lang,
+            output_type=pytesseract.Output.DICT,
+        )
+        # Words → lines → paragraphs, in Tesseract's reading order.
+        paragraphs: dict[tuple[int, int], dict[int, list[str]]] = {}
+        confidences: list[float] = []
+        for i, word in enumerate(data["text"]):
+            conf = float(data["conf"][i])
+            if not word.strip() or conf < 0:
+                continue
+            confidences.append(conf)
+            para = paragraphs.setdefault((data["block_num"][i], data["par_num"][i]), {})
+            para.setdefault(data["line_num"][i], []).append(word)
+        text = "\n\n".join(
+            "\n".join(" ".join(words) for words in lines.values())
+            for lines in paragraphs.values()
+        )
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return text, confidence
+
+
+_ENGINES: dict[str, type[TesseractOCR]] = {"tesseract": TesseractOCR}
+
+
+def _recognize(engine: str, image_bytes: bytes, lang: str) -> tuple[str, float]:
+    """Worker-process entry point."""
+    return _ENGINES[engine].recognize(image_bytes, lang)
+
+
+class LocalOCR:
+    @staticmethod
+    def policy() -> str:
+        return settings.OCR_POLICY if settings.OCR_POLICY in OCR_POLICIES else "gemini"
+
+    @staticmethod
+    def available() -> bool:
+        engine = _ENGINES.get(settings.OCR_LOCAL_ENGINE)
+        return engine is not None and engine.available()
+
+    @classmethod
+    async def read(cls, image_bytes: bytes) -> tuple[str, float]:
+        """(text, mean word confidence 0-100) of one page image."""
+        return await OCRRenderer.run(
+            _recognize, settings.OCR_LOCAL_ENGINE, image_bytes, settings.OCR_LOCAL_LANG
+        )
@@ -0,0 +1,142 @@
+"""OCRRenderer — page images for vision OCR, rendered in a process pool.
+
+Image-only PDF pages are rendered with pypdfium2 in worker processes:
+rendering is CPU-bound and PDFium is not thread-safe, so threads would
+serialise on it anyway. Each image is the smallest one that still OCRs
+cleanly:
+
+  - rendered straight to grayscale at OCR_RENDER_DPI (no RGB pass)
+  - long side capped at OCR_MAX_IMAGE_SIDE px by lowering the render scale,
+    not by resizing afterwards (Gemini bills images per 768 px tile, so
+    1536 px is at most 2 × 2 tiles where a 200 dpi letter page is 3 × 3)
+  - grayscale JPEG
+
+Workers keep their last few documents open, so a book's pages don't reopen
+the PDF per page, and also run the local OCR engines (local_ocr).
+RenderPrefetcher keeps a bounded number of renders in flight ahead of the
+OCR calls that consume them, so the network never waits on a render it
+could have had already.
+"""
+
+import asyncio
+import concurrent.futures
+import io
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+import pypdfium2 as pdfium
+from app.core.config import settings
+
+_JPEG_QUALITY = 80
+# Open documents kept per worker process.
+_DOC_CACHE_SIZE = 2
+_docs: OrderedDict[str, pdfium.PdfDocument] = OrderedDict()
+
+T = TypeVar("T")
+
+
+def _render(pdf_path: str, page_num: int, dpi: int, max_side: int) -> bytes:
+    """Render one page (1-indexed) to grayscale JPEG bytes. Runs in a worker
+    process."""
+    doc = _docs.pop(pdf_path, None) or pdfium.PdfDocument(pdf_path)
+    _docs[pdf_path] = doc
+    while len(_docs) > _DOC_CACHE_SIZE:
+        _, old = _docs.popitem(last=False)
+        old.close()
+    page = doc[page_num - 1]
+    try:
+        width, height = page.get_size()
+        scale = min(dpi / 72, max_side / max(width, height, 1.0))
+        image = page.render(scale=scale, grayscale=True).to_pil()
+    finally:
+        page.close()
+    if image.mode != "L":
+        image = image.convert("L")
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG", quality=_JPEG_QUALITY, optimize=True)
+    return buf.getvalue()
+
+
+class OCRRenderer:
+    _pool: concurrent.futures.ProcessPoolExecutor | None = None
+
+    @classmethod
+    def _executor(cls) -> concurrent.futures.ProcessPoolExecutor:
+        if cls._pool is None:
+            # spawn, not fork: the server process runs threads (uvicorn, the
+            # TTS model) that a forked child would inherit mid-operation.
+            cls._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=max(1, settings.OCR_RENDER_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return cls._pool
+
+    @classmethod
+    async def render(cls, pdf_path: str, page_num: int) -> bytes:
+        """JPEG bytes of one page (1-indexed), rendered for OCR."""
+        return await cls.run(
+            _render,
+            pdf_path,
+            page_num,
+            settings.OCR_RENDER_DPI,
+            settings.OCR_MAX_IMAGE_SIDE,
+        )
+
+    @classmethod
+    async def run(cls, fn: Callable[..., T], *args: Any) -> T:
+        """Run a picklable, CPU-bound OCR step (render, local recognition)
+        in the worker pool."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(cls._executor(), fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. PDFium crashed on a malformed page); the
+            # next call starts a fresh pool.
+            cls.shutdown()
+            raise
+
+    @classmethod
+    def shutdown(cls) -> None:
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=False, cancel_futures=True)
+            cls._pool = None
+
+
+class RenderPrefetcher:
+    """Renders `pages` of one PDF in order, at most `depth` ahead of the
+    consumer, starting as soon as it is created: take(n) hands over page n's
+    image and starts the next render. Pages taken out of order are rendered
+    on demand."""
+
+    def __init__(self, pdf_path: str, pages: list[int], depth: int) -> None:
+        self._pdf_path = pdf_path
+        self._todo: deque[int] = deque(pages)
+        self._depth = max(1, depth)
+        self._in_flight: dict[int, asyncio.Future] = {}
+        self._fill()
+
+    def _fill(self) -> None:
+        while self._todo and len(self._in_flight) < self._depth:
+            n = self._todo.popleft()
+            self._in_flight[n] = asyncio.ensure_future(
+                OCRRenderer.render(self._pdf_path, n)
+            )
+
+    async def take(self, n: int) -> bytes:
+        fut = self._in_flight.pop(n, None)
+        if fut is None:
+            try:
+                self._todo.remove(n)
+            except ValueError:
+                pass
+            fut = asyncio.ensure_future(OCRRenderer.render(self._pdf_path, n))
+        self._fill()
+        return await fut
+
+    def close(self) -> None:
+        self._todo.clear()
+        for fut in self._in_flight.values():
+            fut.cancel()
+        self._in_flight.clear()
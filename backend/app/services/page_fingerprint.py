@@ -0,0 +1,81 @@
+"""PageFingerprint — content and body hashes for page dedup.
+
+Exact duplicates are detected with a BLAKE2b hash of the whole page.
+Near-duplicates — the same PDF page again with a different running header,
+footer or page number (e.g. DocuSign exports) — are detected with a hash of
+the page *body*: the text left once up to _EDGE_LINES short lines are taken
+off the top and the bottom, whitespace-normalised. The body itself must match
+exactly, so two pages whose text differs by even one word are never merged.
+Similarity scoring is deliberately not used: at any useful threshold a page
+and its amendment ("shall" vs "shall not") look the same, and the later one
+would be silenced.
+
+Both values are persisted per page in AudiobookStore, so they must be stable
+across processes: hashing never uses Python's randomised `hash()`.
+"""
+
+import hashlib
+
+# Lines at each edge of a page that may be a running header / footer, and
+# the longest such a line can be (a body line runs to the full text width).
+_EDGE_LINES = 2
+_EDGE_MAX_CHARS = 60
+# Bodies shorter than this get no hash — too little text to be sure two
+# pages are the same page. Exact hashing still applies.
+_MIN_BODY_CHARS = 100
+
+
+class PageFingerprint:
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """BLAKE2b-128 of the stripped page text (hex)."""
+        return hashlib.blake2b(text.strip().encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def body_hash(text: str) -> str | None:
+        """BLAKE2b-128 of the page without its header / footer lines (hex),
+        or None if too little body is left to compare."""
+        lines = [line.strip() for line in text.split("\n") if line.strip()]
+        top = 0
+        while (
+            top < min(_EDGE_LINES, len(lines) - 1)
+            and len(lines[top]) <= _EDGE_MAX_CHARS
+        ):
+            top += 1
+        bottom = len(lines)
+        while (
+            len(lines) - bottom < _EDGE_LINES
+            and bottom - 1 > top
+            and len(lines[bottom - 1]) <= _EDGE_MAX_CHARS
+        ):
+            bottom -= 1
+        body = " ".join(" ".join(lines[top:bottom]).split())
+        if len(body) < _MIN_BODY_CHARS:
+            return None
+        return hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class DuplicateIndex:
+    """In-memory exact + body-hash duplicate index over one book's pages.
+
+    Only pages that are *not* duplicates are added, so every match points at
+    the first occurrence of its content.
+    """
+
+    def __init__(self) -> None:
+        self._by_hash: dict[str, int] = {}
+        self._by_body: dict[str, int] = {}
+
+    def add(self, page: int, content_hash: str | None, body_hash: str | None) -> None:
+        if content_hash is not None:
+            self._by_hash.setdefault(content_hash, page)
+        if body_hash is not None:
+            self._by_body.setdefault(body_hash, page)
+
+    def find(self, content_hash: str | None, body_hash: str | None) -> int | None:
+        """Return the earliest indexed page this content duplicates, if any."""
+        if content_hash is not None and content_hash in self._by_hash:
+            return self._by_hash[content_hash]
+        if body_hash is not None:
+            return self._by_body.get(body_hash)
+        return None
@@ -17,6 +17,15 @@ class PDFExtractor:
     # Heuristic: if total extracted text across the PDF is shorter than this,
     # it's almost certainly a scanned/image-only PDF.
     _IMAGE_ONLY_CHAR_THRESHOLD = 100
+    # Typographic heading detection (_font_heading): lines among the first
+    # few, in the top part of the page, set this much larger than the
+    # page's median glyph size (or bold and a little larger).
+    _HEADING_SCAN_LINES = 4
+    _HEADING_TOP_SHARE = 0.4
+    _HEADING_SIZE_RATIO = 1.3
+    _HEADING_BOLD_SIZE_RATIO = 1.1
+    _HEADING_MIN_PAGE_CHARS = 200
+    _HEADING_MAX_CHARS = 120
 
     @classmethod
     def page_count(cls, pdf_path: str) -> int:
@@ -84,16 +93,61 @@ class PDFExtractor:
         return total
 
     @classmethod
-    def extract_one(cls, book_id: str, page_num: int) -> None:
-        """Extract a single page (1-indexed). Used by callers that emit progress."""
+    def extract_one(cls, book_id: str, page_num: int) -> str | None:
+        """Extract a single page (1-indexed). Used by callers that emit progress.
+
+        Returns the page's typographic heading (see _font_heading), if any —
+        only when the page is actually extracted, not when already on disk.
+        """
         pdf_path = AudiobookStore.pdf_path(book_id)
         out = AudiobookStore.page_raw_path(book_id, page_num)
         if os.path.exists(out):
-            return
+            return None
         with pdfplumber.open(pdf_path) as pdf:
             page = pdf.pages[page_num - 1]
             text = page.extract_text() or ""
+            try:
+                heading = cls._font_heading(page.extract_text_lines(), page.height)
+            except Exception as e:
+                print(f"[PDFExtractor] heading scan failed on page {page_num}: {e}")
+                heading = None
         cls._atomic_write(out, text)
+        return heading
+
+    @classmethod
+    def _font_heading(cls, lines: list[dict], page_height: float) -> str | None:
+        """A heading set apart by type: the first lines in the top part of the
+        page that are much larger than the page's body text, or bold and
+        somewhat larger. `lines` are pdfplumber text lines (with chars)."""
+        sizes = sorted(
+            round(c["size"], 1)
+            for line in lines
+            for c in line["chars"]
+            if c["text"].strip()
+        )
+        if len(sizes) < cls._HEADING_MIN_PAGE_CHARS:
+            return None
+        body = sizes[len(sizes) // 2]
+        parts: list[str] = []
+        for line in sorted(lines, key=lambda ln: ln["top"])[: cls._HEADING_SCAN_LINES]:
+            chars = [c for c in line["chars"] if c["text"].strip()]
+            if not chars or line["top"] > page_height * cls._HEADING_TOP_SHARE:
+                break
+            size = sorted(c["size"] for c in chars)[len(chars) // 2]
+            bold = all(
+                any(w in c.get("fontname", "") for w in ("Bold", "Black", "Heavy"))
+                for c in chars
+            )
+            if size >= body * cls._HEADING_SIZE_RATIO or (
+                bold and size >= body * cls._HEADING_BOLD_SIZE_RATIO
+            ):
+                parts.append(line["text"].strip())
+            elif parts:
+                break
+        title = " ".join(parts)
+        if not title or len(title) > cls._HEADING_MAX_CHARS:
+            return None
+        return title if any(ch.isalpha() for ch in title) else None
 
     @classmethod
     def iter_pages(cls, book_id: str) -> Iterable[int]:
@@ -161,20 +215,6 @@ class PDFExtractor:
         pil_img.save(buf, format="JPEG", quality=85, optimize=True)
         cls._atomic_write_bytes(out, buf.getvalue())
 
-    @classmethod
-    def render_page_image(
-        cls, pdf_path: str, page_num: int, resolution: int = 200
-    ) -> bytes:
-        """Render a single page (1-indexed) to JPEG bytes for Gemini OCR."""
-        with pdfplumber.open(pdf_path) as pdf:
-            page = pdf.pages[page_num - 1]
-            pil_img = page.to_image(resolution=resolution).original
-        if pil_img.mode != "RGB":
-            pil_img = pil_img.convert("RGB")
-        buf = io.BytesIO()
-        pil_img.save(buf, format="JPEG", quality=85)
-        return buf.getvalue()
-
     # ---------- atomic helpers ----------
 
     @staticmethod
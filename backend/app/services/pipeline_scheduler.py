@@ -0,0 +1,219 @@
+"""PipelineScheduler — phase-aware worker pools for audiobook jobs.
+
+Every stage (extract → clean → tts) owns a queue and its own pool of worker
+tasks, so books flow between phases independently: one book is cleaned
+(network-bound) while another is synthesised (CPU-bound), and a third is
+extracted. The stage handler decides where a job goes next by returning:
+
+  another stage's name  → queue the job there
+  its own stage's name  → requeue (the handler did one bounded slice of
+                          work; the worker moves on to the next job)
+  None                  → the job has left the pipeline
+
+Requeueing after a slice is the fairness mechanism: a 5-page upload waits
+behind one slice of a 1,000-page novel, not behind all of it.
+
+Within a stage, workers take the job with the smallest `key(job_id)`
+(FIFO among equal keys). The key is computed whenever a job is queued or
+reprioritized, so shortest-remaining-work-first falls out of a key that
+measures remaining work.
+
+A handler may also return several stage names to fork the job: the book
+keeps cleaning while its already-cleaned pages are synthesised. The job
+leaves the pipeline when its last branch returns None. Queueing a job in a
+stage it already occupies is coalesced — if it is running there, it runs
+there once more afterwards.
+
+Submitting a job that is already in the pipeline is a no-op if it is only
+queued; if any branch is running, the job reruns from the first stage once
+the current run leaves the pipeline.
+"""
+
+import asyncio
+import heapq
+import itertools
+from typing import Any, Awaitable, Callable
+
+StageHandler = Callable[[str, str], Awaitable[str | tuple[str, ...] | None]]
+
+
+class _StageQueue:
+    """Min-heap of jobs with re-keying. Re-keyed entries are left in the
+    heap marked dead; `_ready` holds one token per live entry so `get` only
+    wakes when there is a job to hand out."""
+
+    def __init__(self) -> None:
+        self._heap: list[list[Any]] = []
+        self._live: dict[str, list[Any]] = {}
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._seq = itertools.count()
+
+    def put(self, job_id: str, key: Any) -> None:
+        entry = [key, next(self._seq), job_id, True]
+        old = self._live.get(job_id)
+        if old is not None:
+            old[3] = False
+        else:
+            self._ready.put_nowait(None)
+        self._live[job_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._live
+
+    async def get(self) -> str:
+        await self._ready.get()
+        while True:
+            _, _, job_id, live = heapq.heappop(self._heap)
+            if live:
+                del self._live[job_id]
+                return job_id
+
+    def ordered(self) -> list[str]:
+        """Queued job ids in the order workers will take them."""
+        return [e[2] for e in sorted(self._live.values())]
+
+
+class PipelineScheduler:
+    def __init__(
+        self,
+        handler: StageHandler,
+        on_exit: Callable[[str], None] | None = None,
+        key: Callable[[str], Any] | None = None,
+    ) -> None:
+        self._handler = handler
+        self._on_exit = on_exit
+        self._key = key or (lambda job_id: 0)
+        # Stage name → worker count, in pipeline order.
+        self._workers: dict[str, int] = {}
+        self._queues: dict[str, _StageQueue] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Job → stages it is queued or running in.
+        self._stages: dict[str, set[str]] = {}
+        # (job, stage) pairs currently in a handler, and those to run again.
+        self._running: set[tuple[str, str]] = set()
+        self._again: set[tuple[str, str]] = set()
+        self._rerun: set[str] = set()
+
+    def add_stage(self, name: str, workers: int) -> None:
+        self._workers[name] = max(1, workers)
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        """Spawn the worker pools on the running loop. Idempotent; a loop
+        change (tests, app restart in-process) drops the old pools."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and not any(t.done() for t in self._tasks):
+            return
+        self.stop()
+        self._loop = loop
+        self._queues = {name: _StageQueue() for name in self._workers}
+        self._stages.clear()
+        self._running.clear()
+        self._again.clear()
+        self._rerun.clear()
+        for name, count in self._workers.items():
+            for _ in range(count):
+                self._tasks.append(asyncio.create_task(self._worker(name)))
+
+    def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        self._tasks = []
+
+    # ---------- jobs ----------
+
+    def submit(self, job_id: str) -> bool:
+        """Queue job_id at the first stage. Returns False if it was already
+        in the pipeline (a running job is flagged to rerun instead)."""
+        if job_id in self._stages:
+            if self.is_running(job_id):
+                self._rerun.add(job_id)
+            return False
+        self._put(next(iter(self._workers)), job_id)
+        return True
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._stages
+
+    def is_running(self, job_id: str) -> bool:
+        return any((job_id, stage) in self._running for stage in self._workers)
+
+    def stages_of(self, job_id: str) -> list[str]:
+        """Stages the job is queued or running in, in pipeline order."""
+        held = self._stages.get(job_id, ())
+        return [name for name in self._workers if name in held]
+
+    def workers(self, stage: str) -> int:
+        return self._workers[stage]
+
+    def reprioritize(self, job_id: str) -> bool:
+        """Recompute a job's key in every queue it waits in. False if it is
+        not waiting anywhere (running branches pick up the new key when they
+        are next queued)."""
+        rekeyed = False
+        for stage in self._stages.get(job_id, ()):
+            if job_id in self._queues[stage]:
+                self._queues[stage].put(job_id, self._key(job_id))
+                rekeyed = True
+        return rekeyed
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Per-stage worker count, queued job ids in pick order, and running
+        job ids."""
+        out: dict[str, dict[str, Any]] = {
+            name: {
+                "workers": n,
+                "queued": self._queues[name].ordered() if self._queues else [],
+                "running": [],
+            }
+            for name, n in self._workers.items()
+        }
+        for job_id, stage in self._running:
+            out[stage]["running"].append(job_id)
+        return out
+
+    def _put(self, stage: str, job_id: str) -> None:
+        held = self._stages.setdefault(job_id, set())
+        if stage in held:
+            if (job_id, stage) in self._running:
+                self._again.add((job_id, stage))
+            return
+        held.add(stage)
+        self._queues[stage].put(job_id, self._key(job_id))
+
+    def _route(
+        self, job_id: str, stage: str, nxt: str | tuple[str, ...] | None
+    ) -> None:
+        held = self._stages[job_id]
+        held.discard(stage)
+        if (job_id, stage) in self._again:
+            self._again.discard((job_id, stage))
+            self._put(stage, job_id)
+        for name in (nxt,) if isinstance(nxt, str) else nxt or ():
+            self._put(name, job_id)
+        if held:
+            return
+        del self._stages[job_id]
+        if job_id in self._rerun:
+            self._rerun.discard(job_id)
+            self._put(next(iter(self._workers)), job_id)
+            return
+        if self._on_exit is not None:
+            self._on_exit(job_id)
+
+    async def _worker(self, stage: str) -> None:
+        queue = self._queues[stage]
+        while True:
+            job_id = await queue.get()
+            self._running.add((job_id, stage))
+            try:
+                nxt = await self._handler(stage, job_id)
+            except Exception as e:
+                print(f"[Scheduler] {stage} worker crashed on {job_id}: {e}")
+                nxt = None
+            finally:
+                self._running.discard((job_id, stage))
+            self._route(job_id, stage, nxt)
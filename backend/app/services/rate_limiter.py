@@ -0,0 +1,213 @@
+"""AdaptiveLimiter — AIMD concurrency control plus RPM/TPM token buckets.
+
+One limiter is shared by every caller of a rate-limited API (all books, all
+keys), so a 429 seen by one worker slows everyone down instead of each
+worker discovering the limit on its own and retrying into it.
+
+Concurrency follows AIMD (additive increase, multiplicative decrease):
+
+  success at normal latency  → limit += 1 / limit   (≈ +1 per full window)
+  success at inflated latency → limit *= 0.9        (server-side queueing)
+  throttle error              → limit *= 0.5, and every caller holds off for
+                                a cooldown that doubles while throttles keep
+                                coming
+
+Latency is judged per token against a slow-moving baseline, so a long page
+taking longer than a short one is not mistaken for congestion.
+
+Independently, token buckets refilled at the configured requests-per-minute
+and tokens-per-minute keep the request rate under quota even while latency
+looks healthy (0 disables a bucket).
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+
+class _TokenBucket:
+    """Per-minute budget refilled continuously; capacity is one minute's worth."""
+
+    def __init__(self, per_minute: int, now: float) -> None:
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self._rate = per_minute / 60.0
+        self._stamp = now
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._stamp) * self._rate)
+        self._stamp = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        # A single request larger than the bucket waits for a full bucket.
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self._rate)
+
+    def take(self, amount: float, now: float) -> None:
+        if self.capacity:
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+
+
+class AdaptiveLimiter:
+    # Latency above this multiple of the per-token baseline counts as
+    # congestion; the baseline is an EWMA with this weight per sample.
+    _LATENCY_TOLERANCE = 2.0
+    _BASELINE_ALPHA = 0.05
+    _DECREASE_ON_LATENCY = 0.9
+    _DECREASE_ON_THROTTLE = 0.5
+    _MAX_COOLDOWN = 60.0
+
+    def __init__(
+        self,
+        rpm: int = 0,
+        tpm: int = 0,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 16,
+        throttled: type[BaseException] | tuple[type[BaseException], ...] = (),
+        cooldown: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self._throttled = throttled
+        self._cooldown = cooldown
+        self._clock = clock
+        now = clock()
+        self._requests = _TokenBucket(rpm, now)
+        self._tokens = _TokenBucket(tpm, now)
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Seconds per token considered normal; None until the first success.
+        self._baseline: float | None = None
+        self._blocked_until = 0.0
+        self._throttle_streak = 0
+        self._last_decrease = float("-inf")
+        self.throttles = 0
+
+    # ---------- public ----------
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 1) -> AsyncIterator[None]:
+        """Hold one concurrency slot for a request of ~`tokens` tokens and
+        feed its outcome back into the limit."""
+        await self._acquire(tokens)
+        start = self._clock()
+        try:
+            yield
+        except BaseException as e:
+            if self._throttled and isinstance(e, self._throttled):
+                self._on_throttle()
+            raise
+        else:
+            self._on_success(self._clock() - start, tokens)
+        finally:
+            self._release()
+
+    def snapshot(self) -> dict[str, float | int]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "throttles": self.throttles,
+            "cooldown_seconds": round(max(0.0, self._blocked_until - self._clock()), 2),
+        }
+
+    # ---------- admission ----------
+
+    async def _acquire(self, tokens: int) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Slots and waiters belong to the old loop's (dead) tasks.
+            self._loop = loop
+            self._in_flight = 0
+            self._waiters.clear()
+        while True:
+            now = self._clock()
+            wait = self._blocked_until - now
+            if wait <= 0 and self._in_flight < int(self.limit):
+                wait = max(
+                    self._requests.wait_time(1, now),
+                    self._tokens.wait_time(tokens, now),
+                )
+                if wait <= 0:
+                    self._requests.take(1, now)
+                    self._tokens.take(tokens, now)
+                    self._in_flight += 1
+                    return
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            fut = loop.create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            finally:
+                if not fut.done():
+                    fut.cancel()
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+
+    def _release(self) -> None:
+        self._in_flight = max(0, self._in_flight - 1)
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self._in_flight
+        for fut in list(self._waiters):
+            if free <= 0:
+                break
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
+
+    # ---------- feedback ----------
+
+    def _on_success(self, elapsed: float, tokens: int) -> None:
+        self._throttle_streak = 0
+        per_token = elapsed / max(1, tokens)
+        if self._baseline is None:
+            self._baseline = per_token
+        elif per_token > self._baseline * self._LATENCY_TOLERANCE:
+            self._decrease(self._DECREASE_ON_LATENCY)
+        else:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+        self._baseline += self._BASELINE_ALPHA * (per_token - self._baseline)
+        self._wake()
+
+    def _on_throttle(self) -> None:
+        self.throttles += 1
+        now = self._clock()
+        # Requests already in flight when the first 429 of a burst arrived
+        # extend the cooldown but do not halve the limit or double the
+        # cooldown again.
+        if now >= self._blocked_until:
+            self._throttle_streak += 1
+            self.limit = max(
+                float(self.minimum), self.limit * self._DECREASE_ON_THROTTLE
+            )
+            self._last_decrease = now
+        cooldown = min(
+            self._MAX_COOLDOWN, self._cooldown * 2 ** (self._throttle_streak - 1)
+        )
+        self._blocked_until = max(self._blocked_until, now + cooldown)
+
+    def _decrease(self, factor: float) -> None:
+        """Multiplicative decrease, at most once per cooldown period so a
+        run of slow responses from one congested moment counts once."""
+        now = self._clock()
+        if now - self._last_decrease < self._cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit * factor)
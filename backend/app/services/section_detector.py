@@ -0,0 +1,235 @@
+"""Section detection without one giant prompt.
+
+Two sources, cheapest first:
+
+  headings  found on each page at extraction time — a large or bold line at
+            the top of a PDF page (PDFExtractor.extract_one), a markdown
+            heading, or a "Chapter 7" / "Part II" / "Epilogue" line. When the
+            headings look like a real chapter list the book is sectioned
+            from them with no API call at all.
+  windows   otherwise Gemini reads fixed windows of consecutive pages — just
+            the top of each page — as soon as every page in a window has
+            been cleaned (SectionStream), so when the last page is done only
+            the final window is left to ask about.
+
+Windows overlap by a few pages for context, but each page is owned by exactly
+one window and only sections starting on an owned page are kept from it.
+"""
+
+import asyncio
+import re
+
+# Lines at the top of a PDF page searched for a heading (raw PDF text has no
+# paragraph breaks, and a chapter heading is always near the top).
+_TOP_LINES = 3
+_MAX_HEADING_CHARS = 80
+# Words after the "Chapter 7" label that can still be its title.
+_MAX_TITLE_WORDS = 10
+# A page with this many chapter-like lines is a table of contents.
+_TOC_MIN_ENTRIES = 3
+
+_NUMBER_WORDS = (
+    "one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|"
+    "fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|twenty|thirty|forty|"
+    "fifty|first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth"
+)
+_LABEL_RE = re.compile(
+    r"^(?:chapter|part|book)\s+(?:\d{1,3}|[ivxlc]{1,7}|"
+    rf"(?:{_NUMBER_WORDS})(?:[\s-](?:{_NUMBER_WORDS}))?)\b[.:\-–—]?\s*(.*)$",
+    re.IGNORECASE,
+)
+_NAMED_RE = re.compile(
+    r"^(?:prologue|epilogue|introduction|preface|foreword|afterword|"
+    r"conclusion|acknowledge?ments|appendix(?:\s+[a-z0-9]{1,3})?)\b[.:\-–—]?\s*"
+    r"(.*)$",
+    re.IGNORECASE,
+)
+_MARKDOWN_RE = re.compile(r"^#{1,2}\s+(\S.*?)\s*#*$")
+# "Chapter 3 .......... 41" / "Chapter 3 Habits 41" — a contents entry.
+_TOC_ENTRY_RE = re.compile(r"(?:\.{2,}|…|\s)\s*\d{1,4}$")
+
+# The headings pass as a chapter list when there are at least two of them,
+# no more than one per this many pages (denser is running headers or
+# subsections), and the first starts early enough that little of the book
+# would end up as "Front Matter".
+_MIN_HEADINGS = 2
+_MIN_PAGES_PER_HEADING = 3
+_MAX_FRONT_MATTER_SHARE = 0.3
+_MAX_FRONT_MATTER_PAGES = 10
+
+
+def text_heading(text: str, top_only: bool) -> str | None:
+    """The heading a page starts (top_only: raw PDF page) or contains (a text
+    page, where chapters begin mid-page as paragraphs of their own), if any."""
+    lines = [line.strip() for line in text.split("\n")]
+    if top_only:
+        candidates = [i for i, line in enumerate(lines) if line][:_TOP_LINES]
+    else:
+        # First line of each paragraph.
+        candidates = [
+            i for i, line in enumerate(lines) if line and (i == 0 or not lines[i - 1])
+        ]
+    if sum(bool(_LABEL_RE.match(line)) for line in lines) >= _TOC_MIN_ENTRIES:
+        return None
+    for i in candidates:
+        title = _match_heading(lines, i)
+        if title is not None:
+            return title
+    return None
+
+
+def _match_heading(lines: list[str], i: int) -> str | None:
+    line = lines[i]
+    if len(line) > _MAX_HEADING_CHARS:
+        return None
+    m = _MARKDOWN_RE.match(line)
+    if m:
+        return m.group(1)
+    m = _LABEL_RE.match(line) or _NAMED_RE.match(line)
+    if m is None:
+        return None
+    rest = m.group(1).strip()
+    if rest:
+        # "Chapter 3 explains how habits form." is a sentence, not a heading.
+        if (
+            len(rest.split()) > _MAX_TITLE_WORDS
+            or rest.endswith((".", ",", ";"))
+            or _TOC_ENTRY_RE.search(rest)
+        ):
+            return None
+        return line
+    # A bare "Chapter 3" takes its title from the next line when that is short.
+    nxt = next((line for line in lines[i + 1 :] if line), "")
+    if (
+        nxt
+        and len(nxt.split()) <= _MAX_TITLE_WORDS
+        and not nxt.endswith((".", ",", ";"))
+        and not _TOC_ENTRY_RE.search(nxt)
+        and not (_LABEL_RE.match(nxt) or _NAMED_RE.match(nxt))
+    ):
+        return f"{line}: {nxt}"
+    return line
+
+
+def _heading_key(title: str) -> str:
+    """First two words, normalized: a heading and a running header repeating
+    it ("CHAPTER 3 Habits", "Chapter 3: Habits") compare equal."""
+    return " ".join(re.sub(r"[^\w\s]", " ", title.lower()).split()[:2])
+
+
+def sections_from_headings(
+    headings: dict[int, str], page_count: int, confident_only: bool = True
+) -> list[dict] | None:
+    """Contiguous sections from per-page headings, or None when there are
+    none — or, with confident_only, when they don't look like a chapter list.
+    """
+    starts: list[dict] = []
+    for page in sorted(headings):
+        title = headings[page]
+        if starts and _heading_key(starts[-1]["title"]) == _heading_key(title):
+            continue
+        starts.append({"title": title, "start_page": page, "end_page": page})
+    if not starts:
+        return None
+    if confident_only and (
+        len(starts) < _MIN_HEADINGS
+        or len(starts) > max(_MIN_HEADINGS, page_count // _MIN_PAGES_PER_HEADING)
+        or starts[0]["start_page"]
+        > max(_MAX_FRONT_MATTER_PAGES, _MAX_FRONT_MATTER_SHARE * page_count)
+    ):
+        return None
+    return stitch_sections(starts, page_count)
+
+
+def stitch_sections(sections: list[dict], page_count: int) -> list[dict]:
+    """Merge overlapping/duplicate sections from chunked results into one
+    contiguous, non-overlapping list covering [1..page_count]."""
+    if not sections:
+        return []
+
+    seen: set[tuple] = set()
+    unique: list[dict] = []
+    for s in sorted(sections, key=lambda x: (x["start_page"], x["end_page"])):
+        key = (s["title"].lower().strip(), s["start_page"])
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(s)
+
+    cleaned: list[dict] = []
+    for s in unique:
+        if cleaned and s["start_page"] <= cleaned[-1]["start_page"]:
+            continue
+        cleaned.append(s)
+    for i, s in enumerate(cleaned):
+        if i + 1 < len(cleaned):
+            s["end_page"] = max(s["start_page"], cleaned[i + 1]["start_page"] - 1)
+        else:
+            s["end_page"] = page_count
+
+    if cleaned and cleaned[0]["start_page"] > 1:
+        cleaned.insert(
+            0,
+            {
+                "title": "Front Matter",
+                "start_page": 1,
+                "end_page": cleaned[0]["start_page"] - 1,
+            },
+        )
+    return cleaned
+
+
+class SectionStream:
+    """One book's windowed section detection while it is being cleaned.
+
+    Holds only an excerpt of each cleaned page (the top `excerpt_chars`),
+    so memory stays small for any book size. The caller runs the Gemini
+    call for each window `ready()` hands out and reports back with
+    `add_found()`.
+    """
+
+    def __init__(
+        self,
+        page_count: int,
+        windows: list[tuple[int, int, int]],
+        excerpt_chars: int,
+    ) -> None:
+        self.page_count = page_count
+        # (first_page, first_owned_page, last_page) per window.
+        self.windows = windows
+        self.tasks: list[asyncio.Task] = []
+        self._excerpt_chars = excerpt_chars
+        self._excerpts: dict[int, str] = {}
+        self._taken: set[int] = set()
+        self._found: list[dict] = []
+
+    def add(self, n: int, text: str) -> None:
+        self._excerpts[n] = text[: self._excerpt_chars]
+
+    def ready(self) -> list[int]:
+        """Windows whose pages are all cleaned and not yet handed out."""
+        out = [
+            i
+            for i, (first, _, last) in enumerate(self.windows)
+            if i not in self._taken
+            and all(n in self._excerpts for n in range(first, last + 1))
+        ]
+        self._taken.update(out)
+        return out
+
+    def rest(self) -> list[int]:
+        """Every window not handed out yet (pages never cleaned read as "")."""
+        out = [i for i in range(len(self.windows)) if i not in self._taken]
+        self._taken.update(out)
+        return out
+
+    def window_pages(self, i: int) -> tuple[int, list[str]]:
+        first, _, last = self.windows[i]
+        return first, [self._excerpts.get(n, "") for n in range(first, last + 1)]
+
+    def add_found(self, i: int, sections: list[dict]) -> None:
+        _, owned, last = self.windows[i]
+        self._found.extend(s for s in sections if owned <= s["start_page"] <= last)
+
+    def sections(self) -> list[dict]:
+        return stitch_sections(list(self._found), self.page_count)
@@ -5,11 +5,15 @@ either class based on meta["file_ext"] without branching everywhere.
 
 All file-system writes are atomic (tmp+rename). All methods are sync;
 callers wrap in run_in_executor when called from async code.
+
+TXT/MD sources are paginated as a stream: lines are read incrementally,
+grouped into paragraphs at blank lines, and packed into pages as they
+arrive, so memory stays bounded by one page regardless of file size.
 """
 
 import io
 import os
-import re
+from typing import Iterable, Iterator
 
 from app.services.audiobook_store import AudiobookStore
 from PIL import Image, ImageDraw
@@ -19,38 +23,82 @@ _WORDS_PER_PAGE = 400
 
 
 class TextExtractor:
-    # ---------- text reading ----------
+    # ---------- pagination ----------
+
+    @classmethod
+    def split_pages(cls, text: str) -> list[str]:
+        """Split text into ~_WORDS_PER_PAGE-word pages at paragraph boundaries."""
+        # Normalise line endings, then split on blank lines.
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return list(cls._paginate(cls._paragraphs_from_lines(text.split("\n"))))
+
+    # ---------- streaming ----------
 
     @classmethod
-    def read_text(cls, source_path: str) -> str:
-        """Return the full plain-text content of a TXT, MD, or DOCX file."""
+    def iter_paragraphs(cls, source_path: str) -> Iterator[str]:
+        """Yield stripped, non-empty paragraphs without loading the whole file.
+
+        DOCX is parsed by python-docx (which holds the document anyway); TXT/MD
+        are read line by line with universal newlines, so CRLF / CR endings are
+        normalised exactly like `split_pages`.
+        """
         ext = os.path.splitext(source_path)[1].lower()
         if ext == ".docx":
             from docx import Document  # python-docx
 
             doc = Document(source_path)
-            paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-            return "\n\n".join(paragraphs)
-        else:
-            with open(source_path, encoding="utf-8", errors="replace") as f:
-                return f.read()
+            for p in doc.paragraphs:
+                if p.text.strip():
+                    yield p.text.strip()
+            return
+        with open(source_path, encoding="utf-8", errors="replace") as f:
+            yield from cls._paragraphs_from_lines(f)
 
     @classmethod
-    def split_pages(cls, text: str) -> list[str]:
-        """Split text into ~_WORDS_PER_PAGE-word pages at paragraph boundaries."""
-        # Normalise line endings, then split on blank lines.
-        text = text.replace("\r\n", "\n").replace("\r", "\n")
-        raw_paras = re.split(r"\n{2,}", text)
-        paragraphs = [p.strip() for p in raw_paras if p.strip()]
+    def iter_page_texts(cls, source_path: str) -> Iterator[str]:
+        """Yield ~_WORDS_PER_PAGE-word pages as paragraphs arrive from disk."""
+        return cls._paginate(cls.iter_paragraphs(source_path))
 
-        pages: list[str] = []
+    @staticmethod
+    def _paragraphs_from_lines(lines: Iterable[str]) -> Iterator[str]:
+        """Group lines into paragraphs separated by blank lines.
+
+        A paragraph that grows past _WORDS_PER_PAGE words is cut at the next
+        line break: log dumps and transcripts often have no blank lines at
+        all, and would otherwise become one paragraph the size of the file.
+        """
+        buf: list[str] = []
+        words = 0
+        for line in lines:
+            line = line.rstrip("\n")
+            if line:
+                buf.append(line)
+                words += len(line.split())
+                if words <= _WORDS_PER_PAGE:
+                    continue
+            if buf:
+                para = "\n".join(buf).strip()
+                if para:
+                    yield para
+            buf = []
+            words = 0
+        if buf:
+            para = "\n".join(buf).strip()
+            if para:
+                yield para
+
+    @staticmethod
+    def _paginate(paragraphs: Iterable[str]) -> Iterator[str]:
+        """Pack paragraphs into pages. Always yields at least one (maybe empty) page."""
         current: list[str] = []
         current_words = 0
+        emitted = False
 
         for para in paragraphs:
             wc = len(para.split())
             if current_words + wc > _WORDS_PER_PAGE and current:
-                pages.append("\n\n".join(current))
+                yield "\n\n".join(current)
+                emitted = True
                 current = [para]
                 current_words = wc
             else:
@@ -58,65 +106,73 @@ class TextExtractor:
                 current_words += wc
 
         if current:
-            pages.append("\n\n".join(current))
-
-        return pages if pages else [""]
+            yield "\n\n".join(current)
+        elif not emitted:
+            yield ""
 
     # ---------- PDFExtractor-compatible interface ----------
 
     @classmethod
     def page_count(cls, source_path: str) -> int:
-        text = cls.read_text(source_path)
-        return len(cls.split_pages(text))
+        return sum(1 for _ in cls.iter_page_texts(source_path))
 
     @classmethod
     def is_image_only(cls, source_path: str) -> bool:
         return False
 
+    @classmethod
+    def _sample_pages(cls, source_path: str) -> list[str]:
+        """Return pages first / mid / last via two streaming passes."""
+        n = cls.page_count(source_path)
+        indices = {0, n // 2, n - 1}
+        return [
+            p for i, p in enumerate(cls.iter_page_texts(source_path)) if i in indices
+        ]
+
     @classmethod
     def sample_word_count(cls, source_path: str) -> int:
-        text = cls.read_text(source_path)
-        pages = cls.split_pages(text)
-        n = len(pages)
-        if n == 0:
+        samples = [len(p.split()) for p in cls._sample_pages(source_path)]
+        if not samples:
             return 0
-        indices = sorted({0, n // 2, n - 1})
-        samples = [len(pages[i].split()) for i in indices]
         return sum(samples) // len(samples)
 
     @classmethod
     def sample_char_count(cls, source_path: str) -> int:
-        text = cls.read_text(source_path)
-        pages = cls.split_pages(text)
-        n = len(pages)
-        if n == 0:
+        samples = [len(p) for p in cls._sample_pages(source_path)]
+        if not samples:
             return 0
-        indices = sorted({0, n // 2, n - 1})
-        samples = [len(pages[i]) for i in indices]
         return sum(samples) // len(samples)
 
     @classmethod
-    def extract_one(cls, book_id: str, page_num: int) -> None:
-        """Write page_num (1-indexed) to pages/{n:03d}.txt.
+    def extract_all(cls, book_id: str) -> int:
+        """Stream every page to pages/{n:03d}.txt. Skip pages already extracted.
 
-        On first call for a book, splits and writes ALL pages at once so
-        subsequent calls for pages 2..N find their files and skip I/O.
+        Returns total page count. Atomic per page (tmp+rename); only one page
+        is held in memory at a time.
         """
-        out = AudiobookStore.page_raw_path(book_id, page_num)
-        if os.path.exists(out):
-            return
-
         meta = AudiobookStore.read_meta(book_id) or {}
         file_ext = meta.get("file_ext", "txt")
         source_path = AudiobookStore.source_file_path(book_id, file_ext)
 
-        text = cls.read_text(source_path)
-        pages = cls.split_pages(text)
-
-        for i, page_text in enumerate(pages, start=1):
+        total = 0
+        for i, page_text in enumerate(cls.iter_page_texts(source_path), start=1):
+            total = i
             p = AudiobookStore.page_raw_path(book_id, i)
             if not os.path.exists(p):
                 cls._atomic_write(p, page_text)
+        return total
+
+    @classmethod
+    def extract_one(cls, book_id: str, page_num: int) -> None:
+        """Write page_num (1-indexed) to pages/{n:03d}.txt.
+
+        On first call for a book, streams and writes ALL pages so subsequent
+        calls for pages 2..N find their files and skip I/O.
+        """
+        out = AudiobookStore.page_raw_path(book_id, page_num)
+        if os.path.exists(out):
+            return
+        cls.extract_all(book_id)
 
     @classmethod
     def read_outline(cls, source_path: str):
@@ -0,0 +1,105 @@
+"""TimingIndex — compact binary segment → audio-sample index for a book.
+
+The TTS phase records where every synthesized segment (≈ one clause) starts
+in the page WAV; concat merges the per-page files into one book-level index
+with absolute sample offsets into audio.wav. Clients load it once and seek to
+a sentence with a binary search instead of seeking to the page and scanning.
+
+File layout (little-endian):
+
+    header   magic b"SSTI" | version u16 | reserved u16 | sample_rate u32 |
+             count u32                                          (16 bytes)
+    records  count × { page u32 | word u32 | words u16 | start u64 |
+                       length u32 }                             (22 bytes each)
+
+`word` is the index of the segment's first word within its page's cleaned
+text (str.split() words); `start` / `length` are in samples, `length`
+excluding the pause after the segment. Records are sorted by `start`.
+"""
+
+import os
+import struct
+from typing import Iterable
+
+import numpy as np
+from app.services.tts import SegmentTiming
+
+_MAGIC = b"SSTI"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHII")
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("page", "<u4"),
+        ("word", "<u4"),
+        ("words", "<u2"),
+        ("start", "<u8"),
+        ("length", "<u4"),
+    ]
+)
+
+
+class TimingIndex:
+    @staticmethod
+    def from_segments(timings: Iterable[SegmentTiming], page: int = 0) -> np.ndarray:
+        """Pack TTSEngine segment timings into index records for one page."""
+        rows = [
+            (
+                page,
+                t.word_start,
+                min(t.word_count, 0xFFFF),
+                t.sample_offset,
+                t.speech_samples,
+            )
+            for t in timings
+        ]
+        return np.array(rows, dtype=RECORD_DTYPE)
+
+    @staticmethod
+    def write(path: str, records: np.ndarray, sample_rate: int) -> None:
+        """Atomically write records (tmp+rename)."""
+        records = np.ascontiguousarray(records, dtype=RECORD_DTYPE)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, 0, sample_rate, len(records)))
+            f.write(records.tobytes())
+        os.replace(tmp, path)
+
+    @staticmethod
+    def read(path: str) -> tuple[np.ndarray, int]:
+        """Return (records, sample_rate). Raises ValueError on a malformed file."""
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"timing index too short: {path}")
+        magic, version, _, sample_rate, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"not a v{_VERSION} timing index: {path}")
+        if len(data) != _HEADER.size + count * RECORD_DTYPE.itemsize:
+            raise ValueError(f"truncated timing index: {path}")
+        records = np.frombuffer(data, dtype=RECORD_DTYPE, offset=_HEADER.size)
+        return records, sample_rate
+
+    @staticmethod
+    def merge(pages: Iterable[tuple[int, np.ndarray, int]]) -> np.ndarray:
+        """Concatenate per-page records into one book index.
+
+        `pages` yields (page_no, page_records, first_sample_of_page); each
+        page's relative offsets are shifted to absolute ones.
+        """
+        parts = []
+        for page_no, records, base in pages:
+            shifted = records.copy()
+            shifted["page"] = page_no
+            shifted["start"] += np.uint64(base)
+            parts.append(shifted)
+        if not parts:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.concatenate(parts)
+
+    @staticmethod
+    def locate(records: np.ndarray, sample: int) -> int:
+        """Index of the segment playing at `sample` (the last one starting at
+        or before it), or -1 if `sample` precedes the first segment."""
+        return int(np.searchsorted(records["start"], sample, side="right")) - 1
@@ -5,19 +5,105 @@ import os
 import re
 import time
 from collections import OrderedDict
-from typing import AsyncGenerator
+from typing import AsyncGenerator, NamedTuple
 
 import numpy as np
 import onnxruntime as ort
 from app.core.config import settings
+from app.core.metrics import (
+    INTERACTIVE_GATE_WAIT_SECONDS,
+    TTS_PHONEMIZE_SECONDS,
+    TTS_SEGMENT_SECONDS,
+    cache_lookup,
+)
 from app.services.audio import AudioService
 from kokoro_onnx import Kokoro
 
-# Module-level preemption lock: interactive /speak holds this; the audiobook
-# TTS phase awaits it between every page so a hotkey request fires within one
-# page-generation latency (≈350 ms) and the audiobook job pauses gracefully
-# until the interactive request finishes, then resumes the next page.
-interactive_tts_lock: asyncio.Lock = asyncio.Lock()
+
+class PreemptionGate:
+    """Interactive speech pre-empts background (audiobook) synthesis.
+
+    Interactive callers hold the gate for the lifetime of their stream —
+    acquire()/release(), one at a time in arrival order. Background work calls
+    `await checkpoint()` at fine-grained points (before every segment inside
+    TTSEngine.generate, between pages in the pipeline): it returns at once
+    while no interactive request is waiting or streaming, and otherwise parks
+    until the last one releases. The fast path takes no lock, so a running
+    audiobook pays nothing per checkpoint, and a hotkey request waits for at
+    most the one segment (≈100-350 ms) already on the inference thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = asyncio.Lock()
+        # Interactive requests waiting for or holding the gate.
+        self._pending = 0
+        self._open = asyncio.Event()
+        self._open.set()
+
+    async def acquire(self) -> None:
+        self._pending += 1
+        self._open.clear()
+        start = time.perf_counter()
+        try:
+            await self._lock.acquire()
+        except BaseException:
+            self._drop_pending()
+            raise
+        INTERACTIVE_GATE_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+    def release(self) -> None:
+        self._lock.release()
+        self._drop_pending()
+
+    def _drop_pending(self) -> None:
+        self._pending -= 1
+        if self._pending == 0:
+            self._open.set()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def is_paused(self) -> bool:
+        """True while background work would park at a checkpoint."""
+        return self._pending > 0
+
+    async def checkpoint(self) -> None:
+        if self._pending:
+            await self._open.wait()
+
+
+# Module-level gate: interactive /speak holds it; audiobook synthesis parks at
+# its checkpoints until the interactive stream finishes, then carries on from
+# the next segment.
+interactive_tts_gate = PreemptionGate()
+
+
+def _time_phonemizer(model: Kokoro) -> None:
+    """Record every espeak-ng call Kokoro.create makes in
+    TTS_PHONEMIZE_SECONDS (installed after the warm-up, so only real
+    requests count)."""
+    phonemize = model.tokenizer.phonemize
+
+    def timed(*args, **kwargs):
+        with TTS_PHONEMIZE_SECONDS.time():
+            return phonemize(*args, **kwargs)
+
+    model.tokenizer.phonemize = timed
+
+
+class SegmentTiming(NamedTuple):
+    """Where one synthesized segment sits in the generate() output stream.
+
+    Words are counted with str.split() over the input text; samples are
+    relative to the first sample generate() yields. Kokoro returns no
+    per-phoneme durations, so a segment (≈5 words / one clause) is the
+    finest alignment available.
+    """
+
+    word_start: int  # index of the segment's first word in the input text
+    word_count: int
+    sample_offset: int  # first sample of the segment's chunk
+    speech_samples: int  # speech length, excluding the trailing pause
 
 
 class TTSEngine:
@@ -212,6 +298,7 @@ class TTSEngine:
                 # Warm-up: first inference is 2-5x slower due to memory allocation
                 # and espeak-ng phonemizer initialization
                 cls._model.create("Hello.", "af_bella", 1.0, "en-us")
+                _time_phonemizer(cls._model)
                 print("[TTS] Ready")
             except Exception as e:
                 print(f"[TTS] Fatal Error: {e}")
@@ -267,8 +354,22 @@ class TTSEngine:
 
     @classmethod
     async def generate(
-        cls, text: str, voice: str, speed: float
+        cls,
+        text: str,
+        voice: str,
+        speed: float,
+        timings: list[SegmentTiming] | None = None,
+        background: bool = False,
     ) -> AsyncGenerator[np.ndarray, None]:
+        """Yield one chunk (speech + trailing pause) per segment.
+
+        If `timings` is given, a SegmentTiming is appended for every chunk
+        as it is yielded. Segments the model fails on are skipped, but their
+        words still count, so word indices always refer to the input text.
+
+        background=True makes every segment a preemption checkpoint: the
+        generator parks on interactive_tts_gate while a /speak is pending.
+        """
         if not cls._model or not cls._executor:
             raise RuntimeError("Model not initialized. Call initialize() first.")
 
@@ -281,8 +382,15 @@ class TTSEngine:
         pause_map = {".": 0.35, "!": 0.35, "?": 0.35, ":": 0.2, ";": 0.2, ",": 0.12}
 
         loop = asyncio.get_running_loop()
+        word_pos = 0
+        sample_pos = 0
 
         for i, seg_text in enumerate(segments):
+            seg_words = len(seg_text.split())
+            word_start = word_pos
+            word_pos += seg_words
+            if background:
+                await interactive_tts_gate.checkpoint()
             cls.touch()  # Keep idle timer alive throughout multi-segment generation
             seg_stripped = seg_text.strip()
             audio = None
@@ -291,20 +399,25 @@ class TTSEngine:
             if i == 0:
                 key = (seg_stripped, voice, round(speed, 2))
                 cached = cls._lookahead_cache.pop(key, None)
+                if not background:
+                    cache_lookup("lookahead", cached is not None)
                 if cached is not None:
                     print(f"[TTS] Cache hit: streaming '{seg_stripped[:30]}'")
                     audio = cached
 
             if audio is None:
                 try:
-                    audio, _ = await loop.run_in_executor(
-                        cls._executor,
-                        cls._model.create,
-                        seg_stripped,
-                        voice,
-                        speed,
-                        "en-us",
-                    )
+                    with TTS_SEGMENT_SECONDS.time(
+                        kind="background" if background else "interactive"
+                    ):
+                        audio, _ = await loop.run_in_executor(
+                            cls._executor,
+                            cls._model.create,
+                            seg_stripped,
+                            voice,
+                            speed,
+                            "en-us",
+                        )
                 except Exception as e:
                     print(f"[TTS] Model Error on '{seg_text[:30]}': {e}")
                     continue
@@ -318,4 +431,9 @@ class TTSEngine:
             silence_sec = pause_map.get(last_char, 0.1) / speed
             silence = AudioService.get_silence(silence_sec)
 
+            if timings is not None:
+                timings.append(
+                    SegmentTiming(word_start, seg_words, sample_pos, len(audio))
+                )
+            sample_pos += len(audio) + len(silence)
             yield np.concatenate([audio, silence])
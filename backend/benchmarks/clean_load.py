@@ -0,0 +1,111 @@
+"""Cleaning load test against the fake Gemini server — no network needed.
+
+Starts benchmarks/fake_gemini.py in-process, points GeminiCleaner at it and
+cleans N synthetic pages through the real client cache, batching and shared
+adaptive rate limiter, then reports throughput alongside the limiter's and
+the server's view of the run.
+
+    python -m benchmarks.clean_load --pages 10000 --latency-ms 800 \\
+        --rpm 2000 --rate-429 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import uvicorn
+from app.services.gemini_cleaner import GeminiCleaner, gemini_limiter
+
+from benchmarks.fake_gemini import FakeGeminiConfig, create_app
+
+_WORDS = (
+    "the quick brown fox jumps over a lazy dog while river stones glow amber "
+    "under quiet harbor lanterns and violet orchards bloom past the meadow"
+).split()
+
+
+def _page(rng: random.Random, words: int) -> str:
+    lines = []
+    for _ in range(max(1, words // 12)):
+        lines.append(" ".join(rng.choices(_WORDS, k=12)))
+    return "\n".join(lines) + "."
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    config = FakeGeminiConfig(
+        latency_ms=args.latency_ms,
+        ms_per_token=args.ms_per_token,
+        rate_429=args.rate_429,
+        rate_500=args.rate_500,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        seed=args.seed,
+    )
+    app = create_app(config)
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=args.port, log_config=None)
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    GeminiCleaner.set_base_url(f"http://127.0.0.1:{args.port}")
+
+    rng = random.Random(args.seed)
+    pages = [_page(rng, args.words) for _ in range(args.pages)]
+    failed = 0
+
+    async def clean(text: str) -> None:
+        nonlocal failed
+        try:
+            await GeminiCleaner.clean_page("fake-key", text)
+        except Exception:
+            failed += 1
+
+    async def clean_batch(batch: list[int]) -> None:
+        results = await GeminiCleaner.clean_batch("fake-key", [pages[i] for i in batch])
+        await asyncio.gather(
+            *(clean(pages[i]) for i, r in zip(batch, results) if r is None)
+        )
+
+    start = time.perf_counter()
+    if args.batch_tokens:
+        batches = GeminiCleaner.pack_batches(pages, args.batch_tokens)
+        await asyncio.gather(*(clean_batch(b) for b in batches))
+    else:
+        await asyncio.gather(*(clean(p) for p in pages))
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "pages": args.pages,
+        "failed_pages": failed,
+        "seconds": round(elapsed, 2),
+        "pages_per_second": round(args.pages / elapsed, 1),
+        "limiter": gemini_limiter.snapshot(),
+        "server": app.state.stats.as_dict(),
+    }
+    server.should_exit = True
+    await serving
+    await GeminiCleaner.aclose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GeminiCleaner load test")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--batch-tokens", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--ms-per-token", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0)
+    parser.add_argument("--tpm", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    print(json.dumps(asyncio.run(_run(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
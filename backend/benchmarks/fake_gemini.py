@@ -0,0 +1,220 @@
+"""Fake Gemini — a local, deterministic stand-in for the generateContent API.
+
+Speaks enough of `POST /v1beta/models/{model}:generateContent` for the
+google-genai SDK (and so GeminiCleaner) to talk to it unchanged, which lets
+the cleaning pipeline, batching and the adaptive rate limiter be load-tested
+at 10,000-page scale with no network and no API spend.
+
+Responses:
+  text cleaning    the input echoed back (batch page markers survive)
+  JSON requests    section detection: one section per `--section-pages`
+                   `=== PAGE N ===` headers
+  image input      a fixed line of "OCR" text
+
+Behaviour knobs (CLI flags, or FakeGeminiConfig in-process):
+  latency          lognormal around `latency_ms` + `ms_per_token` × tokens
+  error injection  `rate_429` / `rate_500` probabilities per request
+  quota            `rpm` / `tpm` sliding-minute limits answered with 429
+  seed             fixes the RNG, so a run is reproducible
+
+`GET /stats` reports request, error and token counts plus latency
+percentiles; `POST /reset` zeroes them.
+
+Run it, then point the backend at it:
+
+    python -m benchmarks.fake_gemini --port 8799 --latency-ms 600 --rpm 1000
+    GEMINI_BASE_URL=http://127.0.0.1:8799 python -m app.main
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+_PAGE_HEADER_RE = re.compile(r"^=== PAGE (\d+) ===$", re.M)
+
+
+@dataclass
+class FakeGeminiConfig:
+    latency_ms: float = 0.0
+    latency_sigma: float = 0.3
+    ms_per_token: float = 0.0
+    rate_429: float = 0.0
+    rate_500: float = 0.0
+    rpm: int = 0
+    tpm: int = 0
+    section_pages: int = 20
+    seed: int = 0
+
+
+@dataclass
+class _Stats:
+    requests: int = 0
+    ok: int = 0
+    throttled: int = 0
+    errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latencies_ms: list[float] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        lat = sorted(self.latencies_ms)
+
+        def pct(p: float) -> float:
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))], 1) if lat else 0.0
+
+        return {
+            "requests": self.requests,
+            "ok": self.ok,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "p99": pct(0.99)},
+        }
+
+
+def _tokens(text: str) -> int:
+    # Same heuristic as GeminiCleaner.estimate_tokens.
+    return max(1, len(text) // 4)
+
+
+def _error(code: int, status: str, message: str) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"code": code, "message": message, "status": status}},
+        status_code=code,
+    )
+
+
+def create_app(config: FakeGeminiConfig | None = None) -> FastAPI:
+    cfg = config or FakeGeminiConfig()
+    rng = random.Random(cfg.seed)
+    # (monotonic time, tokens) of admitted requests in the last minute.
+    window: deque[tuple[float, int]] = deque()
+    app = FastAPI(title="Fake Gemini")
+    app.state.config = cfg
+    app.state.stats = _Stats()
+
+    def over_quota(tokens: int, now: float) -> bool:
+        while window and now - window[0][0] >= 60.0:
+            window.popleft()
+        if cfg.rpm and len(window) >= cfg.rpm:
+            return True
+        if cfg.tpm and sum(t for _, t in window) + tokens > cfg.tpm:
+            return True
+        window.append((now, tokens))
+        return False
+
+    @app.post("/{version}/models/{model}:generateContent")
+    async def generate_content(version: str, model: str, request: Request):
+        stats: _Stats = app.state.stats
+        body = await request.json()
+        parts = [p for c in body.get("contents", []) for p in c.get("parts", [])]
+        prompt = "\n".join(p["text"] for p in parts if "text" in p)
+        has_image = any("inlineData" in p or "inline_data" in p for p in parts)
+        gen_config = body.get("generationConfig") or {}
+        system = body.get("systemInstruction") or {}
+        system_text = "".join(p.get("text", "") for p in system.get("parts", []))
+        input_tokens = _tokens(system_text + prompt) + (258 if has_image else 0)
+
+        stats.requests += 1
+        if over_quota(input_tokens, time.monotonic()) or rng.random() < cfg.rate_429:
+            stats.throttled += 1
+            return _error(
+                429,
+                "RESOURCE_EXHAUSTED",
+                "Resource has been exhausted (e.g. check quota).",
+            )
+        if rng.random() < cfg.rate_500:
+            stats.errors += 1
+            return _error(500, "INTERNAL", "An internal error has occurred.")
+
+        if has_image:
+            text = "Text recognised on a scanned page."
+        elif gen_config.get("responseMimeType") == "application/json":
+            text = json.dumps({"sections": _sections(prompt, cfg.section_pages)})
+        else:
+            text = prompt
+        output_tokens = _tokens(text)
+
+        delay_ms = cfg.ms_per_token * (input_tokens + output_tokens)
+        if cfg.latency_ms:
+            delay_ms += cfg.latency_ms * math.exp(rng.gauss(0.0, cfg.latency_sigma))
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+        stats.ok += 1
+        stats.input_tokens += input_tokens
+        stats.output_tokens += output_tokens
+        stats.latencies_ms.append(delay_ms)
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [{"text": text}]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }
+            ],
+            "usageMetadata": {
+                "promptTokenCount": input_tokens,
+                "candidatesTokenCount": output_tokens,
+                "totalTokenCount": input_tokens + output_tokens,
+            },
+            "modelVersion": model,
+        }
+
+    @app.get("/stats")
+    def get_stats():
+        return app.state.stats.as_dict()
+
+    @app.post("/reset")
+    def reset():
+        app.state.stats = _Stats()
+        window.clear()
+        return {"status": "ok"}
+
+    return app
+
+
+def _sections(prompt: str, per_section: int) -> list[dict]:
+    pages = sorted({int(m.group(1)) for m in _PAGE_HEADER_RE.finditer(prompt)})
+    if not pages:
+        return []
+    out = []
+    for i in range(0, len(pages), per_section):
+        chunk = pages[i : i + per_section]
+        out.append(
+            {
+                "title": f"Section {i // per_section + 1}",
+                "start_page": chunk[0],
+                "end_page": chunk[-1],
+            }
+        )
+    return out
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    for name, default in vars(FakeGeminiConfig()).items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(default), default=default
+        )
+    args = parser.parse_args()
+    config = FakeGeminiConfig(**{k: getattr(args, k) for k in vars(FakeGeminiConfig())})
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_config=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -84,3 +84,45 @@ def test_engine_post_unknown():
     """Test POST /engine with unknown engine returns 400."""
     response = client.post("/engine", json={"engine": "kitten"})
     assert response.status_code == 400
+
+
+@patch.object(EngineManager, "ensure_loaded")
+@patch.object(EngineManager, "generate", side_effect=mock_engine_generate)
+def test_metrics_endpoint_exposes_speak_latency(mock_generate, mock_ensure):
+    from app.core import metrics
+
+    ttfa = metrics.TTS_TTFA_SECONDS.count()
+    gate = metrics.INTERACTIVE_GATE_WAIT_SECONDS.count()
+    client.post("/speak", json={"text": "Test metrics"}).read()
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert metrics.TTS_TTFA_SECONDS.count() == ttfa + 1
+    assert metrics.INTERACTIVE_GATE_WAIT_SECONDS.count() == gate + 1
+
+    lines = response.text.splitlines()
+    assert "# TYPE supersay_tts_ttfa_seconds histogram" in lines
+    assert f"supersay_tts_ttfa_seconds_count {ttfa + 1}" in lines
+    assert f'supersay_tts_ttfa_seconds_bucket{{le="+Inf"}} {ttfa + 1}' in lines
+    assert any(
+        line.startswith("supersay_process_resident_memory_bytes ") for line in lines
+    )
+    assert any(line.startswith("supersay_tts_model_loaded ") for line in lines)
+    assert 'supersay_gemini_limiter{stat="limit"}' in response.text
+
+
+def test_histogram_buckets_are_cumulative():
+    from app.core.metrics import Histogram, _REGISTRY
+
+    h = Histogram("test_seconds", "Test.", (0.1, 1.0), labels=("op",))
+    _REGISTRY.remove(h)
+    for value in (0.05, 0.5, 0.7, 3.0):
+        h.observe(value, op='a"b')
+    assert h.render()[2:] == [
+        'test_seconds_bucket{op="a\\"b",le="0.1"} 1',
+        'test_seconds_bucket{op="a\\"b",le="1.0"} 3',
+        'test_seconds_bucket{op="a\\"b",le="+Inf"} 4',
+        'test_seconds_sum{op="a\\"b"} 4.25',
+        'test_seconds_count{op="a\\"b"} 4',
+    ]
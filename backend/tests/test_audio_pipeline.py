@@ -33,6 +33,7 @@ from unittest.mock import AsyncMock, patch
 import numpy as np
 import pytest
 
+from app.core.config import Settings
 from app.services.audiobook_service import (
     BYTES_PER_SAMPLE,
     SAMPLE_RATE,
@@ -49,7 +50,7 @@ from app.services.audiobook_store import AudiobookStore
 
 @pytest.fixture(autouse=True)
 def isolated_dir(monkeypatch, tmp_path):
-    class _S:
+    class _S(Settings):
         @property
         def AUDIOBOOKS_DIR(self):
             return str(tmp_path)
@@ -404,15 +405,13 @@ async def test_total_audio_seconds():
 
 
 # ===========================================================================
-# I11 – Transcript JSON integrity
+# I11 – Transcript integrity
 # ===========================================================================
 
 
 @pytest.mark.asyncio
-async def test_transcript_json_written_and_correct():
-    """I11: transcript.json contains book_id, page texts, page_to_time, sections."""
-    import json
-
+async def test_transcript_written_and_correct():
+    """I11: transcript rows hold each page's text and its audio span."""
     bid = _make_book(2)
     for n in (1, 2):
         path = AudiobookStore.page_audio_path(bid, n)
@@ -430,24 +429,20 @@ async def test_transcript_json_written_and_correct():
 
     await AudiobookService._phase_concat(bid, AudiobookStore.read_meta(bid))
 
-    tpath = AudiobookStore.transcript_path(bid)
-    assert os.path.exists(tpath), "transcript.json not written"
-    with open(tpath) as f:
-        t = json.load(f)
-
-    assert t["book_id"] == bid
-    assert "page_to_time" in t
-    assert "sections" in t
-    assert t["pages"]["1"] == "Page 1 clean text."
-    assert t["pages"]["2"] == "Page 2 clean text."
-    assert abs(t["total_audio_seconds"] - 2 * 2400 / SAMPLE_RATE) < 0.001
+    pages = AudiobookStore.read_transcript_pages(bid)
+    assert [p["text"] for p in pages] == ["Page 1 clean text.", "Page 2 clean text."]
+    page_seconds = 2400 / SAMPLE_RATE
+    assert pages[0]["start_time"] == 0.0
+    assert abs(pages[0]["end_time"] - page_seconds) < 0.001
+    assert abs(pages[1]["start_time"] - page_seconds) < 0.001
+    assert abs(pages[1]["end_time"] - 2 * page_seconds) < 0.001
+    # No transcript.json any more — pages live in SQLite.
+    assert not os.path.exists(AudiobookStore.transcript_path(bid))
 
 
 @pytest.mark.asyncio
 async def test_transcript_missing_clean_file_still_writes():
     """Transcript is written even if some clean files are absent (graceful degradation)."""
-    import json
-
     bid = _make_book(2)
     # Only page 1 has audio and clean text; page 2 has nothing.
     path = AudiobookStore.page_audio_path(bid, 1)
@@ -464,12 +459,8 @@ async def test_transcript_missing_clean_file_still_writes():
 
     await AudiobookService._phase_concat(bid, AudiobookStore.read_meta(bid))
 
-    tpath = AudiobookStore.transcript_path(bid)
-    assert os.path.exists(tpath)
-    with open(tpath) as f:
-        t = json.load(f)
-    assert "1" in t["pages"]
-    assert "2" not in t["pages"]  # gracefully absent, not an error
+    pages = AudiobookStore.read_transcript_pages(bid)
+    assert [p["page"] for p in pages] == [1]  # page 2 gracefully absent
 
 
 # ===========================================================================
@@ -604,8 +595,6 @@ async def test_tts_failure_writes_silence_and_records_failed_page(monkeypatch):
 @pytest.mark.asyncio
 async def test_end_to_end_pipeline_produces_valid_wav(monkeypatch):
     """Full extract→clean→TTS→concat smoke test (mocked I/O, real WAV writing)."""
-    import json
-
     page_count = 3
     bid = _make_book(page_count)
     meta = AudiobookStore.read_meta(bid)
@@ -687,13 +676,8 @@ async def test_end_to_end_pipeline_produces_valid_wav(monkeypatch):
     # --- total_audio_seconds matches ---
     assert abs(new_meta["total_audio_seconds"] - actual["audio_seconds"]) < 0.001
 
-    # --- Transcript JSON exists and is parseable ---
-    tpath = AudiobookStore.transcript_path(bid)
-    assert os.path.exists(tpath)
-    with open(tpath) as f:
-        t = json.load(f)
-    assert t["book_id"] == bid
-    assert len(t["pages"]) == page_count
+    # --- Transcript has every page ---
+    assert len(AudiobookStore.read_transcript_pages(bid)) == page_count
 
     # --- PCM samples are non-trivially non-zero (actual audio, not silence) ---
     pcm = np.frombuffer(_read_pcm_body(final), dtype="<i2")
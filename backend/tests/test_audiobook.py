@@ -9,13 +9,15 @@ import json
 import os
 import shutil
 import tempfile
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import numpy as np
 import pytest
+from app.core.config import Settings
 from app.services.audiobook_service import (
     SAMPLE_RATE,
     WAV_HEADER_SIZE,
+    AudiobookCancelled,
     AudiobookService,
     _wav_header,
 )
@@ -31,12 +33,17 @@ def isolated_audiobooks_dir(monkeypatch):
     """
     tmp = tempfile.mkdtemp(prefix="ss_audiobooks_test_")
 
-    class _PatchedSettings:
+    class _PatchedSettings(Settings):
         @property
         def AUDIOBOOKS_DIR(self) -> str:
             return tmp
 
     monkeypatch.setattr("app.services.audiobook_store.settings", _PatchedSettings())
+    # Batched cleaning off unless a test opts in, so the per-page
+    # clean_page mocks below see every page.
+    monkeypatch.setattr(
+        "app.services.audiobook_service.settings.GEMINI_BATCH_TOKENS", 0
+    )
     AudiobookStore._reset_for_tests()
     yield tmp
     AudiobookStore._reset_for_tests()
@@ -121,6 +128,204 @@ def test_delete_book_removes_dir():
     assert AudiobookStore.delete_book(bid) is False  # second delete
 
 
+def test_delete_book_row_and_tombstone_commit_together(monkeypatch):
+    """A delete that fails part-way leaves the book and no tombstone; one
+    that succeeds leaves the tombstone and no book — never one without the
+    other."""
+    bid = AudiobookStore.create_book("Test.pdf")
+    AudiobookStore.write_meta(
+        bid,
+        AudiobookStore.initial_meta(
+            bid, "Test.pdf", 1, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+        ),
+    )
+    conn = AudiobookStore._connection()
+
+    def state() -> tuple[bool, bool]:
+        book = conn.execute("SELECT 1 FROM books WHERE book_id = ?", (bid,))
+        tomb = conn.execute("SELECT 1 FROM deleted_books WHERE book_id = ?", (bid,))
+        return book.fetchone() is not None, tomb.fetchone() is not None
+
+    def crash(conn, keys):
+        raise RuntimeError("died mid-delete")
+
+    with monkeypatch.context() as m:
+        m.setattr(AudiobookStore, "_drop_audio_refs", staticmethod(crash))
+        with pytest.raises(RuntimeError):
+            AudiobookStore.delete_book(bid)
+    assert state() == (True, False)
+
+    AudiobookStore.delete_book(bid)
+    assert state() == (False, True)
+
+
+def test_page_progress_is_column_update_not_blob_rewrite():
+    bid = AudiobookStore.create_book("Test.pdf")
+    meta = AudiobookStore.initial_meta(
+        bid, "Test.pdf", 3, "kokoro", "af_bella", 1.0, {"cost_usd": 0.1}
+    )
+    AudiobookStore.write_meta(bid, meta)
+    conn = AudiobookStore._connection()
+    blob_before = conn.execute(
+        "SELECT meta_json FROM books WHERE book_id = ?", (bid,)
+    ).fetchone()[0]
+
+    AudiobookStore.record_page_progress(bid, 2, 2, 3, clean_state="done")
+    AudiobookStore.mark_page_failed(bid, 3, "tts", "boom")
+
+    blob_after = conn.execute(
+        "SELECT meta_json FROM books WHERE book_id = ?", (bid,)
+    ).fetchone()[0]
+    assert blob_after == blob_before
+    assert "phase_progress" not in json.loads(blob_after)
+    read = AudiobookStore.read_meta(bid)
+    assert read["phase_progress"] == {"page_done": 2, "page_total": 3}
+    assert read["failed_pages"] == [3]
+    pages = {p["page_no"]: p for p in AudiobookStore.read_pages(bid)}
+    assert pages[2]["clean_state"] == "done"
+    assert pages[3]["tts_state"] == "failed"
+    assert pages[3]["failure_reason"] == "boom"
+
+    AudiobookStore.clear_page_failures(bid)
+    assert AudiobookStore.read_meta(bid)["failed_pages"] == []
+
+
+@pytest.mark.asyncio
+async def test_update_meta_routes_fields_to_columns_and_pages():
+    bid = AudiobookStore.create_book("Test.pdf")
+    AudiobookStore.write_meta(
+        bid, AudiobookStore.initial_meta(bid, "T", 4, "kokoro", "af_bella", 1.0, {})
+    )
+    await AudiobookStore.update_meta(
+        bid,
+        status="failed",
+        error="x",
+        failed_pages=[1, 4],
+        sections=[{"title": "A"}],
+    )
+    meta = AudiobookStore.read_meta(bid)
+    assert meta["status"] == "failed"
+    assert meta["error"] == "x"
+    assert meta["failed_pages"] == [1, 4]
+    assert meta["sections"] == [{"title": "A"}]
+    assert [b["failed_pages"] for b in AudiobookStore.list_books()] == [[1, 4]]
+
+    await AudiobookStore.update_meta(bid, failed_pages=[4])
+    assert AudiobookStore.read_meta(bid)["failed_pages"] == [4]
+
+    # Never resurrects a deleted book.
+    AudiobookStore.delete_book(bid)
+    await AudiobookStore.update_meta(bid, status="done", sections=[])
+    assert AudiobookStore.read_meta(bid) is None
+
+
+@pytest.mark.asyncio
+async def test_page_progress_is_write_behind_and_flushed_on_transition():
+    from app.services import audiobook_store as _store
+
+    bid = AudiobookStore.create_book("Test.pdf")
+    AudiobookStore.write_meta(
+        bid, AudiobookStore.initial_meta(bid, "T", 50, "kokoro", "af_bella", 1.0, {})
+    )
+    conn = AudiobookStore._connection()
+
+    def stored_done() -> int:
+        return conn.execute(
+            "SELECT phase_page_done FROM books WHERE book_id = ?", (bid,)
+        ).fetchone()[0]
+
+    for n in range(1, 4):
+        AudiobookStore.record_page_progress(bid, n, n, 50, clean_state="done")
+    # Nothing committed yet, but readers already see the buffered counters.
+    assert stored_done() == 0
+    assert AudiobookStore.read_meta(bid)["phase_progress"]["page_done"] == 3
+
+    await AudiobookStore.update_meta(bid, status="tts")
+    assert stored_done() == 3
+    assert (
+        conn.execute(
+            "SELECT COUNT(*) FROM pages WHERE book_id = ? AND clean_state = 'done'",
+            (bid,),
+        ).fetchone()[0]
+        == 3
+    )
+
+    # Count threshold: one commit covers the whole batch.
+    for n in range(1, _store._PROGRESS_FLUSH_UPDATES + 1):
+        AudiobookStore.record_page_progress(bid, n, n, 50)
+    assert stored_done() == _store._PROGRESS_FLUSH_UPDATES
+
+
+def test_reads_use_read_only_pool_and_do_not_wait_for_writer():
+    import sqlite3
+    import threading
+
+    bid = AudiobookStore.create_book("Test.pdf")
+    AudiobookStore.write_meta(
+        bid, AudiobookStore.initial_meta(bid, "T", 1, "kokoro", "af_bella", 1.0, {})
+    )
+    result: list = []
+    # Hold the writer lock the way a long pipeline transaction would.
+    with AudiobookStore._conn_lock:
+        t = threading.Thread(
+            target=lambda: result.append(AudiobookStore.list_books_page(limit=5))
+        )
+        t.start()
+        t.join(timeout=5)
+        assert not t.is_alive()
+    assert result[0][0][0]["book_id"] == bid
+
+    with AudiobookStore._reader() as conn:
+        assert conn is not AudiobookStore._conn
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM books")
+
+
+def test_v1_schema_is_migrated_to_page_columns(isolated_audiobooks_dir):
+    """A DB written before per-page columns existed keeps progress, error and
+    failed pages, which move out of meta_json into their columns."""
+    import sqlite3
+
+    AudiobookStore._reset_for_tests()
+    db = sqlite3.connect(os.path.join(isolated_audiobooks_dir, "audiobooks.db"))
+    db.executescript("""
+        CREATE TABLE books (
+            book_id TEXT PRIMARY KEY, title TEXT NOT NULL,
+            created_at TEXT NOT NULL, page_count INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL, total_audio_seconds REAL NOT NULL DEFAULT 0.0,
+            engine TEXT NOT NULL DEFAULT 'kokoro',
+            voice TEXT NOT NULL DEFAULT 'af_bella',
+            speed REAL NOT NULL DEFAULT 1.0, meta_json TEXT NOT NULL
+        );
+        CREATE TABLE pages (
+            book_id TEXT NOT NULL, page_no INTEGER NOT NULL, content_hash TEXT,
+            minhash BLOB, duplicate_of INTEGER, PRIMARY KEY (book_id, page_no)
+        );
+    """)
+    legacy = {
+        "book_id": "old1",
+        "title": "Old",
+        "created_at": "2024-01-01T00:00:00Z",
+        "status": "failed",
+        "page_count": 5,
+        "phase_progress": {"page_done": 3, "page_total": 5},
+        "failed_pages": [2, 5],
+        "error": "quota",
+    }
+    db.execute(
+        "INSERT INTO books (book_id, title, created_at, page_count, status, "
+        "meta_json) VALUES ('old1', 'Old', '2024-01-01T00:00:00Z', 5, 'failed', ?)",
+        (json.dumps(legacy),),
+    )
+    db.commit()
+    db.close()
+
+    meta = AudiobookStore.read_meta("old1")
+    assert meta["phase_progress"] == {"page_done": 3, "page_total": 5}
+    assert meta["failed_pages"] == [2, 5]
+    assert meta["error"] == "quota"
+
+
 # ---------- estimation ----------
 
 
@@ -235,6 +440,66 @@ async def test_tts_phase_writes_per_page_wavs(monkeypatch):
         assert os.path.exists(AudiobookStore.page_audio_path(bid, n))
 
 
+@pytest.mark.asyncio
+async def test_tts_and_concat_build_book_timing_index():
+    from app.main import app
+    from app.services.timing_index import TimingIndex
+    from app.services.tts import SegmentTiming
+    from fastapi.testclient import TestClient
+
+    bid = AudiobookStore.create_book("Test.pdf")
+    meta = AudiobookStore.initial_meta(
+        bid, "Test.pdf", 2, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+    )
+    AudiobookStore.write_meta(bid, meta)
+    for n in (1, 2):
+        path = AudiobookStore.page_clean_path(bid, n)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"Page {n} has some words. And then more.")
+
+    async def _timed_generate(text, voice, speed, timings=None, **kwargs):
+        timings.append(SegmentTiming(0, 5, 0, 10000))
+        yield np.zeros(12000, dtype=np.float32)
+        timings.append(SegmentTiming(5, 3, 12000, 5000))
+        yield np.zeros(6000, dtype=np.float32)
+
+    with (
+        patch(
+            "app.services.audiobook_service.EngineManager.ensure_loaded",
+            new=AsyncMock(return_value=None),
+        ),
+        patch(
+            "app.services.audiobook_service.EngineManager.touch",
+            return_value=None,
+        ),
+        patch(
+            "app.services.audiobook_service.EngineManager.generate",
+            side_effect=_timed_generate,
+        ),
+    ):
+        await AudiobookService._phase_tts(bid, meta)
+
+    page, _ = TimingIndex.read(AudiobookStore.page_timing_path(bid, 2))
+    assert page["page"].tolist() == [2, 2]
+    assert page["start"].tolist() == [0, 12000]
+
+    await AudiobookService._phase_concat(bid, AudiobookStore.read_meta(bid))
+
+    records, rate = TimingIndex.read(AudiobookStore.timings_path(bid))
+    assert rate == SAMPLE_RATE
+    assert records["page"].tolist() == [1, 1, 2, 2]
+    assert records["word"].tolist() == [0, 5, 0, 5]
+    # Page 2's segments are shifted by page 1's 18000 samples.
+    assert records["start"].tolist() == [0, 12000, 18000, 30000]
+    assert records["length"].tolist() == [10000, 5000, 10000, 5000]
+    assert TimingIndex.locate(records, 20000) == 2
+
+    response = TestClient(app).get(f"/audiobook/{bid}/timings")
+    assert response.status_code == 200
+    assert response.content == open(AudiobookStore.timings_path(bid), "rb").read()
+
+
 # ---------- API endpoints ----------
 
 
@@ -257,6 +522,120 @@ def test_audiobook_404_for_unknown_id():
     assert response.status_code == 404
 
 
+def test_audiobook_get_supports_etag_revalidation():
+    from app.main import app
+    from fastapi.testclient import TestClient
+
+    bid = AudiobookStore.create_book("Test.pdf")
+    AudiobookStore.write_meta(
+        bid, AudiobookStore.initial_meta(bid, "T", 2, "kokoro", "af_bella", 1.0, {})
+    )
+    client = TestClient(app)
+    first = client.get(f"/audiobook/{bid}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    unchanged = client.get(f"/audiobook/{bid}", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    AudiobookStore.record_page_progress(bid, 1, 1, 2)
+    changed = client.get(f"/audiobook/{bid}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["phase_progress"]["page_done"] == 1
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_read_meta_is_cached_frozen_and_invalidated_on_write():
+    bid = AudiobookStore.create_book("Test.pdf")
+    AudiobookStore.write_meta(
+        bid, AudiobookStore.initial_meta(bid, "T", 2, "kokoro", "af_bella", 1.0, {})
+    )
+    first = AudiobookStore.read_meta(bid)
+    assert AudiobookStore.read_meta(bid) is first
+    with pytest.raises(TypeError):
+        first["status"] = "done"
+    with pytest.raises(TypeError):
+        first["sections"].append({})
+
+    await AudiobookStore.update_meta(bid, status="cleaning")
+    assert first["status"] == "ready"  # old snapshot unchanged
+    assert AudiobookStore.read_meta(bid)["status"] == "cleaning"
+    editable = dict(AudiobookStore.read_meta(bid))
+    editable["status"] = "done"
+    AudiobookStore.write_meta(bid, editable)
+    assert AudiobookStore.read_meta(bid)["status"] == "done"
+
+
+def _seed_library(n: int) -> list[str]:
+    ids = []
+    for i in range(n):
+        bid = AudiobookStore.create_book(f"b{i}.pdf")
+        meta = AudiobookStore.initial_meta(
+            bid, f"b{i}", 3, "kokoro", "af_bella", 1.0, {}
+        )
+        meta["created_at"] = f"2025-01-{1 + i // 2:02d}T00:00:00Z"  # pairs tie
+        meta["status"] = "done" if i % 2 else "ready"
+        meta["sections"] = [{"title": "big"}] * 50
+        AudiobookStore.write_meta(bid, meta)
+        ids.append(bid)
+    return ids
+
+
+def test_audiobook_list_pages_with_cursor_status_and_projection():
+    from app.main import app
+    from fastapi.testclient import TestClient
+
+    _seed_library(7)
+    client = TestClient(app)
+    everything = [b["book_id"] for b in AudiobookStore.list_books()]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, "fields": "title,status"}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/audiobook", params=params).json()
+        for item in body["items"]:
+            assert set(item) == {"book_id", "title", "status"}
+        seen += [b["book_id"] for b in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == everything
+
+    done = client.get("/audiobook", params={"status": "done"}).json()["items"]
+    assert len(done) == 3 and all(b["status"] == "done" for b in done)
+    assert "sections" not in done[0]
+
+    assert client.get("/audiobook", params={"fields": "sections"}).status_code == 400
+    assert client.get("/audiobook", params={"cursor": "%%%"}).status_code == 400
+    # Bare GET keeps the full legacy shape.
+    assert len(client.get("/audiobook").json()[0]["sections"]) == 50
+
+
+@pytest.mark.asyncio
+async def test_audiobook_changes_feed_returns_only_deltas():
+    from app.main import app
+    from fastapi.testclient import TestClient
+
+    a, b, c = _seed_library(3)
+    client = TestClient(app)
+    first = client.get("/audiobook/changes").json()
+    assert {i["book_id"] for i in first["items"]} == {a, b, c}
+    assert first["has_more"] is False
+
+    await AudiobookStore.update_meta(b, status="cleaning")
+    AudiobookStore.delete_book(c)
+    delta = client.get("/audiobook/changes", params={"since": first["cursor"]}).json()
+    assert [i["book_id"] for i in delta["items"]] == [b]
+    assert delta["items"][0]["status"] == "cleaning"
+    assert delta["deleted"] == [c]
+
+    idle = client.get("/audiobook/changes", params={"since": delta["cursor"]}).json()
+    assert idle["items"] == [] and idle["deleted"] == []
+
+
 def test_start_requires_api_key_header():
     from app.main import app
     from fastapi.testclient import TestClient
@@ -274,6 +653,344 @@ def test_start_requires_api_key_header():
     assert "X-Gemini-Api-Key" in response.json()["detail"]
 
 
+# ---------- pipeline scheduler ----------
+
+
+@pytest.mark.asyncio
+async def test_pipeline_scheduler_interleaves_slices_fairly():
+    """A short job submitted behind a long one finishes first: the long job
+    yields its worker after every slice instead of holding it to the end."""
+    from app.services.pipeline_scheduler import PipelineScheduler
+
+    slices = {"long": 5, "short": 1}
+    trace: list[tuple[str, str]] = []
+    exited: list[str] = []
+
+    async def handler(stage, job):
+        trace.append((stage, job))
+        await asyncio.sleep(0)
+        if stage == "prep":
+            return "work"
+        slices[job] -= 1
+        return "work" if slices[job] else None
+
+    sched = PipelineScheduler(handler, on_exit=exited.append)
+    sched.add_stage("prep", 1)
+    sched.add_stage("work", 1)
+    sched.start()
+    assert sched.submit("long") is True
+    assert sched.submit("long") is False  # already queued
+    sched.submit("short")
+    for _ in range(200):
+        if len(exited) == 2:
+            break
+        await asyncio.sleep(0.005)
+    sched.stop()
+
+    assert exited == ["short", "long"]
+    assert trace.count(("work", "long")) == 5
+    assert "long" not in sched and sched.snapshot()["work"]["queued"] == []
+
+
+@pytest.mark.asyncio
+async def test_enqueue_runs_books_through_phase_pools(monkeypatch):
+    from app.services import gemini_cleaner as _gc
+
+    async def _slow_clean(api_key, text):
+        await asyncio.sleep(0.01)
+        return text
+
+    async def _slow_generate(*args, **kwargs):
+        await asyncio.sleep(0.005)
+        yield np.zeros(2400, dtype=np.float32)
+
+    monkeypatch.setattr(
+        _gc.GeminiCleaner, "clean_page", AsyncMock(side_effect=_slow_clean)
+    )
+    monkeypatch.setattr(_gc.GeminiCleaner, "detect_window", AsyncMock(return_value=[]))
+
+    books = {}
+    for title, pages in (("long.txt", 10), ("short.txt", 1)):
+        bid = AudiobookStore.create_book(title)
+        meta = AudiobookStore.initial_meta(
+            bid, title, pages, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+        )
+        meta["file_ext"] = "txt"
+        AudiobookStore.write_meta(bid, meta)
+        with open(AudiobookStore.source_file_path(bid, "txt"), "w") as f:
+            # Distinct pages, so dedup doesn't silence the long book.
+            f.write(
+                "\n\n".join(
+                    " ".join(f"{title}{n}w{i}" for i in range(300))
+                    for n in range(pages)
+                )
+            )
+        books[title] = bid
+
+    finished: list[str] = []
+
+    async def wait_done(bid):
+        q = AudiobookService.subscribe(bid)
+        try:
+            while (await q.get())["type"] not in {"done", "failed"}:
+                pass
+        finally:
+            AudiobookService.unsubscribe(bid, q)
+        finished.append(bid)
+
+    with (
+        patch(
+            "app.services.audiobook_service.EngineManager.ensure_loaded",
+            new=AsyncMock(return_value=None),
+        ),
+        patch(
+            "app.services.audiobook_service.EngineManager.touch",
+            return_value=None,
+        ),
+        patch(
+            "app.services.audiobook_service.EngineManager.generate",
+            side_effect=_slow_generate,
+        ),
+    ):
+        waiters = [asyncio.create_task(wait_done(b)) for b in books.values()]
+        await asyncio.sleep(0)
+        for bid in books.values():
+            await AudiobookService.enqueue(bid, "test-key")
+        await asyncio.wait_for(asyncio.gather(*waiters), timeout=10)
+
+    assert finished == [books["short.txt"], books["long.txt"]]
+    for bid in books.values():
+        assert AudiobookStore.read_meta(bid)["status"] == "done"
+        assert not AudiobookService.is_processing(bid)
+
+
+@pytest.mark.asyncio
+async def test_tts_overlaps_cleaning_and_sectioning_runs_last(monkeypatch):
+    from app.services import gemini_cleaner as _gc
+
+    monkeypatch.setattr(
+        "app.services.audiobook_service.settings",
+        Settings(AUDIOBOOK_CLEAN_SLICE_PAGES=2, AUDIOBOOK_TTS_SLICE_PAGES=1),
+    )
+    log: list[str] = []
+
+    async def _slow_clean(api_key, text):
+        await asyncio.sleep(0.02)
+        log.append("clean")
+        return text
+
+    async def _sections(api_key, first_page, pages):
+        log.append("section")
+        assert all(pages), "sectioning must see every cleaned page"
+        return []
+
+    async def _generate(*args, **kwargs):
+        log.append("tts")
+        await asyncio.sleep(0.001)
+        yield np.zeros(2400, dtype=np.float32)
+
+    monkeypatch.setattr(
+        _gc.GeminiCleaner, "clean_page", AsyncMock(side_effect=_slow_clean)
+    )
+    monkeypatch.setattr(
+        _gc.GeminiCleaner, "detect_window", AsyncMock(side_effect=_sections)
+    )
+
+    bid = AudiobookStore.create_book("book.txt")
+    meta = AudiobookStore.initial_meta(
+        bid, "book.txt", 6, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+    )
+    meta["file_ext"] = "txt"
+    AudiobookStore.write_meta(bid, meta)
+    with open(AudiobookStore.source_file_path(bid, "txt"), "w") as f:
+        f.write(
+            "\n\n".join(" ".join(f"p{n}w{i}" for i in range(300)) for n in range(6))
+        )
+
+    events = AudiobookService.subscribe(bid)
+    with (
+        patch(
+            "app.services.audiobook_service.EngineManager.ensure_loaded",
+            new=AsyncMock(return_value=None),
+        ),
+        patch(
+            "app.services.audiobook_service.EngineManager.touch",
+            return_value=None,
+        ),
+        patch(
+            "app.services.audiobook_service.EngineManager.generate",
+            side_effect=_generate,
+        ),
+    ):
+        await AudiobookService.enqueue(bid, "test-key")
+        seen: list[dict] = []
+        while not seen or seen[-1]["type"] not in {"done", "failed"}:
+            seen.append(await asyncio.wait_for(events.get(), timeout=10))
+    AudiobookService.unsubscribe(bid, events)
+
+    assert seen[-1]["type"] == "done"
+    # Synthesis started while later pages were still being cleaned ...
+    assert log.index("tts") < len(log) - 1 - log[::-1].index("clean")
+    # ... every page was voiced exactly once, and sectioning ran after the
+    # last clean.
+    assert log.count("tts") == 6 and log.count("clean") == 6
+    assert log.index("section") > len(log) - 1 - log[::-1].index("clean")
+    started = [e["phase"] for e in seen if e["type"] == "phase_started"]
+    assert started.count("cleaning") == 1 and started.count("tts") == 1
+    assert AudiobookStore.read_meta(bid)["status"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_pipeline_scheduler_forks_and_joins_branches():
+    """A job forked into two stages exits once, after its last branch; a
+    re-queue into a stage the job is running in is coalesced into one rerun."""
+    from app.services.pipeline_scheduler import PipelineScheduler
+
+    runs: list[str] = []
+    exited: list[str] = []
+    left = {"a": 3}
+
+    async def handler(stage, job):
+        runs.append(stage)
+        await asyncio.sleep(0.001)
+        if stage == "a":
+            left["a"] -= 1
+            return ("a", "b") if left["a"] else "b"
+        return None
+
+    sched = PipelineScheduler(handler, on_exit=exited.append)
+    sched.add_stage("a", 1)
+    sched.add_stage("b", 1)
+    sched.start()
+    sched.submit("job")
+    for _ in range(200):
+        if exited:
+            break
+        await asyncio.sleep(0.005)
+    sched.stop()
+
+    assert exited == ["job"]
+    assert runs.count("a") == 3
+    assert 1 <= runs.count("b") <= 3
+    assert "job" not in sched
+
+
+@pytest.mark.asyncio
+async def test_pipeline_scheduler_orders_by_key_and_rekeys():
+    from app.services.pipeline_scheduler import PipelineScheduler
+
+    keys = {"blocker": 0, "big": 10, "small": 1}
+    release = asyncio.Event()
+    ran: list[str] = []
+
+    async def handler(stage, job):
+        if job == "blocker":
+            await release.wait()
+        ran.append(job)
+        return None
+
+    sched = PipelineScheduler(handler, key=keys.__getitem__)
+    sched.add_stage("only", 1)
+    sched.start()
+    sched.submit("blocker")
+    await asyncio.sleep(0)
+    sched.submit("big")
+    sched.submit("small")
+    assert sched.snapshot()["only"] == {
+        "workers": 1,
+        "queued": ["small", "big"],
+        "running": ["blocker"],
+    }
+
+    keys["big"] = -1
+    assert sched.reprioritize("big") is True
+    assert sched.reprioritize("blocker") is False  # running, not queued
+    release.set()
+    for _ in range(100):
+        if len(ran) == 3:
+            break
+        await asyncio.sleep(0.005)
+    sched.stop()
+    assert ran == ["blocker", "big", "small"]
+
+
+@pytest.mark.asyncio
+async def test_queue_is_shortest_job_first_with_priority_bumps(monkeypatch):
+    from app.main import app
+    from httpx import ASGITransport, AsyncClient
+
+    release = asyncio.Event()
+
+    async def _blocking_extract(book_id):
+        await release.wait()
+        raise AudiobookCancelled(book_id)
+
+    monkeypatch.setattr(
+        AudiobookService,
+        "_phase_extract",
+        classmethod(lambda c, b: _blocking_extract(b)),
+    )
+
+    def _book(title, processing_seconds):
+        bid = AudiobookStore.create_book(title)
+        AudiobookStore.write_meta(
+            bid,
+            AudiobookStore.initial_meta(
+                bid,
+                title,
+                10,
+                "kokoro",
+                "af_bella",
+                1.0,
+                {"processing_seconds": processing_seconds, "audio_seconds": 0.0},
+            ),
+        )
+        return bid
+
+    running = _book("first.pdf", 50.0)
+    novel = _book("novel.pdf", 5000.0)
+    pamphlet = _book("pamphlet.pdf", 20.0)
+    events = AudiobookService.subscribe(novel)
+    try:
+        await AudiobookService.enqueue(running, "key")
+        await asyncio.sleep(0.01)  # the single extract worker picks it up
+        for bid in (novel, pamphlet):
+            await AudiobookService.enqueue(bid, "key")
+
+        assert AudiobookService.queue_status(running)["position"] == 0
+        assert AudiobookService.queue_status(pamphlet)["position"] == 1
+        novel_status = AudiobookService.queue_status(novel)
+        assert novel_status["position"] == 2
+        # Waits for the running book and the pamphlet, then its own work.
+        assert novel_status["eta_seconds"] == pytest.approx(5070.0)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://t") as client:
+            resp = await client.post(
+                f"/audiobook/{novel}/priority", json={"priority": 5}
+            )
+        assert resp.status_code == 200
+        assert resp.json()["queue"]["position"] == 1
+        assert AudiobookService.queue_status(pamphlet)["position"] == 2
+        assert AudiobookStore.read_meta(novel)["priority"] == 5
+
+        positions = []
+        while not events.empty():
+            event = events.get_nowait()
+            if event["type"] == "queue":
+                positions.append(event["position"])
+        assert positions[-2:] == [2, 1]
+    finally:
+        AudiobookService.unsubscribe(novel, events)
+        release.set()
+        for _ in range(100):
+            if not any(
+                AudiobookService.is_processing(b) for b in (running, novel, pamphlet)
+            ):
+                break
+            await asyncio.sleep(0.005)
+
+
 # ---------- resume ----------
 
 
@@ -295,14 +1012,14 @@ async def test_resume_in_progress_flips_cleaning_to_needs_key():
 
 
 def test_stitch_sections_basic_contiguity():
-    from app.services.gemini_cleaner import GeminiCleaner
+    from app.services.section_detector import stitch_sections
 
     raw = [
         {"title": "Intro", "start_page": 1, "end_page": 3},
         {"title": "Chapter 1", "start_page": 4, "end_page": 9},
         {"title": "Chapter 2", "start_page": 10, "end_page": 15},
     ]
-    out = GeminiCleaner._stitch_sections(raw, page_count=20)
+    out = stitch_sections(raw, page_count=20)
     # Last section's end_page extended to page_count.
     assert out[-1]["end_page"] == 20
     # Contiguous: each end == next start - 1.
@@ -311,10 +1028,10 @@ def test_stitch_sections_basic_contiguity():
 
 
 def test_stitch_sections_inserts_front_matter():
-    from app.services.gemini_cleaner import GeminiCleaner
+    from app.services.section_detector import stitch_sections
 
     raw = [{"title": "Chapter 1", "start_page": 4, "end_page": 9}]
-    out = GeminiCleaner._stitch_sections(raw, page_count=12)
+    out = stitch_sections(raw, page_count=12)
     assert out[0]["title"] == "Front Matter"
     assert out[0]["start_page"] == 1
     assert out[0]["end_page"] == 3
@@ -347,6 +1064,118 @@ def test_parse_sections_json_drops_invalid_entries():
     assert out[0]["title"] == "Good"
 
 
+def test_local_headings_and_their_confidence():
+    """Headings come from type size (PDF) or wording; they section a book on
+    their own only when they look like a chapter list."""
+    from app.services.pdf_extractor import PDFExtractor
+    from app.services.section_detector import sections_from_headings, text_heading
+
+    assert text_heading("CHAPTER 3\nHabits\nThe morning was cold.", True) == (
+        "CHAPTER 3: Habits"
+    )
+    assert text_heading("Running title\nPart Two: The Fall\nBody", True) == (
+        "Part Two: The Fall"
+    )
+    # A sentence, a table of contents and a mid-page line of a PDF are not.
+    assert text_heading("Chapter 3 explains how habits form.\nMore.", True) is None
+    toc = "Contents\nChapter 1 Dawn ..... 1\nChapter 2 Noon 20\nChapter 3 Dusk 41"
+    assert text_heading(toc, True) is None
+    assert text_heading("a\nb\nc\nEpilogue\nd", True) is None
+    # Text files: a heading paragraph anywhere on the page.
+    assert text_heading("The end.\n\n# Book Two\n\nIt began.", False) == "Book Two"
+
+    def line(text, top, size, font="Serif"):
+        chars = [{"text": c, "size": size, "fontname": font} for c in text]
+        return {"text": text, "top": top, "chars": chars}
+
+    body = [line("x" * 60, 200 + 14 * i, 10.0) for i in range(10)]
+    page = [line("Running header", 20, 8.0), line("Dawn", 80, 18.0)] + body
+    assert PDFExtractor._font_heading(page, 800) == "Dawn"
+    bold = [line("Dusk Falls", 80, 11.5, "Serif-Bold")] + body
+    assert PDFExtractor._font_heading(bold, 800) == "Dusk Falls"
+    assert PDFExtractor._font_heading(body, 800) is None
+
+    chapters = {3: "Chapter 1", 4: "CHAPTER 1 Dawn", 20: "Chapter 2", 41: "Chapter 3"}
+    out = sections_from_headings(chapters, 60)
+    assert [(s["title"], s["start_page"], s["end_page"]) for s in out] == [
+        ("Front Matter", 1, 2),
+        ("Chapter 1", 3, 19),
+        ("Chapter 2", 20, 40),
+        ("Chapter 3", 41, 60),
+    ]
+    # One heading, a heading on most pages, or a first heading half-way in.
+    assert sections_from_headings({5: "Preface"}, 60) is None
+    assert sections_from_headings({n: f"Part {n}" for n in range(1, 40)}, 60) is None
+    assert sections_from_headings({40: "Chapter 1", 50: "Chapter 2"}, 60) is None
+    assert sections_from_headings({5: "Preface"}, 60, confident_only=False)
+
+
+@pytest.mark.asyncio
+async def test_section_windows_run_while_cleaning(monkeypatch):
+    """Each window of pages goes to Gemini as soon as its pages are cleaned;
+    only sections starting on a window's own pages are kept. Confident
+    headings skip Gemini entirely."""
+    from app.services import gemini_cleaner as _gc
+
+    monkeypatch.setattr(
+        "app.services.audiobook_service.settings",
+        Settings(AUDIOBOOK_CLEAN_SLICE_PAGES=40, GEMINI_BATCH_TOKENS=0),
+    )
+    monkeypatch.setattr(
+        _gc.GeminiCleaner, "clean_page", AsyncMock(side_effect=lambda k, t: t)
+    )
+    windows: list[tuple[int, int]] = []
+
+    async def _window(api_key, first_page, pages):
+        windows.append((first_page, len(pages)))
+        return [
+            {"title": f"At {p}", "start_page": p, "end_page": p}
+            for p in (first_page, first_page + 5)
+        ]
+
+    detect = AsyncMock(side_effect=_window)
+    monkeypatch.setattr(_gc.GeminiCleaner, "detect_window", detect)
+
+    def new_book(pages: int) -> str:
+        bid = AudiobookStore.create_book("Long.txt")
+        meta = AudiobookStore.initial_meta(
+            bid, "Long.txt", pages, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+        )
+        meta["file_ext"] = "txt"
+        AudiobookStore.write_meta(bid, meta)
+        for n in range(1, pages + 1):
+            path = AudiobookStore.page_raw_path(bid, n)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"Page {n} body text. " * 20)
+        return bid
+
+    AudiobookService.initialize()
+    bid = new_book(90)
+    assert not await AudiobookService._phase_clean(bid, "k", max_pages=40)
+    await asyncio.sleep(0.01)
+    assert windows == [(1, 40)]  # running while pages 41.. still need cleaning
+    assert not await AudiobookService._phase_clean(bid, "k", max_pages=40)
+    assert await AudiobookService._phase_clean(bid, "k", max_pages=40)
+    await AudiobookService._phase_section(bid, "k", AudiobookStore.read_meta(bid))
+    assert windows == [(1, 40), (38, 40), (75, 16)]
+    sections = AudiobookStore.read_meta(bid)["sections"]
+    assert [s["start_page"] for s in sections] == [1, 6, 43, 80]
+    assert sections[-1]["end_page"] == 90
+
+    bid = new_book(30)
+    for n, title in ((2, "Chapter 1"), (12, "Chapter 2"), (21, "Chapter 3")):
+        AudiobookStore.update_page(bid, n, heading=title)
+    local_sections = AsyncMock(wraps=AudiobookService._local_sections)
+    monkeypatch.setattr(AudiobookService, "_local_sections", local_sections)
+    await AudiobookService._phase_clean(bid, "k")
+    await AudiobookService._phase_section(bid, "k", AudiobookStore.read_meta(bid))
+    assert detect.await_count == 3
+    assert local_sections.await_count == 1  # read at clean, reused at section
+    titles = [s["title"] for s in AudiobookStore.read_meta(bid)["sections"]]
+    assert titles == ["Front Matter", "Chapter 1", "Chapter 2", "Chapter 3"]
+
+
 # ---------- Phase 2: HTTP Range support ----------
 
 
@@ -483,6 +1312,101 @@ def test_transcript_endpoint_serves_file():
     assert response.json()["book_id"] == bid
 
 
+def test_transcript_endpoint_pages_by_range_and_time_window():
+    from app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    bid = AudiobookStore.create_book("Test.pdf")
+    meta = AudiobookStore.initial_meta(bid, "T", 3, "kokoro", "af_bella", 1.0, {})
+    meta["page_to_time"] = {"1": 0.0, "2": 10.0, "3": 25.0}
+    meta["total_audio_seconds"] = 30.0
+    AudiobookStore.write_meta(bid, meta)
+    AudiobookStore.write_transcript(
+        bid, [(1, 0.0, 10.0, "one"), (2, 10.0, 25.0, "two"), (3, 25.0, 30.0, "three")]
+    )
+
+    def pages(**params):
+        r = client.get(f"/audiobook/{bid}/transcript", params=params)
+        assert r.status_code == 200
+        return [p["page"] for p in r.json()["pages"]]
+
+    assert pages(first_page=2, last_page=2) == [2]
+    assert pages(start=12.5, end=12.5) == [2]  # page playing at t=12.5s
+    assert pages(start=10.0, end=10.0) == [2]  # boundary belongs to next page
+    assert pages(start=5, end=26) == [1, 2, 3]
+
+    full = client.get(f"/audiobook/{bid}/transcript").json()
+    assert full["pages"] == {"1": "one", "2": "two", "3": "three"}
+    assert full["page_to_time"]["3"] == 25.0
+
+
+def test_transcript_endpoint_imports_legacy_json():
+    from app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    bid = AudiobookStore.create_book("Test.pdf")
+    AudiobookStore.write_meta(
+        bid, AudiobookStore.initial_meta(bid, "T", 2, "kokoro", "af_bella", 1.0, {})
+    )
+    legacy = {
+        "book_id": bid,
+        "sections": [],
+        "page_to_time": {"1": 0.0, "2": 4.0},
+        "total_audio_seconds": 9.0,
+        "pages": {"1": "first", "2": "second"},
+    }
+    with open(AudiobookStore.transcript_path(bid), "w") as f:
+        json.dump(legacy, f)
+
+    r = client.get(f"/audiobook/{bid}/transcript", params={"start": 5})
+    assert r.json()["pages"] == [
+        {"page": 2, "start_time": 4.0, "end_time": 9.0, "text": "second"}
+    ]
+    assert not os.path.exists(AudiobookStore.transcript_path(bid))
+
+
+@pytest.mark.asyncio
+async def test_search_indexes_pages_as_cleaned_and_returns_time_offsets():
+    from app.main import app
+    from fastapi.testclient import TestClient
+
+    a = AudiobookStore.create_book("a.pdf")
+    meta = AudiobookStore.initial_meta(a, "Whales", 2, "kokoro", "af_bella", 1.0, {})
+    meta["page_to_time"] = {"1": 0.0, "2": 42.0}
+    AudiobookStore.write_meta(a, meta)
+    b = AudiobookStore.create_book("b.pdf")
+    AudiobookStore.write_meta(
+        b, AudiobookStore.initial_meta(b, "Ships", 1, "kokoro", "af_bella", 1.0, {})
+    )
+    AudiobookStore.index_page_text(a, 1, "Call me Ishmael.")
+    AudiobookStore.index_page_text(a, 2, "The white whale surfaced near the ship.")
+    AudiobookStore.index_page_text(b, 1, "A ship, a ship, a ship and a whale!")
+    AudiobookStore.index_page_text(b, 2, "-")  # silence marker: not indexed
+    # Cleaning finishes → buffered text is committed with the phase change.
+    await AudiobookStore.update_meta(a, status="tts")
+    await AudiobookStore.update_meta(b, status="tts")
+
+    client = TestClient(app)
+    body = client.get("/audiobook/search", params={"q": "Whale ship"}).json()
+    hits = [(h["book_id"], h["page"]) for h in body["items"]]
+    assert set(hits) == {(a, 2), (b, 1)}
+    assert hits[0] == (b, 1)  # more occurrences rank first
+    by_page = {(h["book_id"], h["page"]): h for h in body["items"]}
+    assert by_page[(a, 2)]["time"] == 42.0
+    assert "[whale]" in by_page[(a, 2)]["snippet"]
+
+    within = client.get("/audiobook/search", params={"q": "ship", "book_id": a})
+    assert [h["book_id"] for h in within.json()["items"]] == [a]
+    paged = client.get("/audiobook/search", params={"q": "ship", "limit": 1}).json()
+    assert len(paged["items"]) == 1 and paged["next_offset"] == 1
+    assert client.get("/audiobook/search", params={"q": "?!"}).status_code == 400
+
+    AudiobookStore.delete_book(b)
+    assert AudiobookStore.search("ship")[0][0]["book_id"] == a
+
+
 # ---------- Phase 2: retry endpoint ----------
 
 
@@ -558,12 +1482,13 @@ async def test_request_delete_cancels_in_flight_pipeline():
     )
     meta["status"] = "tts"
     AudiobookStore.write_meta(bid, meta)
-    AudiobookService._current_book_id = bid
+    AudiobookService.initialize()
+    AudiobookService._scheduler._running.add((bid, "tts"))
     AudiobookService._cancel_flags.pop(bid, None)
 
     async def release_after_short_pause():
         await asyncio.sleep(0.15)
-        AudiobookService._current_book_id = None
+        AudiobookService._scheduler._running.discard((bid, "tts"))
 
     asyncio.create_task(release_after_short_pause())
 
@@ -688,6 +1613,223 @@ async def test_gemini_auth_error_does_not_retry(monkeypatch):
     assert calls["n"] == 1  # no retry for auth errors
 
 
+@pytest.mark.asyncio
+async def test_gemini_client_cache_reuses_bounds_and_evicts(monkeypatch):
+    from app.services.gemini_cleaner import GeminiCleaner
+
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(
+        "app.services.gemini_cleaner.time.monotonic", lambda: clock["now"]
+    )
+    await GeminiCleaner.aclose()
+    monkeypatch.setattr(GeminiCleaner, "_CLIENT_CACHE_MAX", 2)
+    try:
+        a = GeminiCleaner._client("key-a")
+        assert GeminiCleaner._client("key-a") is a
+        b = GeminiCleaner._client("key-b")
+        assert b is not a
+        # Every client sends through the one shared pool.
+        assert a._api_client._async_httpx_client is GeminiCleaner._http
+        assert b._api_client._async_httpx_client is GeminiCleaner._http
+
+        # Bounded: a third key pushes out the least recently used.
+        GeminiCleaner._client("key-a")
+        GeminiCleaner._client("key-c")
+        assert len(GeminiCleaner._clients) == 2
+        assert GeminiCleaner._client("key-a") is a
+        assert GeminiCleaner._client("key-b") is not b
+
+        # Idle entries are evicted on the next access.
+        a = GeminiCleaner._client("key-a")
+        clock["now"] += GeminiCleaner._CLIENT_IDLE_SECONDS + 1
+        assert GeminiCleaner._client("key-a") is not a
+        assert len(GeminiCleaner._clients) == 1
+    finally:
+        await GeminiCleaner.aclose()
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_aimd_and_shared_cooldown(monkeypatch):
+    from app.services import rate_limiter
+    from app.services.gemini_cleaner import GeminiRateLimitError
+
+    clock = {"now": 0.0}
+    slept: list[float] = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock["now"] += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    lim = rate_limiter.AdaptiveLimiter(
+        initial=4,
+        maximum=6,
+        throttled=GeminiRateLimitError,
+        clock=lambda: clock["now"],
+    )
+
+    async def call(seconds=1.0, tokens=100):
+        async with lim.slot(tokens):
+            clock["now"] += seconds
+
+    # Additive increase: +1 per window of successes, capped at maximum.
+    for _ in range(40):
+        await call()
+    assert lim.limit == 6
+
+    # One burst of concurrent 429s halves the limit once and starts one
+    # cooldown.
+    gate = asyncio.Event()
+
+    async def throttled():
+        async with lim.slot(100):
+            await gate.wait()
+            raise GeminiRateLimitError("429")
+
+    burst = [asyncio.create_task(throttled()) for _ in range(3)]
+    await real_sleep(0)
+    gate.set()
+    results = await asyncio.gather(*burst, return_exceptions=True)
+    assert all(isinstance(r, GeminiRateLimitError) for r in results)
+    assert lim.limit == 3
+    assert lim.throttles == 3
+    # The next caller waits out the cooldown instead of retrying into it.
+    await call(seconds=0.0)
+    assert slept and slept[0] == pytest.approx(2.0)
+
+    # Inflated per-token latency is treated as congestion.
+    before = lim.limit
+    clock["now"] += 10
+    await call(seconds=10.0)
+    assert lim.limit < before
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_honours_rpm_and_concurrency(monkeypatch):
+    from app.services import rate_limiter
+
+    clock = {"now": 0.0}
+    slept: list[float] = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock["now"] += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    lim = rate_limiter.AdaptiveLimiter(rpm=60, clock=lambda: clock["now"])
+    for _ in range(60):
+        async with lim.slot():
+            pass
+    assert slept == []
+    async with lim.slot():
+        pass
+    assert slept == [pytest.approx(1.0)]
+
+    # With every slot taken, the next caller parks until one is released.
+    lim = rate_limiter.AdaptiveLimiter(initial=1, maximum=1)
+    release = asyncio.Event()
+    order: list[str] = []
+
+    async def holder():
+        async with lim.slot():
+            order.append("a")
+            await release.wait()
+
+    async def waiter():
+        async with lim.slot():
+            order.append("b")
+
+    t1 = asyncio.create_task(holder())
+    await real_sleep(0)
+    t2 = asyncio.create_task(waiter())
+    await real_sleep(0.01)
+    assert order == ["a"]
+    release.set()
+    await asyncio.gather(t1, t2)
+    assert order == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_gemini_timeout_starts_at_limiter_admission(monkeypatch):
+    """Time spent queued in the shared limiter never counts toward a
+    request's timeout; a request that is slow once admitted still fails."""
+    from types import SimpleNamespace
+
+    from app.services import gemini_cleaner as _gc
+
+    lim = _gc.AdaptiveLimiter(initial=1, maximum=1)
+    monkeypatch.setattr(_gc, "gemini_limiter", lim)
+    monkeypatch.setattr(_gc.GeminiCleaner, "_REQUEST_TIMEOUTS", {"clean": 0.05})
+    latency = {"s": 0.01}
+
+    async def generate_content(**kwargs):
+        await asyncio.sleep(latency["s"])
+        return SimpleNamespace(text="cleaned")
+
+    client = SimpleNamespace(
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+    )
+    monkeypatch.setattr(
+        _gc.GeminiCleaner, "_client", classmethod(lambda cls, k: client)
+    )
+
+    async def hold_slot():
+        async with lim.slot():
+            await asyncio.sleep(0.15)
+
+    holder = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0)
+    # Queued three timeouts' worth behind the holder, then answered quickly.
+    assert await _gc.GeminiCleaner._async_clean("k", "raw") == "cleaned"
+    await holder
+
+    latency["s"] = 0.2
+    with pytest.raises(_gc.GeminiTimeoutError):
+        await _gc.GeminiCleaner.clean_page("k", "raw")
+
+
+@pytest.mark.asyncio
+async def test_fake_gemini_server_speaks_the_sdk_wire_format(monkeypatch):
+    """GeminiCleaner talks to benchmarks/fake_gemini.py through the real
+    google-genai client: echoes, sections, 429 mapping, token accounting."""
+    import httpx
+    from app.core.metrics import GEMINI_REQUEST_SECONDS
+    from app.services import gemini_cleaner as _gc
+    from app.services.gemini_cleaner import GeminiCleaner, GeminiRateLimitError
+    from benchmarks.fake_gemini import FakeGeminiConfig, create_app
+
+    app = create_app(FakeGeminiConfig(section_pages=2))
+    GeminiCleaner.set_base_url("http://fake-gemini")
+    # Route the shared pool straight into the ASGI app (no socket).
+    monkeypatch.setattr(
+        GeminiCleaner, "_http", httpx.AsyncClient(transport=httpx.ASGITransport(app))
+    )
+    monkeypatch.setattr(GeminiCleaner, "_http_loop", asyncio.get_running_loop())
+    try:
+        monkeypatch.setattr(_gc, "gemini_limiter", _gc.AdaptiveLimiter(maximum=4))
+
+        assert await GeminiCleaner.clean_page("k", "Some raw page.") == "Some raw page."
+        sections = await GeminiCleaner.detect_sections("k", ["a", "b", "c"])
+        assert [(s["start_page"], s["end_page"]) for s in sections] == [(1, 2), (3, 3)]
+        stats = app.state.stats.as_dict()
+        assert stats["ok"] == 2 and stats["input_tokens"] > 0
+
+        throttled = GEMINI_REQUEST_SECONDS.count(op="clean", outcome="rate_limited")
+        app.state.config.rate_429 = 1.0
+        with pytest.raises(GeminiRateLimitError):
+            await GeminiCleaner._async_clean("k", "throttled")
+        assert app.state.stats.throttled == 1
+        assert (
+            GEMINI_REQUEST_SECONDS.count(op="clean", outcome="rate_limited")
+            == throttled + 1
+        )
+    finally:
+        GeminiCleaner.set_base_url("")
+        await GeminiCleaner.aclose()
+
+
 # ---------- cost_warning flag ----------
 
 
@@ -810,7 +1952,7 @@ async def test_clean_phase_uses_ocr_for_image_pages(monkeypatch):
     """Pages with fewer than 50 chars of extracted text are routed to
     GeminiCleaner.ocr_page instead of clean_page."""
     from app.services import audiobook_service as _svc
-    from app.services import pdf_extractor as _pe
+    from app.services import ocr_renderer as _ocr
 
     bid = AudiobookStore.create_book("Scan.pdf")
     meta = AudiobookStore.initial_meta(
@@ -838,11 +1980,7 @@ async def test_clean_phase_uses_ocr_for_image_pages(monkeypatch):
         clean_calls.append(1)
         return "Cleaned text."
 
-    monkeypatch.setattr(
-        _pe.PDFExtractor,
-        "render_page_image",
-        classmethod(lambda cls, p, n, **kw: b"imgbytes"),
-    )
+    monkeypatch.setattr(_ocr.OCRRenderer, "render", AsyncMock(return_value=b"imgbytes"))
 
     from app.services import gemini_cleaner as _gc
 
@@ -858,6 +1996,101 @@ async def test_clean_phase_uses_ocr_for_image_pages(monkeypatch):
     assert len(clean_calls) == 1, "text page should route to clean_page"
 
 
+@pytest.mark.asyncio
+async def test_ocr_renders_are_small_grayscale_and_prefetched(monkeypatch):
+    """Pages render in the process pool to grayscale JPEGs capped at
+    OCR_MAX_IMAGE_SIDE; the prefetcher keeps at most `depth` renders ahead."""
+    import io
+
+    import pypdfium2 as pdfium
+    from app.services.ocr_renderer import OCRRenderer, RenderPrefetcher
+    from PIL import Image
+
+    pdf = pdfium.PdfDocument.new()
+    pdf.new_page(612, 792)  # US letter, in points
+    path = os.path.join(tempfile.mkdtemp(prefix="ss_ocr_test_"), "scan.pdf")
+    pdf.save(path)
+    try:
+        image = Image.open(io.BytesIO(await OCRRenderer.render(path, 1)))
+    finally:
+        OCRRenderer.shutdown()
+    assert image.format == "JPEG" and image.mode == "L"
+    # 150 dpi would be 1275 x 1650; the long side is capped instead.
+    assert max(image.size) == 1536 and image.size[0] < 1200
+
+    started: list[int] = []
+    release = asyncio.Event()
+
+    async def _render(pdf_path, n):
+        started.append(n)
+        await release.wait()
+        return f"page {n}".encode()
+
+    monkeypatch.setattr(OCRRenderer, "render", _render)
+    renders = RenderPrefetcher("book.pdf", [1, 2, 3, 4, 5], depth=2)
+    await asyncio.sleep(0)
+    assert started == [1, 2]
+    release.set()
+    assert await renders.take(1) == b"page 1"
+    await asyncio.sleep(0)
+    assert started == [1, 2, 3]
+    assert await renders.take(5) == b"page 5"  # out of order: on demand
+    assert started == [1, 2, 3, 5]
+    renders.close()
+
+
+@pytest.mark.asyncio
+async def test_ocr_policy_routes_scanned_pages(monkeypatch):
+    """OCR_POLICY picks the engine per page: local only, local with Gemini
+    for low-confidence pages (local kept if Gemini fails), or Gemini with
+    local while rate limited."""
+    from app.services import gemini_cleaner as _gc
+    from app.services.gemini_cleaner import GeminiRateLimitError, GeminiTimeoutError
+    from app.services.local_ocr import LocalOCR
+
+    confidence = {"value": 95.0}
+    read = AsyncMock(
+        side_effect=lambda img: ("Local text from a scan.", confidence["value"])
+    )
+    monkeypatch.setattr(LocalOCR, "available", staticmethod(lambda: True))
+    monkeypatch.setattr(LocalOCR, "read", read)
+    gemini = AsyncMock(return_value="Gemini text.")
+    monkeypatch.setattr(_gc.GeminiCleaner, "ocr_page", gemini)
+
+    def use(policy: str) -> None:
+        monkeypatch.setattr(
+            "app.services.local_ocr.settings", Settings(OCR_POLICY=policy)
+        )
+
+    async def ocr(api_key: str = "k") -> tuple[str, str]:
+        return await AudiobookService._ocr_page("b", 1, api_key, b"img")
+
+    use("gemini")
+    assert await ocr() == ("Gemini text.", "done")
+    assert await ocr(api_key="") == ("Local text from a scan.", "local")
+    use("local")
+    assert await ocr() == ("Local text from a scan.", "local")
+    assert gemini.await_count == 1
+
+    use("escalate")
+    assert await ocr() == ("Local text from a scan.", "local")
+    confidence["value"] = 40.0
+    assert await ocr() == ("Gemini text.", "done")
+    assert gemini.await_count == 2
+    # The escalated call timing out or being rate limited keeps the local read.
+    for error in (GeminiTimeoutError("ocr"), GeminiRateLimitError("429")):
+        gemini.side_effect = error
+        assert await ocr() == ("Local text from a scan.", "local")
+    gemini.side_effect = None
+
+    use("fallback")
+    gemini.side_effect = GeminiRateLimitError("429")
+    assert await ocr() == ("Local text from a scan.", "local")
+    use("gemini")
+    with pytest.raises(GeminiRateLimitError):
+        await ocr()
+
+
 # ---------- duplicate page deduplication ----------
 
 
@@ -894,8 +2127,6 @@ async def test_duplicate_pages_get_silence_marker(monkeypatch):
         _pe.PDFExtractor, "render_cover", classmethod(lambda cls, b, **kw: None)
     )
 
-    _svc.AudiobookService._queue = None
-    _svc.AudiobookService._worker_task = None
     _svc.AudiobookService.initialize()
 
     await _svc.AudiobookService._phase_extract(bid)
@@ -947,8 +2178,6 @@ async def test_non_duplicate_pages_are_not_marked_silent(monkeypatch):
         _pe.PDFExtractor, "render_cover", classmethod(lambda cls, b, **kw: None)
     )
 
-    _svc.AudiobookService._queue = None
-    _svc.AudiobookService._worker_task = None
     _svc.AudiobookService.initialize()
 
     await _svc.AudiobookService._phase_extract(bid)
@@ -960,6 +2189,226 @@ async def test_non_duplicate_pages_are_not_marked_silent(monkeypatch):
         ), f"page {n} should not have a pre-written clean file — content is unique"
 
 
+def _near_duplicate_pages() -> list[str]:
+    body = " ".join(
+        f"Clause {i} binds the parties to the terms set out in schedule {i % 7}."
+        for i in range(40)
+    )
+    return [
+        f"ACME Corp Confidential Page 1 of 3\n\n{body}\n\nPrinted 2024-01-01",
+        f"ACME Corp Draft Page 2 of 3\n\n{body}\n\nPrinted 2024-02-17",
+        "Chapter 2: " + " ".join(f"unrelated word{i}" for i in range(120)),
+    ]
+
+
+def test_page_fingerprint_near_duplicate_lookup():
+    from app.services.page_fingerprint import DuplicateIndex, PageFingerprint
+
+    a, b, c = _near_duplicate_pages()
+    body_a, body_b, body_c = (PageFingerprint.body_hash(t) for t in (a, b, c))
+    assert PageFingerprint.content_hash(a) != PageFingerprint.content_hash(b)
+    assert body_a == body_b
+    assert body_a != body_c
+    # Too little body to be sure two pages are the same page.
+    assert PageFingerprint.body_hash("Header\njust a few words here\nFooter") is None
+
+    index = DuplicateIndex()
+    index.add(1, PageFingerprint.content_hash(a), body_a)
+    assert index.find(PageFingerprint.content_hash(b), body_b) == 1
+    assert index.find(PageFingerprint.content_hash(c), body_c) is None
+    assert index.find(PageFingerprint.content_hash(a), None) == 1
+
+
+@pytest.mark.asyncio
+async def test_extract_keeps_pages_whose_bodies_differ(monkeypatch):
+    """An amended page — same header and footer, a few words changed in the
+    body — is real content and must not be silenced as a duplicate."""
+    from app.services import audiobook_service as _svc
+    from app.services import pdf_extractor as _pe
+
+    clauses = [
+        f"Clause {i}: the tenant shall pay the sum set out in schedule {i % 7}."
+        for i in range(40)
+    ]
+    amended = list(clauses)
+    for i in range(0, 40, 4):
+        amended[i] = amended[i].replace("shall", "shall not")
+    pages = [
+        f"Lease Agreement Page 1 of 2\n\n{' '.join(clauses)}\n\nInitials: ____",
+        f"Lease Agreement Page 2 of 2\n\n{' '.join(amended)}\n\nInitials: ____",
+    ]
+    bid = AudiobookStore.create_book("lease.pdf")
+    meta = AudiobookStore.initial_meta(
+        bid, "lease.pdf", 2, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+    )
+    meta["file_ext"] = "pdf"
+    AudiobookStore.write_meta(bid, meta)
+    for n, content in enumerate(pages, start=1):
+        path = AudiobookStore.page_raw_path(bid, n)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    monkeypatch.setattr(_pe.PDFExtractor, "page_count", classmethod(lambda cls, p: 2))
+    monkeypatch.setattr(
+        _pe.PDFExtractor, "render_cover", classmethod(lambda cls, b, **kw: None)
+    )
+    _svc.AudiobookService.initialize()
+
+    await _svc.AudiobookService._phase_extract(bid)
+
+    fps = AudiobookStore.read_page_fingerprints(bid)
+    assert fps[1]["duplicate_of"] is None
+    assert fps[2]["duplicate_of"] is None
+    for n in (1, 2):
+        assert not os.path.exists(AudiobookStore.page_clean_path(bid, n))
+    AudiobookStore.delete_book(bid)
+
+
+@pytest.mark.asyncio
+async def test_extract_marks_near_duplicate_and_resumes_from_store(monkeypatch):
+    """Pages that differ only in header/footer are silenced, and a resumed
+    extract phase rebuilds the index from stored fingerprints — no page file
+    is re-read or re-hashed."""
+    from app.services import audiobook_service as _svc
+    from app.services import pdf_extractor as _pe
+
+    pages = _near_duplicate_pages()
+    bid = AudiobookStore.create_book("contract.pdf")
+    meta = AudiobookStore.initial_meta(
+        bid, "contract.pdf", 3, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+    )
+    meta["file_ext"] = "pdf"
+    AudiobookStore.write_meta(bid, meta)
+    for n, content in enumerate(pages, start=1):
+        path = AudiobookStore.page_raw_path(bid, n)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    monkeypatch.setattr(_pe.PDFExtractor, "page_count", classmethod(lambda cls, p: 3))
+    monkeypatch.setattr(
+        _pe.PDFExtractor, "render_cover", classmethod(lambda cls, b, **kw: None)
+    )
+    _svc.AudiobookService.initialize()
+
+    await _svc.AudiobookService._phase_extract(bid)
+
+    fps = AudiobookStore.read_page_fingerprints(bid)
+    assert sorted(fps) == [1, 2, 3]
+    assert fps[1]["duplicate_of"] is None
+    assert fps[2]["duplicate_of"] == 1
+    assert fps[3]["duplicate_of"] is None
+    with open(AudiobookStore.page_clean_path(bid, 2), encoding="utf-8") as f:
+        assert f.read() == "-"
+    assert not os.path.exists(AudiobookStore.page_clean_path(bid, 1))
+
+    # Resume: the clean marker was lost but the fingerprints are in the store.
+    os.remove(AudiobookStore.page_clean_path(bid, 2))
+
+    def _no_rehash(*args, **kwargs):
+        raise AssertionError("resume must not re-fingerprint pages")
+
+    monkeypatch.setattr(
+        _svc.AudiobookService, "_fingerprint_page", staticmethod(_no_rehash)
+    )
+    await _svc.AudiobookService._phase_extract(bid)
+    with open(AudiobookStore.page_clean_path(bid, 2), encoding="utf-8") as f:
+        assert f.read() == "-"
+
+    AudiobookStore.delete_book(bid)
+    assert AudiobookStore.read_page_fingerprints(bid) == {}
+
+
+# ---------- cross-book shared content ----------
+
+
+def _make_clean_ready_book(title: str, clean_text: str) -> str:
+    bid = AudiobookStore.create_book(title)
+    meta = AudiobookStore.initial_meta(
+        bid, title, 1, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+    )
+    AudiobookStore.write_meta(bid, meta)
+    path = AudiobookStore.page_clean_path(bid, 1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(clean_text)
+    return bid
+
+
+@pytest.mark.asyncio
+async def test_identical_raw_page_is_cleaned_once_across_books(monkeypatch):
+    from app.services import audiobook_service as _svc
+    from app.services import gemini_cleaner as _gc
+
+    raw = "This Agreement is governed by the laws of the State of Delaware. " * 5
+    books = []
+    for title in ("a.pdf", "b.pdf"):
+        bid = AudiobookStore.create_book(title)
+        AudiobookStore.write_meta(
+            bid,
+            AudiobookStore.initial_meta(
+                bid, title, 1, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+            ),
+        )
+        path = AudiobookStore.page_raw_path(bid, 1)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(raw)
+        books.append(bid)
+
+    clean = AsyncMock(return_value="Governed by Delaware law.")
+    monkeypatch.setattr(_gc.GeminiCleaner, "clean_page", clean)
+    _svc.AudiobookService.initialize()
+    for bid in books:
+        await _svc.AudiobookService._phase_clean(bid, api_key="test-key")
+
+    assert clean.await_count == 1
+    for bid in books:
+        with open(AudiobookStore.page_clean_path(bid, 1), encoding="utf-8") as f:
+            assert f.read() == "Governed by Delaware law."
+
+
+@pytest.mark.asyncio
+async def test_identical_page_audio_is_shared_and_refcounted():
+    """Second book with the same cleaned text + voice + speed hardlinks the
+    shared WAV instead of synthesising; deleting one book keeps the blob
+    alive for the other, deleting the last one removes it."""
+    text = "Standard license terms apply to this edition."
+    b1 = _make_clean_ready_book("one.pdf", text)
+    b2 = _make_clean_ready_book("two.pdf", text)
+
+    with (
+        patch(
+            "app.services.audiobook_service.EngineManager.ensure_loaded",
+            new=AsyncMock(return_value=None),
+        ),
+        patch("app.services.audiobook_service.EngineManager.touch"),
+        patch(
+            "app.services.audiobook_service.EngineManager.generate",
+            side_effect=_mock_generate_yielding,
+        ) as gen,
+    ):
+        await AudiobookService._phase_tts(b1, AudiobookStore.read_meta(b1))
+        await AudiobookService._phase_tts(b2, AudiobookStore.read_meta(b2))
+    assert gen.call_count == 1
+
+    blob = AudiobookStore.shared_audio_path(
+        AudiobookStore.shared_audio_key(text, "af_bella", 1.0)
+    )
+    p1 = AudiobookStore.page_audio_path(b1, 1)
+    p2 = AudiobookStore.page_audio_path(b2, 1)
+    with open(p1, "rb") as f1, open(p2, "rb") as f2:
+        assert f1.read() == f2.read()
+    assert os.path.samefile(p2, blob)
+
+    AudiobookStore.delete_book(b1)
+    assert os.path.exists(blob)
+    assert os.path.exists(p2)
+    AudiobookStore.delete_book(b2)
+    assert not os.path.exists(blob)
+
+
 # ---------- TXT extraction (non-PDF path) ----------
 
 
@@ -1002,11 +2451,8 @@ async def test_txt_file_extraction_does_not_call_pdf_extractor(monkeypatch):
         _pe.PDFExtractor, "render_cover", classmethod(lambda cls, b: _fail_if_called(b))
     )
 
-    # Reset AudiobookService state so initialize() creates fresh objects in the
-    # current event loop (avoids "bound to a different event loop" errors when
-    # multiple async tests share the singleton).
-    _svc.AudiobookService._queue = None
-    _svc.AudiobookService._worker_task = None
+    # initialize() restarts the scheduler's worker pools on the current event
+    # loop, so async tests can share the singleton.
     _svc.AudiobookService.initialize()
 
     await _svc.AudiobookService._phase_extract(bid)
@@ -1027,9 +2473,10 @@ async def test_txt_file_extraction_does_not_call_pdf_extractor(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_gemini_timeout_falls_back_to_raw_text(monkeypatch):
-    """When GeminiCleaner.clean_page raises asyncio.TimeoutError the pipeline
-    must degrade gracefully: the cleaned output file is written with the raw
-    text so downstream TTS can still proceed.  No hang, no crash, no empty file.
+    """When GeminiCleaner.clean_page times out the pipeline must degrade
+    gracefully: the cleaned output file is written with the raw text so
+    downstream TTS can still proceed, and the page is marked failed so
+    retry_failed cleans it properly later. No hang, no crash, no empty file.
     """
     from app.services import audiobook_service as _svc
     from app.services import gemini_cleaner as _gc
@@ -1047,7 +2494,7 @@ async def test_gemini_timeout_falls_back_to_raw_text(monkeypatch):
         f.write(raw_text)
 
     async def _timeout_clean(api_key, text):
-        raise asyncio.TimeoutError()
+        raise _gc.GeminiTimeoutError("clean: no response in time")
 
     monkeypatch.setattr(
         _gc.GeminiCleaner, "clean_page", AsyncMock(side_effect=_timeout_clean)
@@ -1062,3 +2509,322 @@ async def test_gemini_timeout_falls_back_to_raw_text(monkeypatch):
     with open(clean_path, encoding="utf-8") as f:
         result = f.read()
     assert result == raw_text, "fallback content must equal the original raw text"
+    assert AudiobookStore.read_meta(bid)["failed_pages"] == [1]
+
+
+# ---------- batched Gemini cleaning ----------
+
+
+def test_gemini_batch_pack_and_split_verification():
+    from app.services.gemini_cleaner import GeminiCleaner
+
+    pages = ["a" * 4000, "b" * 4000, "c" * 20000, "d" * 40]
+    # 1000 + 1000 tokens fit a 2500 budget; the 5000-token page goes alone.
+    assert GeminiCleaner.pack_batches(pages, 2500) == [[0, 1], [2], [3]]
+    many = ["x" * 40] * 20
+    assert [len(b) for b in GeminiCleaner.pack_batches(many, 10**6)] == [8, 8, 4]
+
+    raws = ["Page one " * 60, "Page two " * 60, "Tiny"]
+    ok = (
+        "<<<PAGE 1>>>\n"
+        + "Page one " * 55
+        + "\n<<<PAGE 2>>>\n"
+        + "Page two " * 60
+        + "\n<<<PAGE 3>>>\n-"
+    )
+    out = GeminiCleaner._split_batch(ok, raws)
+    assert out[0].startswith("Page one") and out[1].startswith("Page two")
+    assert out[2] == "-"
+    # Page 2 swallowed into page 1: its length check fails, page 1's too.
+    merged = (
+        "<<<PAGE 1>>>\n"
+        + "Page one " * 60
+        + "Page two " * 60
+        + "\n<<<PAGE 2>>>\nPage two\n<<<PAGE 3>>>\n-"
+    )
+    assert GeminiCleaner._split_batch(merged, raws) == [None, None, "-"]
+    # A dropped or reordered marker invalidates the whole batch.
+    assert GeminiCleaner._split_batch("<<<PAGE 1>>>\nx\n<<<PAGE 3>>>\ny", raws) == [
+        None,
+        None,
+        None,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_phase_clean_batches_pages_and_falls_back_per_page(monkeypatch):
+    from app.core.metrics import CACHE_LOOKUPS
+    from app.services import audiobook_service as _svc
+    from app.services import gemini_cleaner as _gc
+
+    monkeypatch.setattr(_svc.settings, "GEMINI_BATCH_TOKENS", 10**6)
+    bid = AudiobookStore.create_book("Batch.txt")
+    meta = AudiobookStore.initial_meta(
+        bid, "Batch.txt", 5, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+    )
+    meta["file_ext"] = "txt"
+    AudiobookStore.write_meta(bid, meta)
+    raws = {n: f"Raw text of page {n}. " * 30 for n in range(1, 6)}
+    for n, raw in raws.items():
+        path = AudiobookStore.page_raw_path(bid, n)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(raw)
+
+    batch_sizes: list[int] = []
+
+    async def fake_batch(api_key, joined):
+        count = joined.count("<<<PAGE ")
+        batch_sizes.append(count)
+        # Page 4's text comes back empty: only that page is retried alone.
+        return "\n".join(
+            f"<<<PAGE {i}>>>\n" + ("" if i == 4 else raws[i].replace("Raw", "Clean"))
+            for i in range(1, count + 1)
+        )
+
+    per_page = AsyncMock(side_effect=lambda key, raw: "Cleaned alone")
+    monkeypatch.setattr(
+        _gc.GeminiCleaner, "_async_clean_batch", AsyncMock(side_effect=fake_batch)
+    )
+    monkeypatch.setattr(_gc.GeminiCleaner, "clean_page", per_page)
+
+    lookups = {r: CACHE_LOOKUPS.value(cache="clean", result=r) for r in ("hit", "miss")}
+    _svc.AudiobookService.initialize()
+    assert await _svc.AudiobookService._phase_clean(bid, api_key="k")
+
+    assert batch_sizes == [5]
+    # Pages the batch just cached are not counted as cache hits; page 4,
+    # which the batch could not split back, is a miss.
+    assert CACHE_LOOKUPS.value(cache="clean", result="hit") == lookups["hit"]
+    assert CACHE_LOOKUPS.value(cache="clean", result="miss") == lookups["miss"] + 1
+    assert per_page.await_count == 1
+    assert per_page.await_args.args[1] == raws[4]
+    cleaned = {}
+    for n in raws:
+        with open(AudiobookStore.page_clean_path(bid, n), encoding="utf-8") as f:
+            cleaned[n] = f.read()
+    assert cleaned[4] == "Cleaned alone"
+    for n in (1, 2, 3, 5):
+        assert cleaned[n] == raws[n].replace("Raw", "Clean").strip()
+
+    # Batched output is cached under the batch prompt's hash, so editing the
+    # batch instructions re-cleans those pages.
+    raw_hash = _svc.PageFingerprint.content_hash(raws[1])
+    assert (
+        AudiobookStore.read_shared_clean(
+            raw_hash, _gc.MODEL_NAME, _gc.BATCH_PROMPT_HASH
+        )
+        is not None
+    )
+    assert (
+        AudiobookStore.read_shared_clean(
+            raw_hash, _gc.MODEL_NAME, _gc.CLEAN_PROMPT_HASH
+        )
+        is None
+    )
+    monkeypatch.setattr(_svc, "BATCH_PROMPT_HASH", "edited-batch-prompt")
+    assert _svc.AudiobookService._read_shared_clean(raw_hash) is None
+
+
+@pytest.mark.asyncio
+async def test_clean_cache_is_keyed_by_model_and_prompt(monkeypatch):
+    """A re-ingested page is served from the cleaned-text cache without a
+    Gemini call, unless the prompt (or model) that produced it changed."""
+    from app.services import audiobook_service as _svc
+    from app.services import gemini_cleaner as _gc
+
+    raw = "Identical boilerplate page text. " * 10
+    clean = AsyncMock(return_value="Cleaned boilerplate.")
+    monkeypatch.setattr(_gc.GeminiCleaner, "clean_page", clean)
+    monkeypatch.setattr(_gc.GeminiCleaner, "detect_window", AsyncMock(return_value=[]))
+
+    def new_book() -> str:
+        bid = AudiobookStore.create_book("Again.txt")
+        meta = AudiobookStore.initial_meta(
+            bid, "Again.txt", 1, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+        )
+        meta["file_ext"] = "txt"
+        AudiobookStore.write_meta(bid, meta)
+        path = AudiobookStore.page_raw_path(bid, 1)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(raw)
+        return bid
+
+    _svc.AudiobookService.initialize()
+    await _svc.AudiobookService._phase_clean(new_book(), api_key="k")
+    assert clean.await_count == 1
+
+    # Re-upload: served from the cache, even after a process restart.
+    AudiobookStore._reset_for_tests()
+    bid = new_book()
+    await _svc.AudiobookService._phase_clean(bid, api_key="k")
+    assert clean.await_count == 1
+    with open(AudiobookStore.page_clean_path(bid, 1), encoding="utf-8") as f:
+        assert f.read() == "Cleaned boilerplate."
+
+    # A prompt edit invalidates the entry.
+    monkeypatch.setattr(_svc, "CLEAN_PROMPT_HASH", "edited-prompt")
+    await _svc.AudiobookService._phase_clean(new_book(), api_key="k")
+    assert clean.await_count == 2
+
+
+# ---------- local heuristic cleaner ----------
+
+
+def _book_pages(count: int) -> list[str]:
+    """Pages with a running header, a numbered footer and distinct body text."""
+    import random
+
+    vocab = "river stone amber quiet harbor lantern meadow cinder violet orchard"
+    pages = []
+    for i in range(1, count + 1):
+        w = random.Random(i).sample(vocab.split(), k=9)
+        pages.append(
+            f"THE GREAT NOVEL\n"
+            f"The {w[0]} and the {w[1]} open page {i} with an exam-\n"
+            f"ple of a broken word near the {w[2]}, a \ufb01ne {w[3]}, and\n"
+            f"the line wraps into the {w[4]} {w[5]} sentence here.\n"
+            f"\n"
+            f"A second paragraph about the {w[6]} {w[7]} {w[8]}.\n"
+            f"{i}\n"
+        )
+    return pages
+
+
+def test_local_cleaner_strips_boilerplate_and_reflows():
+    from app.services.local_cleaner import LocalCleaner
+
+    out = LocalCleaner.clean_pages(_book_pages(6) + [""])
+    text, messy = out[2]
+    assert not messy
+    assert "THE GREAT NOVEL" not in text
+    assert not text.rstrip().endswith("3")
+    assert "with an example of a broken word near the" in text
+    assert ", a fine " in text and ", and the line wraps" in text
+    assert text.count("\n\n") == 1  # two paragraphs
+    assert out[-1] == ("-", False)
+
+    table = "Name   Age   City\nBob    32    Paris\nAnn    41    Rome\nJoe   22   Oslo"
+    equation = "Let \u2202y/\u2202x = \u2211 \u03b1\u1d62 \u2264 \u221e \u2207 \u00d7 \u221a\u03c0"
+    flags = [m for _, m in LocalCleaner.clean_pages([table, equation])]
+    assert flags == [True, True]
+
+    # Roman page numbers only go with context; a bare "I" or "V" stays.
+    front = "- iv -\nA preface line that runs on and on.\nWe were five, then\nV"
+    (text, _), (other, _) = LocalCleaner.clean_pages([front, "Page xii\nMore.\nI"])
+    assert text.startswith("A preface") and text.endswith("five, then V")
+    assert other == "More. I"
+
+
+@pytest.mark.asyncio
+async def test_phase_clean_auto_mode_sends_only_messy_pages_to_gemini(monkeypatch):
+    from app.services import audiobook_service as _svc
+    from app.services import gemini_cleaner as _gc
+
+    pages = _book_pages(5)
+    pages[3] = "Name   Age   City\nBob    32    Paris\nAnn    41    Rome\nJoe  22  Oslo"
+
+    def new_book(cleaner: str) -> str:
+        bid = AudiobookStore.create_book("Local.txt")
+        meta = AudiobookStore.initial_meta(
+            bid, "Local.txt", len(pages), "kokoro", "af_bella", 1.0, {}
+        )
+        meta["file_ext"] = "txt"
+        meta["cleaner"] = cleaner
+        AudiobookStore.write_meta(bid, meta)
+        for n, raw in enumerate(pages, start=1):
+            path = AudiobookStore.page_raw_path(bid, n)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(raw)
+        return bid
+
+    clean = AsyncMock(return_value="The following is a table.")
+    monkeypatch.setattr(_gc.GeminiCleaner, "clean_page", clean)
+    _svc.AudiobookService.initialize()
+
+    # The local pass runs once per run, not once per slice.
+    local_pass = MagicMock(wraps=_svc.LocalCleaner.clean_pages)
+    monkeypatch.setattr(_svc.LocalCleaner, "clean_pages", local_pass)
+    bid = new_book("auto")
+    while not await _svc.AudiobookService._phase_clean(bid, "k", max_pages=1):
+        pass
+    assert local_pass.call_count == 1
+    assert clean.await_count == 1
+    assert clean.await_args.args[1] == pages[3]
+    states = {p["page_no"]: p["clean_state"] for p in AudiobookStore.read_pages(bid)}
+    assert states == {1: "local", 2: "local", 3: "local", 4: "done", 5: "local"}
+
+    # "local" never calls Gemini, key or not.
+    bid = new_book("local")
+    assert await _svc.AudiobookService._phase_clean(bid, api_key="")
+    assert clean.await_count == 1
+    with open(AudiobookStore.page_clean_path(bid, 2), encoding="utf-8") as f:
+        assert "THE GREAT NOVEL" not in f.read()
+
+
+# ---------- streaming TXT pagination ----------
+
+
+def test_text_extractor_streaming_matches_split_pages(tmp_path):
+    """iter_page_texts streams the file but must paginate exactly like
+    split_pages, including CRLF / CR line endings and whitespace-only
+    paragraphs."""
+    from app.services.text_extractor import TextExtractor
+
+    paras = [" ".join(f"w{i}_{j}" for j in range(37 + i % 50)) for i in range(60)]
+    text = "\r\n\r\n".join(paras[:30]) + "\n\n\n" + "\r\r".join(paras[30:])
+    src = tmp_path / "big.txt"
+    src.write_bytes(text.encode("utf-8"))
+
+    streamed = list(TextExtractor.iter_page_texts(str(src)))
+    assert streamed == TextExtractor.split_pages(text)
+    assert TextExtractor.page_count(str(src)) == len(streamed) > 1
+
+
+def test_text_extractor_splits_paragraph_without_blank_lines(tmp_path):
+    """A log dump with no blank lines must not become one file-sized page."""
+    from app.services.text_extractor import _WORDS_PER_PAGE, TextExtractor
+
+    lines = [f"2024-01-01 12:00:{i:02d} INFO worker {i} finished" for i in range(600)]
+    src = tmp_path / "app.log.txt"
+    src.write_text("\n".join(lines), encoding="utf-8")
+
+    pages = list(TextExtractor.iter_page_texts(str(src)))
+    assert len(pages) > 1
+    # Cuts happen at line breaks: no line is ever split across pages.
+    assert sum(len(p.splitlines()) for p in pages) == len(lines)
+    # One line of slack past the budget at most.
+    assert all(len(p.split()) <= _WORDS_PER_PAGE + 7 for p in pages)
+
+
+def test_text_extractor_empty_file_is_one_blank_page(tmp_path):
+    from app.services.text_extractor import TextExtractor
+
+    src = tmp_path / "empty.md"
+    src.write_text("\n\n  \n", encoding="utf-8")
+    assert list(TextExtractor.iter_page_texts(str(src))) == [""]
+    assert TextExtractor.page_count(str(src)) == 1
+    assert TextExtractor.sample_word_count(str(src)) == 0
+
+
+def test_text_extractor_extract_all_writes_every_page():
+    from app.services.text_extractor import TextExtractor
+
+    bid = AudiobookStore.create_book("notes.txt")
+    meta = AudiobookStore.initial_meta(
+        bid, "notes.txt", 0, "kokoro", "af_bella", 1.0, {"cost_usd": 0.0}
+    )
+    meta["file_ext"] = "txt"
+    AudiobookStore.write_meta(bid, meta)
+    body = "\n\n".join(" ".join(["word"] * 150) for _ in range(10))
+    AudiobookStore.save_source(bid, body.encode("utf-8"), "txt")
+
+    TextExtractor.extract_one(bid, 1)
+
+    expected = TextExtractor.split_pages(body)
+    for n, page in enumerate(expected, start=1):
+        with open(AudiobookStore.page_raw_path(bid, n), encoding="utf-8") as f:
+            assert f.read() == page
+    assert not os.path.exists(AudiobookStore.page_raw_path(bid, len(expected) + 1))
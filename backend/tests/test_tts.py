@@ -1,9 +1,10 @@
+import asyncio
 from unittest.mock import MagicMock, patch
 
 import numpy as np
 import pytest
 from app.services.audio import AudioService
-from app.services.tts import TTSEngine
+from app.services.tts import PreemptionGate, TTSEngine
 
 
 class MockKokoro:
@@ -101,6 +102,63 @@ async def test_tts_engine_no_inter_segment_fades():
             assert mock_fade.call_count == 0
 
 
+@pytest.mark.asyncio
+async def test_tts_engine_reports_segment_timings():
+    mock_model = MagicMock()
+    mock_model.create.side_effect = [
+        (np.ones(100), None),
+        RuntimeError("phonemizer choked"),
+        (np.ones(300), None),
+    ]
+    TTSEngine._model = mock_model
+
+    timings = []
+    chunks = [
+        c
+        async for c in TTSEngine.generate(
+            "Hello world. This is a test! Does it work?", "af_bella", 1.0, timings
+        )
+    ]
+
+    # The failed middle segment yields nothing but still consumes its 4 words.
+    assert [(t.word_start, t.word_count) for t in timings] == [(0, 2), (6, 3)]
+    assert timings[0].sample_offset == 0
+    assert timings[1].sample_offset == len(chunks[0])
+    assert [t.speech_samples for t in timings] == [100, 300]
+
+
+@pytest.mark.asyncio
+async def test_background_generate_parks_between_segments_while_gate_held():
+    mock_model = MagicMock()
+    mock_model.create.return_value = (np.ones(100), None)
+    TTSEngine._model = mock_model
+    gate = PreemptionGate()
+    text = "Hello world. This is a test! Does it work?"
+
+    with patch("app.services.tts.interactive_tts_gate", gate):
+        background = TTSEngine.generate(text, "af_bella", 1.0, background=True)
+        await background.__anext__()
+        await gate.acquire()
+        assert gate.is_paused()
+        rest = asyncio.create_task(_drain(background))
+        await asyncio.sleep(0.05)
+        # Parked before the second segment's inference.
+        assert mock_model.create.call_count == 1
+
+        # Interactive generation is never gated.
+        assert len(await _drain(TTSEngine.generate(text, "af_bella", 1.0))) == 3
+        assert mock_model.create.call_count == 4
+
+        gate.release()
+        assert len(await asyncio.wait_for(rest, timeout=1)) == 2
+    assert mock_model.create.call_count == 6
+    assert not gate.is_paused()
+
+
+async def _drain(gen):
+    return [chunk async for chunk in gen]
+
+
 @pytest.mark.asyncio
 async def test_tts_engine_not_initialized():
     TTSEngine._model = None